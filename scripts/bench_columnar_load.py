@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Run from the project root: python scripts/bench_columnar_load.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.columnar_store import convert
+
+TABLES = [
+    'data/raw/chembl_drug_database.csv',
+    'data/processed/drug_indications.csv',
+]
+
+# Runs in a fresh interpreter so every measurement is a cold start
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+import pandas as pd
+if sys.argv[1] == 'feather':
+    import pyarrow.feather as feather
+imported = time.perf_counter()
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.argv[1] == 'csv':
+    df = pd.read_csv(sys.argv[2])
+else:
+    df = feather.read_table(sys.argv[2], memory_map=True).to_pandas()
+loaded = time.perf_counter()
+rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'total': loaded - start, 'load': loaded - imported, 'rows': len(df),
+                  'max_rss_mb': rss_after / 1024, 'load_rss_mb': (rss_after - rss_before) / 1024}))
+"""
+
+
+def measure(kind, path, repeat):
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', CHILD, kind, path],
+                             capture_output=True, text=True, check=True, cwd=ROOT)
+        runs.append(json.loads(out.stdout))
+    return min(runs, key=lambda r: r['total'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start load time and RSS: CSV vs memory-mapped Feather")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'table':<40} {'format':<8} {'rows':>7} {'cold start':>11} {'load':>10} "
+          f"{'max RSS':>10} {'RSS growth':>11}")
+    for csv_path in TABLES:
+        feather_path = str(convert(os.path.join(ROOT, csv_path)))
+        for kind, path in (('csv', os.path.join(ROOT, csv_path)), ('feather', feather_path)):
+            result = measure(kind, path, args.repeat)
+            print(f"{csv_path:<40} {kind:<8} {result['rows']:>7} {result['total'] * 1000:>8.1f} ms "
+                  f"{result['load'] * 1000:>7.1f} ms {result['max_rss_mb']:>7.1f} MB {result['load_rss_mb']:>8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
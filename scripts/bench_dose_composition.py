@@ -0,0 +1,63 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+# Run from the project root: python scripts/bench_dose_composition.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.dose_composition import compose_doses, dose_table
+from src.drug_embeddings import DrugEmbeddingCache
+from src.drug_lookup import available_strengths
+
+# Strengths real tablet lines tend to come in
+COMMON_STRENGTHS = [2.5, 5, 10, 12.5, 20, 25, 40, 50, 75, 80, 100, 125, 150, 200, 250, 300, 325, 400, 500, 600,
+                    750, 800, 1000]
+
+
+def formulary_strengths():
+    """Tablet strengths of every drug in the formulary (OTC list plus drug table)."""
+    names, _ = DrugEmbeddingCache()._formulary()
+    strengths = []
+    for name in names:
+        tablet = available_strengths(name).get('tablet')
+        if tablet:
+            strengths.append(tablet)
+    return strengths
+
+
+def synthetic_strengths(n, seed=0):
+    """n drugs with one to four strengths each."""
+    rng = random.Random(seed)
+    return [tuple(sorted(rng.sample(COMMON_STRENGTHS, rng.randint(1, 4)))) for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch dose composition over a formulary")
+    parser.add_argument('--drugs', type=int, nargs='+', default=[1000, 10000])
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    real = formulary_strengths()
+    cases = [('formulary', real)] + [('synthetic', synthetic_strengths(n)) for n in args.drugs]
+    for kind, strengths in cases:
+        doses = [rng.uniform(0.3, 6) * max(drug) for drug in strengths]
+        dose_table.cache_clear()
+        start = time.perf_counter()
+        compositions = compose_doses(doses, strengths)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        compose_doses(doses, strengths)
+        warm = time.perf_counter() - start
+
+        errors = sorted(abs(c['error_mg']) / dose for c, dose in zip(compositions, doses))
+        units = sum(c['n_units'] for c in compositions) / len(compositions)
+        print(f"{kind:>10} {len(strengths):>6} drugs, {len(set(strengths)):>5} strength sets: "
+              f"cold {cold * 1000:7.1f} ms  warm {warm * 1000:7.1f} ms "
+              f"({warm / len(strengths) * 1e6:5.1f} us/drug)   "
+              f"median error {errors[len(errors) // 2]:.1%}   mean units {units:.1f}")
+
+
+if __name__ == '__main__':
+    main()
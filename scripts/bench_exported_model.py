@@ -0,0 +1,77 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Run from the project root: python scripts/bench_exported_model.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.export_model import export_model
+from src.model_registry import EXPORT_FILES, ModelRegistry
+
+
+def sample_features(preprocessor, n, seed=0):
+    # Rows spread like the training data: standard normal in scaled space, mapped back
+    names = list(preprocessor.feature_names_in_)
+    scaled = np.random.default_rng(seed).normal(size=(n, len(names)))
+    return pd.DataFrame(preprocessor.inverse_transform(scaled), columns=names)
+
+
+def per_row_latency(artifacts, rows, n):
+    timings = []
+    for i in range(n):
+        row = rows.iloc[[i % len(rows)]]
+        start = time.perf_counter()
+        artifacts.run(row)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return statistics.median(timings), timings[min(n - 1, int(n * 0.99))]
+
+
+def throughput(artifacts, rows, batch_size, repeats):
+    artifacts.run(rows, batch_size)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        artifacts.run(rows, batch_size)
+    return len(rows) * repeats / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eager vs NumPy and exported (TorchScript/ONNX) inference")
+    parser.add_argument('--models-dir', default=None)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--batch-size', type=int, default=4096)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('-n', type=int, default=2000, help="Single-row calls for the latency test")
+    args = parser.parse_args()
+
+    eager = ModelRegistry(args.models_dir, backend='eager').get()
+    rows = sample_features(eager.preprocessor, args.rows)
+    reference, reference_classes = eager.run(rows, args.batch_size)
+
+    backends = {'eager': eager, 'numpy': ModelRegistry(args.models_dir, backend='numpy').get()}
+    with tempfile.TemporaryDirectory() as export_dir:
+        for fmt, filename in EXPORT_FILES.items():
+            try:
+                export_model(fmt, args.models_dir, os.path.join(export_dir, filename))
+                backends[fmt] = ModelRegistry(export_dir, backend=fmt).get()
+            except ImportError as e:
+                print(f"❌ Skipping {fmt}: {e}")
+
+        print(f"{'backend':<12} {'p50 row':>10} {'p99 row':>10} {'rows/s':>12} {'max |diff|':>11} {'class agree':>12}")
+        for name, artifacts in backends.items():
+            p50, p99 = per_row_latency(artifacts, rows, args.n)
+            rate = throughput(artifacts, rows, args.batch_size, args.repeats)
+            outputs, classes = artifacts.run(rows, args.batch_size)
+            diff = float(np.abs(outputs - reference).max())
+            agree = float((classes == reference_classes).mean())
+            print(f"{name:<12} {p50:8.1f}us {p99:8.1f}us {rate:12,.0f} {diff:11.2e} {agree:12.4%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+# Run from the project root: python scripts/bench_formulary.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.drug_embeddings import get_drug_embeddings
+from src.predict import predict_formulary
+
+USER_INPUT = {
+    'age': 30,
+    'weight': 68,
+    'sex': 'male',
+    'height': 175,
+    'route_admin': 'oral'
+}
+
+
+def time_calls(n, **kwargs):
+    predict_formulary(USER_INPUT, **kwargs)
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        predict_formulary(USER_INPUT, **kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="One patient against the whole formulary, with and without cached drug embeddings")
+    parser.add_argument('-n', type=int, default=200)
+    args = parser.parse_args()
+
+    cache = get_drug_embeddings()
+    start = time.perf_counter()
+    table = cache.get()
+    print(f"📁 {len(table)} drugs, embeddings built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    full = time_calls(args.n, use_embeddings=False)
+    cached = time_calls(args.n, use_embeddings=True)
+    print(f"full forward pass (predict_many)   p50 = {full:7.2f} ms")
+    print(f"cached drug embeddings             p50 = {cached:7.2f} ms   ({full / cached:.1f}x)")
+
+    a = predict_formulary(USER_INPUT, use_embeddings=True)
+    b = predict_formulary(USER_INPUT, use_embeddings=False)
+    drift = max(float(np.abs(a[k] - b[k]).max()) for k in ('bioavailability', 'tmax', 'cmax', 'dose'))
+    print(f"max |difference| between the two paths: {drift:.2e}")
+
+
+if __name__ == "__main__":
+    main()
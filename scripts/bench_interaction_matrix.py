@@ -0,0 +1,81 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+# Run from the project root: python scripts/bench_interaction_matrix.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.interaction_matrix import InteractionMatrix
+from src.safety_checker import SafetyChecker
+
+
+def synthetic_database(n_drugs, per_drug, seed=0):
+    """Interactions database of n_drugs drugs, each listing per_drug others."""
+    rng = random.Random(seed)
+    names = [f"DRUG-{i:05d}" for i in range(n_drugs)]
+    return names, {name: rng.sample(names, per_drug) for name in names}
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return statistics.median(timings), timings[int(len(timings) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regimen and formulary screening with the interaction matrix")
+    parser.add_argument('--drugs', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--per-drug', type=int, default=20, help="interactions listed per drug")
+    parser.add_argument('--regimen', type=int, nargs='+', default=[5, 10, 20], help="medications per patient")
+    parser.add_argument('-n', type=int, default=100, help="repetitions per measurement")
+    args = parser.parse_args()
+
+    checker = SafetyChecker(aliases={})
+    for n_drugs in args.drugs:
+        names, database = synthetic_database(n_drugs, args.per_drug)
+        start = time.perf_counter()
+        matrix = InteractionMatrix(database, checker.resolve)
+        build = time.perf_counter() - start
+        checker.set_databases(interactions=database)
+        print(f"{n_drugs} drugs, {matrix.n_interactions} interacting pairs: build {build * 1000:.0f} ms")
+
+        rng = random.Random(1)
+        for k in args.regimen:
+            regimens = [rng.sample(names, k) for _ in range(args.n)]
+
+            pair_timings = []
+            mask_timings = []
+            free_timings = []
+            loop_timings = []
+            for regimen in regimens:
+                start = time.perf_counter()
+                matrix.regimen_interactions(regimen)
+                pair_timings.append((time.perf_counter() - start) * 1000)
+
+                start = time.perf_counter()
+                matrix.interacting_with(regimen)
+                mask_timings.append((time.perf_counter() - start) * 1000)
+
+                start = time.perf_counter()
+                matrix.interaction_free(names, regimen)
+                free_timings.append((time.perf_counter() - start) * 1000)
+
+            # The per-drug path the matrix replaces, on a few regimens only
+            for regimen in regimens[:max(1, args.n // 20)]:
+                start = time.perf_counter()
+                [not checker.check_interactions(name, regimen) for name in names]
+                loop_timings.append((time.perf_counter() - start) * 1000)
+
+            pair_p50, pair_p99 = percentiles(pair_timings)
+            mask_p50, mask_p99 = percentiles(mask_timings)
+            free_p50, free_p99 = percentiles(free_timings)
+            print(f"  k={k:>2}: regimen pairs p50 {pair_p50:7.3f} ms p99 {pair_p99:7.3f} ms   "
+                  f"all-drug mask p50 {mask_p50:7.3f} ms p99 {mask_p99:7.3f} ms   "
+                  f"screen by name p50 {free_p50:7.3f} ms p99 {free_p99:7.3f} ms   "
+                  f"per-drug loop p50 {statistics.median(loop_timings):8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import time
+
+# Run from the project root: python scripts/bench_name_resolver.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.name_resolver import NameResolver, build_name_resolver
+from src.rxnorm_lookup import BRAND_NAMES, GENERIC_NAMES
+
+SYLLABLES = ['ab', 'ac', 'al', 'am', 'an', 'ar', 'ax', 'ben', 'cef', 'cil', 'cin', 'cort', 'dex', 'dol',
+             'dro', 'fen', 'flox', 'gli', 'hy', 'ide', 'in', 'ine', 'lam', 'lin', 'lol', 'mab', 'met',
+             'mid', 'mox', 'nib', 'nol', 'oxa', 'pam', 'pra', 'pril', 'pro', 'ram', 'sar', 'tan', 'ter',
+             'til', 'tri', 'vir', 'xa', 'zep', 'zol', 'zo']
+
+
+def syllable_names(n, seed=0):
+    """
+    n distinct names of 3-6 syllables from a small inventory: far more
+    shared trigrams than real drug names, so a worst case for the index.
+    """
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < n:
+        names.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 6))).upper())
+    return sorted(names)
+
+
+def recombined_names(n, real_names, seed=0):
+    """n distinct names spliced from the head of one real drug name and the tail of another."""
+    rng = random.Random(seed)
+    real = [name for name in real_names if 5 <= len(name) <= 30]
+    names = set()
+    while len(names) < n:
+        head, tail = rng.choice(real), rng.choice(real)
+        name = head[:rng.randint(2, len(head) - 1)] + tail[rng.randint(1, len(tail) - 2):]
+        if 5 <= len(name) <= 30:
+            names.add(name.upper())
+    return sorted(names)
+
+
+def typo(name, rng):
+    """name with one random substitution, insertion, deletion or transposition."""
+    i = rng.randrange(len(name))
+    kind = rng.choice('sidt')
+    letter = rng.choice(string.ascii_uppercase)
+    if kind == 's':
+        return name[:i] + letter + name[i + 1:]
+    if kind == 'i':
+        return name[:i] + letter + name[i:]
+    if kind == 'd' and len(name) > 1:
+        return name[:i] + name[i + 1:]
+    if i + 1 < len(name):
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    return name + letter
+
+
+def measure(fn, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of exact and typo-tolerant drug name resolution")
+    parser.add_argument('--names', type=int, nargs='+', default=[10000, 100000, 300000],
+                        help="synthetic names added to the real resolver sources")
+    parser.add_argument('-n', type=int, default=2000, help="queries per measurement")
+    args = parser.parse_args()
+
+    real = build_name_resolver()
+    print(f"Real sources: {len(real)} names")
+    generators = {'recombined': lambda n: recombined_names(n, real.targets), 'syllable': syllable_names}
+    for kind, generate in generators.items():
+        for n in args.names:
+            names = list(real.targets) + generate(n)
+            start = time.perf_counter()
+            resolver = NameResolver(names, GENERIC_NAMES, BRAND_NAMES)
+            build = time.perf_counter() - start
+
+            rng = random.Random(1)
+            sample = [rng.choice(names) for _ in range(args.n)]
+            typos = [typo(name, rng) for name in sample]
+            exact_p50, exact_p99 = measure(resolver.generic_name, sample)
+            typo_p50, typo_p99 = measure(resolver.generic_name, typos)
+            resolved = sum(resolver.generic_name(t) == s for t, s in zip(typos, sample)) / len(sample)
+            print(f"{kind:>10} {len(resolver):>8} names: build {build:5.1f}s   "
+                  f"exact p50 {exact_p50:6.3f} ms p99 {exact_p99:6.3f} ms   "
+                  f"one typo p50 {typo_p50:6.3f} ms p99 {typo_p99:6.3f} ms   resolved {resolved:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Run from the project root: python scripts/bench_predict_latency.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.model_registry import get_registry
+from src.predict import predict_new
+
+USER_INPUT = {
+    'age': 30,
+    'weight': 68,
+    'sex': 'male',
+    'height': 175,
+    'route_admin': 'oral'
+}
+
+
+def time_calls(drug_name, n, cold, use_cache=False):
+    registry = get_registry()
+    timings = []
+    for _ in range(n):
+        if cold:
+            # Reproduces the old behaviour of loading every artifact per call
+            registry.clear()
+        start = time.perf_counter()
+        predict_new(USER_INPUT, drug_name, use_cache=use_cache)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def time_registry(n, cold):
+    registry = get_registry()
+    timings = []
+    for _ in range(n):
+        if cold:
+            registry.clear()
+        start = time.perf_counter()
+        registry.get()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p50 = statistics.median(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{label:<30} p50 = {p50:8.2f} ms   p99 = {p99:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request latency of predict_new")
+    parser.add_argument('--drug', default='NICOTINE')
+    parser.add_argument('-n', type=int, default=200)
+    args = parser.parse_args()
+
+    # Warm up imports and the drug lookup path
+    predict_new(USER_INPUT, args.drug)
+
+    print("Artifact access")
+    report("  load from disk", time_registry(max(1, args.n // 10), cold=True))
+    report("  resident", time_registry(args.n, cold=False))
+
+    print(f"predict_new('{args.drug}')")
+    report("  reload artifacts per call", time_calls(args.drug, max(1, args.n // 10), cold=True))
+    report("  resident artifacts", time_calls(args.drug, args.n, cold=False))
+    report("  result cache hits", time_calls(args.drug, args.n, cold=False, use_cache=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Run from the project root: python scripts/bench_startup.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+API_STARTUP = """
+import asyncio, json, time
+start = time.perf_counter()
+import src.api.main as api
+imported = time.perf_counter()
+async def startup():
+    async with api.lifespan(api.app):
+        return time.perf_counter()
+ready = asyncio.run(startup())
+print(json.dumps({'import_ms': (imported - start) * 1000, 'ready_ms': (ready - start) * 1000}))
+"""
+
+
+def import_profile(module):
+    """Run python -X importtime on one import; returns (total ms, [(cumulative ms, name)])."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        entries.append((int(cumulative) / 1000, name.rstrip()))
+    # Top-level imports are the unindented names; their cumulative times add up to the total
+    total = sum(ms for ms, name in entries if not name.startswith('  '))
+    return total, entries
+
+
+def time_to_first_prompt():
+    """Wall time from launching python -m src.simulate until it asks for the first input."""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-m', 'src.simulate'], cwd=ROOT, stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    seen = b''
+    try:
+        while b'Age:' not in seen:
+            chunk = process.stdout.read1(1024)
+            if not chunk:
+                raise RuntimeError("src.simulate exited before prompting")
+            seen += chunk
+        return (time.perf_counter() - start) * 1000
+    finally:
+        process.kill()
+        process.wait()
+
+
+def api_startup():
+    result = subprocess.run([sys.executable, '-c', API_STARTUP], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start time of the simulate CLI and the API app")
+    parser.add_argument('-n', type=int, default=5, help="Fresh interpreter runs per measurement")
+    parser.add_argument('--top', type=int, default=8, help="Slowest imports to list per target")
+    parser.add_argument('--json', action='store_true', help="Print one JSON summary line for tracking")
+    args = parser.parse_args()
+
+    summary = {}
+    for label, module in (('simulate', 'src.simulate'), ('api', 'src.api.main')):
+        runs = [import_profile(module) for _ in range(args.n)]
+        summary[f'{label}_import_ms'] = statistics.median(total for total, _ in runs)
+        if not args.json:
+            print(f"\n{module}: import {summary[f'{label}_import_ms']:.0f} ms (median of {args.n})")
+            _, entries = runs[-1]
+            for ms, name in sorted(entries, reverse=True)[:args.top]:
+                print(f"  {ms:8.1f} ms  {name.strip()}")
+
+    summary['simulate_first_prompt_ms'] = statistics.median(time_to_first_prompt() for _ in range(args.n))
+    api_runs = [api_startup() for _ in range(args.n)]
+    summary['api_ready_ms'] = statistics.median(run['ready_ms'] for run in api_runs)
+
+    if args.json:
+        print(json.dumps({key: round(value, 1) for key, value in summary.items()}))
+        return
+    print(f"\npython -m src.simulate to first prompt: {summary['simulate_first_prompt_ms']:.0f} ms")
+    print(f"API import + lifespan startup (model loaded): {summary['api_ready_ms']:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+# Run from the project root: python scripts/bench_symptom_search.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.indication_index import DEFAULT_CSV_PATH, IndicationIndex
+from src.symptom_search import SymptomSearchIndex
+
+QUERIES = [
+    ['headache'],
+    ['fever', 'cough'],
+    ['back pain'],
+    ['pain', 'fever', 'common cold'],
+    ['rheumatoid arthritis', 'fatigue'],
+    ['cancer'],
+]
+
+
+def scaled_frame(scale):
+    """Replicate the indication table with renamed drugs to mimic a larger ChEMBL release."""
+    df = pd.read_csv(DEFAULT_CSV_PATH)
+    if scale <= 1:
+        return df
+    copies = [df]
+    for i in range(1, scale):
+        copy = df.copy()
+        copy['drug_name'] = copy['drug_name'].astype(str) + f' #{i}'
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of ranked symptom-to-drug search")
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('-n', type=int, default=200, help="repetitions per query")
+    args = parser.parse_args()
+
+    for scale in args.scale:
+        df = scaled_frame(scale)
+        start = time.perf_counter()
+        search = SymptomSearchIndex(IndicationIndex.from_frame(df))
+        build = time.perf_counter() - start
+
+        timings = []
+        for query in QUERIES:
+            for _ in range(args.n):
+                start = time.perf_counter()
+                search.search(query, k=10)
+                timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p99 = timings[int(len(timings) * 0.99)]
+        print(f"{len(df):>9} pairs, {len(search.drugs):>7} drugs: build {build:6.2f}s   "
+              f"p50 {statistics.median(timings):6.3f} ms   p99 {p99:6.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import argparse
+import os
+import sys
+import tempfile
+
+# Run from the project root: python scripts/bench_train_scaling.py --source data/chembl/chembl_35.db
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.train_distributed import train_distributed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speedup of distributed training with the process count")
+    parser.add_argument('--source', help="CSV or ChEMBL SQLite file to train on")
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--epochs', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--chunksize', type=int, default=10_000)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.processes:
+            stats = train_distributed(world_size=n, source=args.source, epochs=args.epochs,
+                                      batch_size=args.batch_size, chunksize=args.chunksize,
+                                      output_path=os.path.join(tmp, f'absorpgen_{n}.pt'))
+            # Skip the first epoch: it includes process start-up and cold caches
+            steady = stats[1:] or stats
+            rows = sum(s['rows'] for s in steady)
+            seconds = sum(s['seconds'] for s in steady)
+            results[n] = rows / seconds
+
+    baseline = results[args.processes[0]]
+    print("\nprocesses   rows/s       speedup")
+    for n, throughput in results.items():
+        print(f"{n:>9}   {throughput:>10,.0f}   {throughput / baseline:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
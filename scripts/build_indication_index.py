@@ -0,0 +1,33 @@
+import argparse
+import os
+import sys
+import time
+
+# Run from the project root: python scripts/build_indication_index.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.indication_index import DEFAULT_CSV_PATH, DEFAULT_INDEX_PATH, IndicationIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the binary drug/condition indication index")
+    parser.add_argument('--csv', default=str(DEFAULT_CSV_PATH), help="drug_indications.csv to index")
+    parser.add_argument('--sqlite', help="Build from a ChEMBL SQLite database instead of the CSV")
+    parser.add_argument('--output', default=str(DEFAULT_INDEX_PATH))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.sqlite:
+        index = IndicationIndex.from_sqlite(args.sqlite)
+    else:
+        index = IndicationIndex.from_csv(args.csv)
+    index.save(args.output)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ Indexed {len(index.drugs)} drugs and {len(index.conditions)} conditions "
+          f"({len(index.drug_conditions)} pairs) in {elapsed:.2f}s")
+    print(f"📁 Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
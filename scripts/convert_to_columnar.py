@@ -0,0 +1,33 @@
+import argparse
+import os
+import sys
+import time
+
+# Run from the project root: python scripts/convert_to_columnar.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.columnar_store import convert
+
+DEFAULT_TABLES = [
+    'data/raw/chembl_drug_database.csv',
+    'data/processed/drug_indications.csv',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write Feather copies of the CSV tables the app loads")
+    parser.add_argument('csv', nargs='*', default=DEFAULT_TABLES)
+    args = parser.parse_args()
+
+    for csv_path in args.csv:
+        if not os.path.exists(csv_path):
+            print(f"❌ {csv_path} not found, skipping")
+            continue
+        start = time.perf_counter()
+        output_path = convert(csv_path)
+        print(f"✅ {csv_path} -> {output_path} ({os.path.getsize(output_path) / 1e6:.1f} MB) "
+              f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
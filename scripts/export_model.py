@@ -0,0 +1,28 @@
+import argparse
+import os
+import sys
+import time
+
+# Run from the project root: python scripts/export_model.py --format onnx
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.export_model import export_model
+from src.model_registry import EXPORT_FILES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the trained model with its scaling folded in")
+    parser.add_argument('--format', choices=sorted(EXPORT_FILES), default='torchscript')
+    parser.add_argument('--models-dir', default=None, help="Defaults to ABSORPGEN_MODELS_DIR or models/")
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    output_path = export_model(args.format, args.models_dir, args.output)
+    print(f"✅ Exported {args.format} model to {output_path} "
+          f"({os.path.getsize(output_path) / 1e3:.1f} kB) in {time.perf_counter() - start:.2f}s")
+    print(f"📁 Serve it with ABSORPGEN_MODEL_BACKEND={args.format}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,33 @@
+import argparse
+import os
 import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 import pandas as pd
-import os
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+# Run from the project root: python scripts/extract_drugs_from_chembl.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.drug_store import DEFAULT_DB_PATH
 
 # Final database location
 DB_PATH = "data/chembl/chembl_35.db"
+# The drug table itself. Its Feather mirror is only a cache of the CSV and is
+# rewritten from it whenever the CSV is newer, so it is never the output.
+OUTPUT_PATH = DEFAULT_DB_PATH
 
-# Connect to ChEMBL database
-conn = sqlite3.connect(DB_PATH)
-
-# SQL query: Join molecule name + molecular properties
+# SQL query: Join molecule name + molecular properties for one molregno range
 query = """
 SELECT
+    cp.molregno AS molregno,
     md.pref_name AS drug_name,
     cp.mw_freebase AS molecular_weight,
     cp.alogp AS logP,
@@ -20,24 +37,191 @@ FROM
 JOIN
     molecule_dictionary md ON cp.molregno = md.molregno
 WHERE
-    md.pref_name IS NOT NULL
+    cp.molregno >= ? AND cp.molregno < ?
+    AND md.pref_name IS NOT NULL
     AND cp.mw_freebase IS NOT NULL
     AND cp.alogp IS NOT NULL
     AND cp.cx_most_bpka IS NOT NULL
-LIMIT 100;
+ORDER BY cp.molregno;
 """
 
-# Run and load into DataFrame
-df = pd.read_sql_query(query, conn)
-conn.close()
+SCHEMA = pa.schema([
+    ('molregno', pa.int64()),
+    ('drug_name', pa.string()),
+    ('molecular_weight', pa.float64()),
+    ('logP', pa.float64()),
+    ('pKa', pa.float64()),
+    ('bioavailability', pa.float64()),
+    ('strength_mg_per_unit', pa.float64()),
+    ('formulation_concentration', pa.float64()),
+])
+
+
+def connect_read_only(db_path):
+    return sqlite3.connect(f"file:{Path(db_path).resolve()}?mode=ro", uri=True)
+
+
+def molregno_bounds(db_path):
+    conn = connect_read_only(db_path)
+    try:
+        return conn.execute("SELECT MIN(molregno), MAX(molregno) FROM compound_properties").fetchone()
+    finally:
+        conn.close()
+
+
+def extract_range(db_path, start, stop):
+    """Query one [start, stop) molregno range on its own read-only connection."""
+    conn = connect_read_only(db_path)
+    try:
+        df = pd.read_sql_query(query, conn, params=(start, stop))
+    finally:
+        conn.close()
+
+    # Add placeholder fields for ML integration
+    df["bioavailability"] = 0.8  # Placeholder
+    df["strength_mg_per_unit"] = 200  # Default tablet size
+    df["formulation_concentration"] = 40  # mg/mL for liquids
+    return pa.Table.from_pandas(df, schema=SCHEMA, preserve_index=False)
+
+
+class ColumnarWriter:
+    """Append Arrow tables to a Parquet, Feather or CSV file as they arrive."""
+    def __init__(self, path, fmt):
+        self.fmt = fmt
+        self.rows = 0
+        if fmt == 'parquet':
+            self._writer = pq.ParquetWriter(path, SCHEMA)
+        elif fmt == 'feather':
+            self._sink = pa.OSFile(str(path), 'wb')
+            self._writer = ipc.new_file(self._sink, SCHEMA)
+        else:
+            self._path = path
+            self._header = True
+
+    def write(self, table):
+        if table.num_rows == 0:
+            return
+        self.rows += table.num_rows
+        if self.fmt == 'csv':
+            table.to_pandas().to_csv(self._path, mode='w' if self._header else 'a',
+                                     header=self._header, index=False)
+            self._header = False
+        else:
+            self._writer.write_table(table)
+
+    def close(self):
+        if self.fmt == 'parquet':
+            self._writer.close()
+        elif self.fmt == 'feather':
+            self._writer.close()
+            self._sink.close()
+
+
+def read_existing(path, fmt):
+    """Yield the already extracted rows as Arrow tables, batch by batch."""
+    if fmt == 'parquet':
+        parquet_file = pq.ParquetFile(path)
+        for i in range(parquet_file.num_row_groups):
+            yield parquet_file.read_row_group(i)
+    elif fmt == 'feather':
+        with pa.memory_map(str(path)) as source:
+            reader = ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield pa.Table.from_batches([reader.get_batch(i)])
+    else:
+        for df in pd.read_csv(path, chunksize=100_000):
+            yield pa.Table.from_pandas(df, schema=SCHEMA, preserve_index=False)
+
+
+def last_molregno(path, fmt):
+    """
+    Highest molregno already present in an earlier extract, or None when it
+    is empty or has no molregno column (e.g. the drug table shipped in the repo).
+    """
+    if fmt == 'parquet':
+        if 'molregno' not in pq.read_schema(path).names:
+            return None
+        column = pq.read_table(path, columns=['molregno'])['molregno']
+    elif fmt == 'feather':
+        with pa.memory_map(str(path)) as source:
+            if 'molregno' not in ipc.open_file(source).schema.names:
+                return None
+        column = feather.read_table(path, columns=['molregno'], memory_map=True)['molregno']
+    else:
+        if 'molregno' not in pd.read_csv(path, nrows=0).columns:
+            return None
+        column = pa.array(pd.read_csv(path, usecols=['molregno'])['molregno'])
+    if len(column) == 0:
+        return None
+    return pc.max(column).as_py()
+
+
+def extract(db_path=DB_PATH, output_path=OUTPUT_PATH, fmt=None, range_size=50_000,
+            workers=None, incremental=False):
+    """
+    Page through compound_properties by molregno range, querying ranges in
+    parallel processes, and stream the rows to a columnar file in molregno
+    order. With incremental=True only molregnos above the highest one in the
+    existing output are queried; the old rows are copied over batch by batch.
+    """
+    output_path = Path(output_path)
+    fmt = fmt or output_path.suffix.lstrip('.') or 'csv'
+    workers = workers or os.cpu_count() or 1
+
+    low, high = molregno_bounds(db_path)
+    if low is None:
+        print("❌ compound_properties is empty")
+        return 0
+
+    previous_rows = None
+    if incremental and output_path.exists():
+        last = last_molregno(output_path, fmt)
+        # Without molregnos there is nothing to resume from; extract everything
+        if last is not None:
+            low = max(low, last + 1)
+            previous_rows = read_existing(output_path, fmt)
+            if low > high:
+                print(f"✅ {output_path} is up to date (last molregno {last})")
+                return 0
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    writer = ColumnarWriter(tmp_path, fmt)
+    copied = 0
+    try:
+        if previous_rows is not None:
+            for table in previous_rows:
+                writer.write(table)
+            copied = writer.rows
+
+        ranges = [(start, min(start + range_size, high + 1)) for start in range(low, high + 1, range_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Keep a bounded window of ranges in flight and write them back in order
+            pending = []
+            for start, stop in ranges:
+                pending.append(executor.submit(extract_range, db_path, start, stop))
+                if len(pending) >= workers * 2:
+                    writer.write(pending.pop(0).result())
+            for future in pending:
+                writer.write(future.result())
+    finally:
+        writer.close()
+    os.replace(tmp_path, output_path)
+    return writer.rows - copied
 
-# Add placeholder fields for ML integration
-df["bioavailability"] = 0.8  # Placeholder
-df["strength_mg_per_unit"] = 200  # Default tablet size
-df["formulation_concentration"] = 40  # mg/mL for liquids
 
-# Save to CSV
-output_path = "data/raw/chembl_drug_database.csv"
-df.to_csv(output_path, index=False)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract drug properties from a ChEMBL SQLite database")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--output', default=OUTPUT_PATH,
+                        help="Output file (.parquet, .feather or .csv); the default is the drug table the app reads")
+    parser.add_argument('--format', choices=['parquet', 'feather', 'csv'], help="Defaults to the output suffix")
+    parser.add_argument('--range-size', type=int, default=50_000, help="molregnos per query")
+    parser.add_argument('--workers', type=int, help="Parallel read-only connections (default: one per core)")
+    parser.add_argument('--incremental', action='store_true', help="Only extract molregnos newer than the existing output")
+    args = parser.parse_args()
 
-print(f"✅ Extracted {len(df)} entries to {output_path}")
+    start = time.perf_counter()
+    added = extract(args.db, args.output, fmt=args.format, range_size=args.range_size,
+                    workers=args.workers, incremental=args.incremental)
+    print(f"✅ Extracted {added} new entries to {args.output} in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+# Start the API first, e.g.: uvicorn src.api.main:app --port 8000
+PATIENT = {
+    'age': 30,
+    'weight': 68,
+    'sex': 'male',
+    'height': 175,
+    'route_admin': 'oral'
+}
+
+
+async def client_loop(client, url, drug, deadline, latencies, statuses, vary):
+    while time.perf_counter() < deadline:
+        patient = dict(PATIENT)
+        if vary:
+            # Distinct inputs so the result cache does not answer everything
+            patient['age'] = random.randint(18, 90)
+            patient['weight'] = round(random.uniform(40, 120), 1)
+        start = time.perf_counter()
+        try:
+            response = await client.post(f"{url}/predict", params={'drug_name': drug}, json=patient)
+            statuses[response.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+            continue
+        if response.status_code == 503:
+            # Back off like a well-behaved client when the server sheds load
+            await asyncio.sleep(float(response.headers.get('Retry-After', 1)) / 10)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def health_probe(client, url, deadline, latencies):
+    """Measures /health while predictions are in flight to show the loop is not blocked."""
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get(f"{url}/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.05)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else float('nan')
+
+
+async def run(url, drug, concurrency, duration, vary):
+    latencies = []
+    health_latencies = []
+    statuses = Counter()
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+        start = time.perf_counter()
+        await asyncio.gather(
+            health_probe(client, url, deadline, health_latencies),
+            *(client_loop(client, url, drug, deadline, latencies, statuses, vary) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - start
+
+    ok = statuses.get(200, 0)
+    print(f"concurrency {concurrency:>4}: {ok / elapsed:8.1f} req/s   "
+          f"p50 {statistics.median(latencies) if latencies else float('nan'):7.1f} ms   "
+          f"p99 {percentile(latencies, 0.99):7.1f} ms   "
+          f"/health p99 {percentile(health_latencies, 0.99):6.1f} ms   "
+          f"statuses {dict(statuses)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test for POST /predict")
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--drug', default='NICOTINE')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 128])
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument('--same-input', action='store_true', help="Repeat one patient (measures cache hits)")
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        asyncio.run(run(args.url, args.drug, concurrency, args.duration, vary=not args.same_input))
+
+
+if __name__ == "__main__":
+    main()
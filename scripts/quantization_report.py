@@ -0,0 +1,97 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import torch
+
+# Run from the project root: python scripts/quantization_report.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_loader import load_data
+from src.model import BioavailabilityMLP
+from src.model_registry import ModelRegistry
+from src.quantization import drift_report, quantize_dynamic, serialized_size
+
+
+def per_row_latency(run, X, n):
+    timings = []
+    for i in range(n):
+        row = X[i % len(X):i % len(X) + 1]
+        start = time.perf_counter()
+        run(row)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+
+def throughput(run, X, repeats):
+    run(X)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        run(X)
+    return len(X) * repeats / (time.perf_counter() - start)
+
+
+def forward(model):
+    def run(X):
+        with torch.no_grad():
+            return model(torch.from_numpy(X))
+    return run
+
+
+def print_comparison(name, model, quantized, X, n, repeats):
+    print(f"\n{name}")
+    print(f"  weights       float32 {serialized_size(model) / 1e3:8.1f} kB   int8 {serialized_size(quantized) / 1e3:8.1f} kB")
+    for label, m in (('float32', model), ('int8', quantized)):
+        run = forward(m)
+        print(f"  {label:<8} p50 row {per_row_latency(run, X, n):8.1f} us   {throughput(run, X, repeats):12,.0f} rows/s")
+
+
+def print_drift(report):
+    print(f"  {'target':<16} {'MAE':>10} {'max |err|':>10} {'relative':>9}")
+    for target, stats in report.items():
+        if isinstance(stats, dict):
+            print(f"  {target:<16} {stats['mae']:10.4g} {stats['max_abs']:10.4g} {stats['relative']:9.2%}")
+    if 'class_agreement' in report:
+        print(f"  formulation class agreement: {report['class_agreement']:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy drift and speed of dynamic int8 quantization")
+    parser.add_argument('--models-dir', default=None)
+    parser.add_argument('--rows', type=int, default=50_000, help="Rows of the training table to evaluate on")
+    parser.add_argument('-n', type=int, default=2000, help="Single-row calls for the latency test")
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    artifacts = ModelRegistry(args.models_dir, backend='eager').get()
+    X_raw, _, _ = load_data()
+    X_raw = X_raw.head(args.rows)
+    X = artifacts.runtime.prepare(X_raw)
+    print(f"📁 Evaluating on {len(X):,} rows")
+
+    model = artifacts.model
+    quantized = quantize_dynamic(model)
+    print_comparison("AbsorpGenMultiTaskModel", model, quantized, X, args.n, args.repeats)
+    reg, logits = forward(model)(X)
+    q_reg, q_logits = forward(quantized)(X)
+    print_drift(drift_report(reg.numpy(), q_reg.numpy(),
+                             logits.argmax(dim=1).numpy(), q_logits.argmax(dim=1).numpy()))
+
+    mlp_path = ModelRegistry(args.models_dir).models_dir / 'mlp_bioavailability.pt'
+    if mlp_path.exists():
+        mlp = BioavailabilityMLP(X.shape[1])
+        try:
+            mlp.load_state_dict(torch.load(mlp_path, map_location='cpu'))
+        except RuntimeError:
+            print(f"\n❌ {mlp_path.name} does not match the current BioavailabilityMLP layout, skipping")
+            return
+        mlp.eval()
+        q_mlp = quantize_dynamic(mlp)
+        print_comparison("BioavailabilityMLP", mlp, q_mlp, X, args.n, args.repeats)
+        print_drift(drift_report(forward(mlp)(X).numpy(), forward(q_mlp)(X).numpy()))
+
+
+if __name__ == "__main__":
+    main()
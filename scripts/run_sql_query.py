@@ -1,7 +1,11 @@
 import sqlite3
+import sys
 import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.indication_index import IndicationIndex
+
 # Path to your ChEMBL database
 db_path = Path("data/chembl/chembl_35.db")
 
@@ -33,6 +37,11 @@ try:
     df.to_csv(output_path, index=False)
     print(f"📁 Saved to {output_path}")
 
+    # Rebuild the binary index the app loads instead of parsing the CSV
+    index = IndicationIndex.from_csv(output_path)
+    index.save()
+    print(f"📁 Indexed {len(index.drugs)} drugs for fast lookups")
+
 except Exception as e:
     print(f"❌ Error running SQL query: {e}")
 
@@ -0,0 +1,127 @@
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Run from the project root: python scripts/safety_stub_server.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.safety_sync import ENDPOINTS
+
+_RANGE = re.compile(r'^last_updated:([\[{])(.+?) TO \*\]$')
+
+
+def synthetic_records(n, seed=0, start=0):
+    """n delta records per dataset with increasing last_updated values."""
+    rng = random.Random(seed)
+    drugs = [f"DRUG-{i:05d}" for i in range(max(10, n // 5))]
+    records = {}
+    for dataset in ENDPOINTS:
+        records[dataset] = [{
+            'drug': rng.choice(drugs),
+            'term': rng.choice(drugs),
+            'action': 'remove' if rng.random() < 0.1 else 'add',
+            'last_updated': f"{start + i:012d}",
+        } for i in range(n)]
+    return records
+
+
+class DeltaFeed:
+    """Delta records per dataset, kept sorted by last_updated; safe to extend while serving."""
+    def __init__(self, records=None):
+        self._lock = threading.Lock()
+        self.records = {dataset: [] for dataset in ENDPOINTS}
+        if records:
+            self.extend(records)
+
+    def extend(self, records):
+        with self._lock:
+            for dataset, new in records.items():
+                self.records[dataset] = sorted(self.records[dataset] + list(new),
+                                               key=lambda record: str(record['last_updated']))
+
+    def query(self, dataset, search=None):
+        with self._lock:
+            records = self.records[dataset]
+        if not search:
+            return records
+        match = _RANGE.match(search)
+        if not match:
+            raise ValueError(f"Unsupported search: {search}")
+        inclusive, since = match.group(1) == '[', match.group(2)
+        return [r for r in records if str(r['last_updated']) > since or (inclusive and str(r['last_updated']) == since)]
+
+
+def make_server(feed, host='127.0.0.1', port=0):
+    """
+    An HTTP server answering the OpenFDA-style delta queries safety_sync
+    makes (search on last_updated, skip, limit) from feed.
+    """
+    datasets = {'/' + path: dataset for dataset, path in ENDPOINTS.items()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            dataset = datasets.get(url.path)
+            if dataset is None:
+                return self._send(404, {'error': {'code': 'NOT_FOUND', 'message': 'Not found'}})
+            params = {name: values[0] for name, values in parse_qs(url.query).items()}
+            try:
+                matches = feed.query(dataset, params.get('search'))
+                skip, limit = int(params.get('skip', 0)), int(params.get('limit', 1))
+            except ValueError as e:
+                return self._send(400, {'error': {'code': 'BAD_REQUEST', 'message': str(e)}})
+            if not matches:
+                return self._send(404, {'error': {'code': 'NOT_FOUND', 'message': 'No matches found!'}})
+            self._send(200, {
+                'meta': {'results': {'skip': skip, 'limit': limit, 'total': len(matches)}},
+                'results': matches[skip:skip + limit],
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the safety database update endpoint")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--mirror', help="JSON file of {dataset: [records]} to serve (e.g. from sync_safety_db.py --export-mirror)")
+    parser.add_argument('--synthetic', type=int, default=0, help="serve this many generated records per dataset")
+    args = parser.parse_args()
+
+    feed = DeltaFeed()
+    if args.mirror:
+        with open(args.mirror) as f:
+            feed.extend(json.load(f))
+    if args.synthetic:
+        feed.extend(synthetic_records(args.synthetic))
+
+    server = make_server(feed, args.host, args.port)
+    total = sum(len(records) for records in feed.records.values())
+    print(f"🧪 Serving {total} safety delta records on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import json
+import os
+import sys
+
+# Run from the project root: python scripts/sync_safety_db.py --url http://127.0.0.1:8765
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.safety_checker import SafetyChecker
+from src.safety_store import DATASETS, DEFAULT_STORE_PATH, SafetyStore
+from src.safety_sync import DEFAULT_PAGE_SIZE
+
+
+def export_mirror(store, path):
+    """Write the store's current contents as delta records a mirror (safety_stub_server.py --mirror) can serve."""
+    databases, _ = store.load()
+    records = {}
+    for dataset in DATASETS:
+        cursor = store.cursor(dataset) or '0'
+        records[dataset] = [{'drug': drug, 'term': term, 'action': 'add', 'last_updated': cursor}
+                            for drug, terms in databases[dataset].items() for term in terms]
+    with open(path, 'w') as f:
+        json.dump(records, f)
+    return sum(len(dataset_records) for dataset_records in records.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pull safety database updates into the local safety store")
+    parser.add_argument('--url', default=os.environ.get('ABSORPGEN_SAFETY_SYNC_URL'),
+                        help="OpenFDA-compatible endpoint (default: $ABSORPGEN_SAFETY_SYNC_URL)")
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH)
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument('--workers', type=int, default=8, help="concurrent page requests")
+    parser.add_argument('--export-mirror', help="after syncing, write the store to this JSON file for offline mirrors")
+    args = parser.parse_args()
+
+    store = SafetyStore(args.store)
+    if args.url:
+        checker = SafetyChecker(store=store)
+        summary = checker.update_databases(args.url, page_size=args.page_size, workers=args.workers)
+        for dataset in DATASETS:
+            counts = summary[dataset]
+            print(f"🔄 {dataset}: {counts['received']} records received, {counts['applied']} changes applied")
+        print(f"✅ Synced {store.path} in {summary['seconds']:.2f}s")
+    elif not args.export_mirror:
+        parser.error("--url (or ABSORPGEN_SAFETY_SYNC_URL) is required")
+
+    if args.export_mirror:
+        n = export_mirror(store, args.export_mirror)
+        print(f"💾 Wrote {n} records to {args.export_mirror}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,75 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional, List
 import sys
 import os
 
-# Add the parent directory to the path so we can import our modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from predict import predict_new
-from safety_checker import SafetyChecker
+# Add the project root to the path so the src package is importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.prediction_cache import get_prediction_cache
+from src.inference_pool import PoolSaturated, pool_from_env
+from src.batcher import MicroBatcher, batch_settings_from_env
+
+# src.predict pulls in pandas and the model stack; it is imported on first use
+# (normally by lifespan) so importing the app stays cheap
+
+def predict_new(user_input, drug_name):
+    from src.predict import predict_new
+    return predict_new(user_input, drug_name)
+
+def predict_new_many(requests):
+    from src.predict import predict_new_many
+    return predict_new_many(requests)
+
+def predict_many(patients, drug_names):
+    from src.predict import predict_many
+    return predict_many(patients, drug_names)
+
+def rank_formulary(user_input, k, rank_by):
+    from src.formulary import rank_formulary
+    return rank_formulary(user_input, k=k, rank_by=rank_by, safety_checker=get_safety_checker())
+
+def get_safety_checker():
+    # Refreshed from the safety store on every call, so database syncs apply without a restart
+    from src.safety_checker import get_safety_checker
+    return get_safety_checker()
+
+# Blocking inference runs here, never on the event loop
+inference_pool = pool_from_env()
+
+# Concurrent /predict calls are coalesced into one forward pass per window
+batch_window_ms, batch_max_size = batch_settings_from_env()
+batcher = None
+if batch_window_ms > 0:
+    batcher = MicroBatcher(predict_new_many, window_ms=batch_window_ms,
+                           max_batch_size=batch_max_size, runner=inference_pool.run)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Import the prediction stack and load the model artifacts once per worker before serving requests
+    try:
+        from src.model_registry import get_registry
+        import src.predict
+        get_registry().get()
+        get_safety_checker()
+        # Drug embeddings for /formulary/rank
+        from src.drug_embeddings import get_drug_embeddings
+        get_drug_embeddings().get()
+    except Exception as e:
+        print(f"Warning: could not preload model artifacts: {str(e)}")
+    yield
+    if batcher is not None:
+        await batcher.close()
+    inference_pool.shutdown()
 
 app = FastAPI(
     title="AbsorpGen AI API",
     description="API for personalized drug recommendations and pharmacokinetic predictions",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# Initialize safety checker
-safety_checker = SafetyChecker()
-
 class UserInput(BaseModel):
     age: int
     weight: float
@@ -38,6 +90,28 @@ class DrugRecommendation(BaseModel):
     cmax: float
     warnings: List[str]
     brand_name: Optional[str] = None
+    switched_from: Optional[str] = None
+
+class BatchPredictionRequest(BaseModel):
+    patients: List[UserInput]
+    drug_names: List[str]
+
+class BatchPrediction(BaseModel):
+    drug_name: List[str]
+    recommended_formulation: List[str]
+    bioavailability: List[float]
+    tmax: List[float]
+    cmax: List[float]
+    dose: List[float]
+
+class RankedDrug(BaseModel):
+    drug_name: str
+    recommended_formulation: str
+    bioavailability: float
+    tmax: float
+    cmax: float
+    dose: float
+    warnings: List[str]
 
 @app.post("/predict", response_model=DrugRecommendation)
 async def predict_drug_recommendation(user_input: UserInput, drug_name: str):
@@ -46,14 +120,17 @@ async def predict_drug_recommendation(user_input: UserInput, drug_name: str):
     """
     try:
         # Convert Pydantic model to dict for our existing predict function
-        user_input_dict = user_input.dict()
+        user_input_dict = user_input.model_dump()
         
-        # Call our existing prediction function
-        prediction = predict_new(user_input_dict, drug_name)
+        # Call our existing prediction function on the inference pool, batched with concurrent requests
+        if batcher is not None:
+            prediction = await batcher.submit(user_input_dict, drug_name)
+        else:
+            prediction = await inference_pool.run(predict_new, user_input_dict, drug_name)
         
-        # Check for safety issues
-        warnings = safety_checker.check_safety(
-            drug_name=drug_name,
+        # Check for safety issues with the drug actually recommended
+        warnings = get_safety_checker().check_safety(
+            drug_name=prediction['final_drug_used'],
             current_medications=user_input.current_medications,
             allergies=user_input.allergies,
             conditions=user_input.medical_conditions
@@ -68,10 +145,84 @@ async def predict_drug_recommendation(user_input: UserInput, drug_name: str):
             tmax=prediction['tmax'],
             cmax=prediction['cmax'],
             warnings=warnings,
-            brand_name=prediction.get('brand_name')
+            brand_name=prediction.get('brand_name'),
+            switched_from=prediction.get('switched_from')
         )
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/batch", response_model=BatchPrediction)
+async def predict_batch(request: BatchPredictionRequest):
+    """
+    Predict pharmacokinetics for many patient/drug pairs in one pass.
+    Pass one drug name to score every patient against it, or one name per patient.
+    Results are returned column-wise in the order of the request.
+    """
+    drug_names = request.drug_names
+    if not request.patients:
+        raise HTTPException(status_code=400, detail="patients must not be empty.")
+    if not drug_names:
+        raise HTTPException(status_code=400, detail="drug_names must not be empty.")
+    if len(drug_names) == 1:
+        drug_names = drug_names[0]
+    elif len(drug_names) != len(request.patients):
+        raise HTTPException(status_code=400,
+                            detail=f"Got {len(request.patients)} patients but {len(drug_names)} drug names; "
+                                   "pass one drug name or one per patient.")
+    try:
+        patients = [patient.model_dump() for patient in request.patients]
+        predictions = await inference_pool.run(predict_many, patients, drug_names)
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return BatchPrediction(
+        drug_name=predictions['drug_name'].tolist(),
+        recommended_formulation=predictions['recommended_formulation'].tolist(),
+        bioavailability=predictions['bioavailability'].tolist(),
+        tmax=predictions['tmax'].tolist(),
+        cmax=predictions['cmax'].tolist(),
+        dose=predictions['dose'].tolist()
+    )
+
+@app.post("/formulary/rank", response_model=List[RankedDrug])
+async def rank_drugs(user_input: UserInput, k: int = Query(10, ge=1, le=100),
+                     rank_by: str = Query('bioavailability', pattern='^(bioavailability|cmax)$')):
+    """
+    The k best drugs for this patient across the whole formulary, ranked by
+    predicted bioavailability or cmax. Drugs with safety warnings for the
+    patient's medications, allergies or conditions are left out.
+    """
+    try:
+        ranked = await inference_pool.run(rank_formulary, user_input.model_dump(), k, rank_by)
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return [RankedDrug(**drug) for drug in ranked]
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """
+    Hit/miss counters of the prediction cache in this worker.
+    """
+    return get_prediction_cache().stats()
+
+@app.get("/inference/stats")
+async def inference_stats():
+    """
+    Running and queued inference calls in this worker.
+    """
+    stats = inference_pool.stats()
+    stats['batching'] = batcher.stats() if batcher is not None else None
+    return stats
 
 @app.get("/health")
 async def health_check():
@@ -0,0 +1,113 @@
+import asyncio
+import os
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent requests into batched calls.
+
+    The first request to arrive opens a window of window_ms milliseconds;
+    everything submitted until the window closes (or max_batch_size requests
+    have arrived) is handed to batch_fn as one list. batch_fn returns one
+    entry per request, either a result or an exception, and each awaiting
+    caller receives its own entry. Batches run through runner (for example
+    InferencePool.run) so the event loop never executes them, and the next
+    window starts collecting while the previous batch is still running.
+    """
+    def __init__(self, batch_fn, window_ms=3.0, max_batch_size=64, runner=None):
+        self.batch_fn = batch_fn
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.runner = runner
+        self.batches = 0
+        self.requests = 0
+        self._queue = None
+        self._collector = None
+        self._running = set()
+
+    def _ensure_started(self):
+        if self._collector is None or self._collector.done():
+            self._queue = asyncio.Queue()
+            self._collector = asyncio.get_running_loop().create_task(self._collect())
+
+    async def submit(self, *request):
+        """Queue one request and wait for its result."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((request, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch_size:
+                # Take whatever is already queued before waiting on the clock
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            task = loop.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch):
+        # Callers that gave up (e.g. client disconnected) are dropped from the batch
+        batch = [(request, future) for request, future in batch if not future.done()]
+        if not batch:
+            return
+        requests = [request for request, _ in batch]
+        self.batches += 1
+        self.requests += len(requests)
+        try:
+            if self.runner is not None:
+                outcomes = await self.runner(self.batch_fn, requests)
+            else:
+                outcomes = await asyncio.get_running_loop().run_in_executor(None, self.batch_fn, requests)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), outcome in zip(batch, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    def stats(self):
+        return {
+            'window_ms': self.window * 1000,
+            'max_batch_size': self.max_batch_size,
+            'batches': self.batches,
+            'requests': self.requests,
+            'mean_batch_size': self.requests / self.batches if self.batches else 0.0
+        }
+
+    async def close(self):
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
+
+
+def batch_settings_from_env():
+    """
+    Window and size from ABSORPGEN_BATCH_WINDOW_MS and ABSORPGEN_BATCH_MAX_SIZE.
+    A window of 0 turns micro-batching off.
+    """
+    return (float(os.environ.get('ABSORPGEN_BATCH_WINDOW_MS', 3)),
+            int(os.environ.get('ABSORPGEN_BATCH_MAX_SIZE', 64)))
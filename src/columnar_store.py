@@ -0,0 +1,100 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional; everything falls back to the CSV files
+    pa = None
+    feather = None
+
+# Columns stored as float64 whatever the CSV inference says (e.g. strengths written as ints)
+FLOAT_COLUMNS = frozenset(['molecular_weight', 'logP', 'pKa', 'bioavailability',
+                           'strength_mg_per_unit', 'formulation_concentration',
+                           'bioavailability_threshold', 'max_daily_dose'])
+
+
+def columnar_path(csv_path):
+    """Feather file that mirrors a CSV file."""
+    return Path(csv_path).with_suffix('.feather')
+
+
+def _is_fresh(columnar, csv_path):
+    if not columnar.exists():
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.stat(columnar).st_mtime_ns >= os.stat(csv_path).st_mtime_ns
+
+
+def resolve(csv_path):
+    """
+    The file a loader should read for csv_path: the Feather copy when it is
+    at least as new as the CSV (or the CSV is gone), otherwise the CSV.
+    """
+    columnar = columnar_path(csv_path)
+    if feather is not None and _is_fresh(columnar, csv_path):
+        return columnar
+    return Path(csv_path)
+
+
+def _apply_types(df):
+    for col in FLOAT_COLUMNS.intersection(df.columns):
+        if df[col].dtype != 'float64':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    return df
+
+
+def _write(df, output_path):
+    # Uncompressed so reads can memory-map the file instead of decoding it
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), tmp_path,
+                          compression='uncompressed')
+    os.replace(tmp_path, output_path)
+
+
+def convert(csv_path, output_path=None):
+    """
+    Write a typed Feather copy of a CSV file. Returns the output path.
+    """
+    if feather is None:
+        raise ImportError("pyarrow is required to write the columnar store")
+    output_path = Path(output_path) if output_path else columnar_path(csv_path)
+    _write(_apply_types(pd.read_csv(csv_path)), output_path)
+    return output_path
+
+
+def read_table(csv_path, columns=None, convert_missing=True):
+    """
+    Load a table that is kept as CSV in the repo.
+
+    Reads the memory-mapped Feather copy when it is current. Otherwise the
+    CSV is parsed and, with convert_missing, the Feather copy is written so
+    the next load (in this or any other process) skips the parse.
+    """
+    path = resolve(csv_path)
+    if path.suffix == '.feather':
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+    df = _apply_types(pd.read_csv(path, usecols=columns))
+    if convert_missing and feather is not None and columns is None:
+        try:
+            _write(df, columnar_path(csv_path))
+        except (OSError, pa.ArrowException):
+            pass
+    return df
+
+
+def iter_frames(path, chunksize=50_000):
+    """Yield a Feather or Parquet file as DataFrames of at most chunksize rows."""
+    path = Path(path)
+    if path.suffix == '.parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        table = feather.read_table(path, memory_map=True)
+        for batch in table.to_batches(max_chunksize=chunksize):
+            yield batch.to_pandas()
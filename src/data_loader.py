@@ -1,10 +1,40 @@
+import sqlite3
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from .columnar_store import read_table, resolve, iter_frames
+from .features import FEATURE_COLUMNS, TARGETS, build_features
 
-def load_data():
-    base = Path(__file__).resolve().parent.parent
-    df = pd.read_csv(base / 'data' / 'raw' / 'chembl_drug_database.csv')
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_CSV_PATH = BASE_DIR / 'data' / 'raw' / 'chembl_drug_database.csv'
+
+FEATURES = ['molecular_weight', 'logP', 'pKa', 'age', 'weight', 'sex', 'route_admin',
+            'strength_mg_per_unit', 'formulation_concentration']
+TARGET_CLASS = 'formulation_type'
+
+# Same join as scripts/extract_drugs_from_chembl.py, over the whole table
+CHEMBL_DRUG_QUERY = """
+SELECT
+    md.pref_name AS drug_name,
+    cp.mw_freebase AS molecular_weight,
+    cp.alogp AS logP,
+    cp.cx_most_bpka AS pKa
+FROM
+    compound_properties cp
+JOIN
+    molecule_dictionary md ON cp.molregno = md.molregno
+WHERE
+    md.pref_name IS NOT NULL
+    AND cp.mw_freebase IS NOT NULL
+    AND cp.alogp IS NOT NULL
+    AND cp.cx_most_bpka IS NOT NULL
+"""
 
+def _prepare(df):
+    """
+    Add the synthetic patient inputs and targets to a frame of drug rows
+    and split it into features, regression targets and formulation labels.
+    """
     # Add synthetic user inputs
     df['age'] = 35
     df['weight'] = 70
@@ -18,15 +48,60 @@ def load_data():
     df['formulation_type'] = 'tablet'
 
     # Drop rows with missing values in critical columns
-    features = ['molecular_weight', 'logP', 'pKa', 'age', 'weight', 'sex', 'route_admin',
-                'strength_mg_per_unit', 'formulation_concentration']
-    targets = ['bioavailability', 'tmax', 'cmax', 'dose']
-    target_class = 'formulation_type'
+    df = df.dropna(subset=FEATURES + TARGETS + [TARGET_CLASS])
 
-    df = df.dropna(subset=features + targets + [target_class])
-
-    X = df[features]
-    y_reg = df[targets]
-    y_class = df[target_class]
+    # Encoded exactly as at prediction time; callers select preprocessor.feature_names_in_
+    X = build_features(df, df, FEATURE_COLUMNS).set_axis(df.index)
+    y_reg = df[TARGETS]
+    y_class = df[TARGET_CLASS]
 
     return X, y_reg, y_class
+
+def load_data():
+    return _prepare(read_table(DEFAULT_CSV_PATH))
+
+def iter_data_chunks(source=None, chunksize=50_000, shard=None):
+    """
+    Stream (X, y_reg, y_class) chunks instead of loading the whole table.
+
+    source is a CSV path (default: the ChEMBL extract, read from its Feather
+    copy when that is current), a Feather/Parquet extract, or a ChEMBL SQLite
+    database (.db/.sqlite), which is queried directly and read-only.
+    shard=(index, count) restricts the stream to one of count disjoint
+    parts: by molregno for SQLite, by row number in the file otherwise, so
+    every shard gets rows even when the whole file is one chunk.
+    """
+    source = Path(source) if source else DEFAULT_CSV_PATH
+    if source.suffix == '.csv':
+        source = resolve(source)
+    shard_index, shard_count = shard if shard else (0, 1)
+
+    if source.suffix in ('.db', '.sqlite', '.sqlite3'):
+        query = CHEMBL_DRUG_QUERY
+        params = None
+        if shard_count > 1:
+            query += "    AND cp.molregno % ? = ?\n"
+            params = (shard_count, shard_index)
+        conn = sqlite3.connect(f"file:{source.resolve()}?mode=ro", uri=True)
+        try:
+            for df in pd.read_sql_query(query, conn, params=params, chunksize=chunksize):
+                # Placeholder fields, as written by the extraction script
+                df['bioavailability'] = 0.8
+                df['strength_mg_per_unit'] = 200
+                df['formulation_concentration'] = 40
+                yield _prepare(df)
+        finally:
+            conn.close()
+    else:
+        if source.suffix in ('.feather', '.parquet'):
+            frames = iter_frames(source, chunksize)
+        else:
+            frames = pd.read_csv(source, chunksize=chunksize)
+        start = 0
+        for df in frames:
+            rows = np.arange(start, start + len(df))
+            start += len(df)
+            if shard_count > 1:
+                df = df[rows % shard_count == shard_index]
+            if len(df):
+                yield _prepare(df)
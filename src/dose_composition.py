@@ -0,0 +1,178 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+
+# Most units a composition may use unless the dose needs more of the largest strength
+DEFAULT_MAX_UNITS = 8
+
+# Compositions within this fraction of the dose count as exact; among them
+# the one with the fewest units wins. Off by default, so the composition
+# closest to the dose wins (then the fewest units); pass e.g. 0.05 to trade
+# a few percent of the dose for fewer tablets.
+DEFAULT_TOLERANCE = 0.0
+
+# Most doses (multiples of the strengths' common step) a table may span
+MAX_TABLE_SIZE = 20_000_000
+
+
+def _quantum(strengths):
+    """Largest step (in mg, to 0.001 mg) that every strength is a multiple of."""
+    step = 0
+    for strength in strengths:
+        step = math.gcd(step, int(round(strength * 1000)))
+    return step / 1000
+
+
+class DoseTable:
+    """
+    Every dose reachable with up to max_units units of the given strengths,
+    with the fewest units that reach it.
+
+    Built once per strength set as a bounded coin-change DP over multiples
+    of the strengths' common step, one vectorized pass per strength: adding
+    any number of units of a strength k steps long is a running minimum of
+    units[d] - d / k along each residue class mod k. A composition with the
+    fewest units minus any one of its units is again one with the fewest
+    units, so the strength added last is enough to reconstruct it.
+    """
+    def __init__(self, strengths, max_units):
+        self.strengths = tuple(sorted(set(strengths), reverse=True))
+        self.max_units = max_units
+        self.step = _quantum(self.strengths)
+        steps = np.array([int(round(s / self.step)) for s in self.strengths], dtype=np.int64)
+
+        size = max_units * int(steps.max()) + 1
+        if size > MAX_TABLE_SIZE:
+            raise ValueError(f"Composing up to {max_units} units of {', '.join(map(str, self.strengths))} mg "
+                             f"needs {size} table entries (limit {MAX_TABLE_SIZE}).")
+        unreachable = max_units + 1
+        units = np.full(size, unreachable, dtype=np.int32)
+        units[0] = 0
+        for k in steps.tolist():
+            rows = -(-size // k)
+            grid = np.full(rows * k, unreachable, dtype=np.int32)
+            grid[:size] = units
+            grid = grid.reshape(rows, k)
+            j = np.arange(rows, dtype=np.int32)[:, None]
+            np.minimum.accumulate(grid - j, axis=0, out=grid)
+            grid += j
+            units = np.minimum(grid.ravel()[:size], unreachable)
+
+        # Only reachable doses are kept; the full-width DP array is dropped
+        self._steps = steps
+        self.index = np.flatnonzero((units > 0) & (units <= max_units))
+        reachable = units[self.index]
+        self._last = np.full(len(self.index), -1, dtype=np.int32)
+        for s in reversed(range(len(steps))):
+            before = self.index - steps[s]
+            fits = before >= 0
+            fits[fits] = units[before[fits]] == reachable[fits] - 1
+            self._last[fits] = s
+        self.amounts = np.round(self.index * self.step, 3)
+        self.units = reachable.astype(np.int64)
+
+    def best(self, dose_mg, tolerance=DEFAULT_TOLERANCE):
+        """
+        Position in amounts of the composition for dose_mg: the smallest
+        error (then the fewest units), or with a tolerance the fewest units
+        within it of the dose (then the smallest error), if there are any.
+        """
+        lo = int(np.searchsorted(self.amounts, dose_mg * (1 - tolerance), side='left'))
+        hi = int(np.searchsorted(self.amounts, dose_mg * (1 + tolerance), side='right'))
+        if hi > lo:
+            error = np.abs(self.amounts[lo:hi] - dose_mg)
+            return lo + int(np.lexsort((error, self.units[lo:hi]))[0])
+        i = int(np.searchsorted(self.amounts, dose_mg))
+        around = [j for j in (i - 1, i) if 0 <= j < len(self.amounts)]
+        return min(around, key=lambda j: (abs(self.amounts[j] - dose_mg), self.units[j]))
+
+    def counts(self, position):
+        """Units of each strength, as {strength: count}, for a position in amounts."""
+        counts = {}
+        i = int(self.index[position])
+        while i > 0:
+            s = int(self._last[position])
+            counts[self.strengths[s]] = counts.get(self.strengths[s], 0) + 1
+            i -= int(self._steps[s])
+            position = int(np.searchsorted(self.index, i))
+        return dict(sorted(counts.items(), reverse=True))
+
+
+@lru_cache(maxsize=4096)
+def dose_table(strengths, max_units=DEFAULT_MAX_UNITS):
+    """Memoized DoseTable for a tuple of strengths."""
+    return DoseTable(strengths, max_units)
+
+
+def _table_key(dose_mg, strengths, max_units):
+    key = tuple(sorted({float(s) for s in strengths if s and s > 0}))
+    if not key:
+        raise ValueError("No tablet strengths to compose a dose from.")
+    # The DP works in steps of 0.001 mg; a strength that rounds to 0 has no step
+    if round(key[0] * 1000) == 0:
+        raise ValueError(f"Tablet strengths must be at least 0.0005 mg, got {key[0]:g} mg.")
+    # Large doses may need more units of the biggest strength; round the
+    # bound up to a power of two so the memoized tables stay few
+    needed = math.ceil(dose_mg / key[-1]) + 1 if dose_mg > 0 else 1
+    if needed > max_units:
+        max_units = 1 << (needed - 1).bit_length()
+    return key, max_units
+
+
+def _compose(table, dose_mg, tolerance):
+    position = table.best(dose_mg, tolerance)
+    total = float(table.amounts[position])
+    return {
+        'units': table.counts(position),
+        'n_units': int(table.units[position]),
+        'total_mg': total,
+        'error_mg': total - dose_mg,
+    }
+
+
+def compose_dose(dose_mg, strengths, max_units=DEFAULT_MAX_UNITS, tolerance=DEFAULT_TOLERANCE):
+    """
+    The tablet combination for a dose from the available strengths.
+
+    Returns a dict with units ({strength: count}, largest first), n_units,
+    total_mg and error_mg (total_mg - dose_mg). The combination closest to
+    the dose wins, then the one with fewest units; with a tolerance (a
+    fraction of the dose) the fewest units within it win instead. At least
+    one unit is always given, so doses below the smallest strength get one
+    of those.
+    """
+    return _compose(dose_table(*_table_key(dose_mg, strengths, max_units)), dose_mg, tolerance)
+
+
+def compose_doses(doses_mg, strengths, max_units=DEFAULT_MAX_UNITS, tolerance=DEFAULT_TOLERANCE):
+    """
+    compose_dose for many doses, e.g. a dose per formulary drug. strengths
+    is either one strength list for every dose or one list per dose; each
+    distinct strength set builds its table once per call, however many
+    there are.
+    """
+    doses_mg = [float(dose) for dose in doses_mg]
+    if len(strengths) and np.ndim(strengths[0]) == 0:
+        strengths = [strengths] * len(doses_mg)
+    if len(strengths) != len(doses_mg):
+        raise ValueError(f"Got {len(doses_mg)} doses but {len(strengths)} strength lists.")
+    tables = {}
+    compositions = []
+    for dose, drug_strengths in zip(doses_mg, strengths):
+        key = _table_key(dose, drug_strengths, max_units)
+        table = tables.get(key)
+        if table is None:
+            table = tables[key] = dose_table(*key)
+        compositions.append(_compose(table, dose, tolerance))
+    return compositions
+
+
+def _mg(value):
+    return f"{value:g}"
+
+
+def describe_composition(composition, unit='tablet'):
+    """A composition as text, e.g. "1 tablet(s) of 500 mg and 1 tablet(s) of 325 mg"."""
+    return " and ".join(f"{count} {unit}(s) of {_mg(strength)} mg"
+                        for strength, count in composition['units'].items())
@@ -0,0 +1,163 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .drug_lookup import OTC_DRUGS
+from .drug_store import DEFAULT_DB_PATH, get_drug_store
+from .features import DRUG_FEATURES, encode_drugs
+from .model_registry import get_registry
+from .numpy_model import NumpyMultiTaskModel, preprocessor_affine
+
+
+class DrugEmbeddingTable:
+    """
+    One snapshot of the formulary with its precomputed drug embeddings.
+
+    names and drugs (the raw feature records, as a DataFrame) are row
+    aligned with embeddings (drug-branch outputs) and terms (their
+    contribution to the first combined layer, which is what inference
+    actually adds). artifacts are the registry artifacts the table was
+    built from and model their NumPy forward pass; model, embeddings and
+    terms are None when those artifacts have no separate drug branch.
+    """
+    def __init__(self, names, drugs, version, artifacts, model=None, embeddings=None, terms=None):
+        self.names = np.asarray(names, dtype=object)
+        self.drugs = drugs
+        self.version = version
+        self.artifacts = artifacts
+        self.model = model
+        self.embeddings = embeddings
+        self.terms = terms
+        self.index = {name.lower(): i for i, name in enumerate(names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def rows(self, drug_names):
+        """Row of each drug name (case-insensitive); ValueError for unknown drugs."""
+        rows = [self.index.get(str(name).lower()) for name in drug_names]
+        missing = [name for name, row in zip(drug_names, rows) if row is None]
+        if missing:
+            raise ValueError(f"Drugs not found in the formulary: {', '.join(map(str, missing))}")
+        return np.asarray(rows, dtype=np.intp)
+
+
+def drug_branch_model(artifacts):
+    """
+    The artifacts' network as a NumpyMultiTaskModel taking raw features,
+    or None when its drug branch cannot be run on its own: exported graphs
+    and quantized models (runtime kinds other than numpy and eager), or a
+    preprocessor that cannot be folded into the weights.
+    """
+    if artifacts.runtime.kind == 'numpy':
+        return artifacts.model
+    model = artifacts.model
+    if artifacts.runtime.kind != 'eager' or model is None:
+        return None
+    try:
+        scale, offset = preprocessor_affine(artifacts.preprocessor)
+    except ValueError:
+        return None
+    state_dict = {name: value.detach().cpu().numpy() for name, value in model.state_dict().items()}
+    return NumpyMultiTaskModel(state_dict, scale, offset)
+
+
+class DrugEmbeddingCache:
+    """
+    Drug-branch embeddings for every drug in the store and the OTC list.
+
+    The drug branch of AbsorpGenMultiTaskModel only sees drug properties, so
+    its output is computed once per drug and reused for every patient; at
+    request time only the patient branch, the rest of the trunk and the
+    heads run (see NumpyMultiTaskModel.forward_with_drug_terms).
+
+    The weights come from the process-wide model registry (or the one
+    given), whichever backend it runs, so the table always matches the
+    model predict_many uses and is rebuilt when the registry reloads or the
+    drug table changes. Eager checkpoints are run through their NumPy
+    equivalent. Backends without a separable drug branch (torchscript,
+    onnx, quantized) still get the formulary, with model set to None, and
+    callers fall back to the full forward pass.
+    """
+    def __init__(self, registry=None, db_path=DEFAULT_DB_PATH):
+        self._registry = registry
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._table = None
+
+    @property
+    def registry(self):
+        return self._registry if self._registry is not None else get_registry()
+
+    def _formulary(self):
+        store = get_drug_store(self.db_path)
+        names = []
+        records = []
+        seen = set()
+        for name in list(OTC_DRUGS) + store.names():
+            if name.lower() in seen:
+                continue
+            seen.add(name.lower())
+            if name in OTC_DRUGS:
+                records.append(dict(OTC_DRUGS[name]))
+            else:
+                records.append(store.get(name)[1])
+            names.append(name)
+        return names, pd.DataFrame(records)
+
+    def _build(self, artifacts, version):
+        names, drugs = self._formulary()
+        model = drug_branch_model(artifacts)
+        if model is None:
+            return DrugEmbeddingTable(names, drugs, version, artifacts)
+        drug_columns = list(artifacts.feature_names[model.n_patient:])
+        if any(name not in DRUG_FEATURES for name in drug_columns):
+            # The drug branch reads per-request features; its output cannot be cached per drug
+            return DrugEmbeddingTable(names, drugs, version, artifacts)
+
+        encoded = encode_drugs(drugs)
+        X_drug = np.column_stack([encoded[name] for name in drug_columns]).astype(np.float32)
+        embeddings = model.drug_embeddings(X_drug)
+        return DrugEmbeddingTable(names, drugs, version, artifacts, model, embeddings,
+                                  model.drug_terms(embeddings))
+
+    def get(self):
+        """The current table, rebuilt if the registry reloaded or the drug table changed."""
+        artifacts = self.registry.get()
+        version = (artifacts.version, get_drug_store(self.db_path).version)
+        table = self._table
+        if table is not None and table.version == version and table.artifacts is artifacts:
+            return table
+        with self._lock:
+            table = self._table
+            if table is None or table.version != version or table.artifacts is not artifacts:
+                self._table = self._build(artifacts, version)
+            return self._table
+
+    def run(self, features, drug_rows, table=None):
+        """
+        Regression outputs and class indices for a frame of raw features
+        whose row i is for formulary drug drug_rows[i].
+        """
+        if table is None:
+            table = self.get()
+        if table.model is None:
+            raise ValueError(f"The {table.artifacts.runtime.kind} model has no drug branch to cache.")
+        X = np.ascontiguousarray(features[list(table.artifacts.feature_names)].to_numpy(), dtype=np.float32)
+        reg_output, class_logits = table.model.forward_with_drug_terms(X, table.terms[drug_rows])
+        return reg_output, class_logits.argmax(axis=1)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_drug_embeddings():
+    """Process-wide embedding cache over the process-wide registry and the default drug table."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DrugEmbeddingCache()
+    return _cache
@@ -1,14 +1,16 @@
-import pandas as pd
 import os
-from .rxnorm_lookup import get_most_common_brand
+from .name_resolver import get_name_resolver
+from .drug_store import get_drug_store
+from .indication_index import get_indication_index
+from .columnar_store import read_table
 
 def load_drug_indications():
     """
-    Load drug indications from the CSV file.
+    Load drug indications (from the Feather copy of the CSV when current).
     """
     base_dir = os.path.dirname(__file__)
     full_path = os.path.join(base_dir, '..', 'data', 'processed', 'drug_indications.csv')
-    df = pd.read_csv(full_path)
+    df = read_table(full_path)
     return df
 
 # Common OTC drugs with their properties
@@ -49,68 +51,71 @@ OTC_DRUGS = {
         'formulation_concentration': 7.5,
         'formulation': 'liquid',
         'is_liquid': True  # Explicit flag for liquid formulation
-    },
-    'NYQUILL': {  # Common misspelling
-        'molecular_weight': 271.4,
-        'logP': 3.2,
-        'pKa': 9.2,
-        'bioavailability': 0.75,
-        'strength_mg_per_unit': 15,
-        'formulation_concentration': 7.5,
-        'formulation': 'liquid',
-        'is_liquid': True  # Explicit flag for liquid formulation
     }
 }
 
+# Unit strengths (mg) sold for the OTC drugs besides strength_mg_per_unit
+OTC_STRENGTHS = {
+    'ACETAMINOPHEN': {'tablet': (325, 500)},
+    'IBUPROFEN': {'tablet': (200,)},
+}
+
+def available_strengths(drug_name, db_path='data/raw/chembl_drug_database.csv'):
+    """
+    All unit strengths (mg) available for a drug, as {formulation: sorted
+    tuple}, from the OTC list and every row of the drug table.
+    """
+    generic = get_name_resolver().generic_name(drug_name)
+    if generic is not None:
+        drug_name = generic
+
+    strengths = {}
+    otc = OTC_DRUGS.get(drug_name.upper())
+    if otc is not None:
+        strengths.setdefault(otc['formulation'], set()).add(float(otc['strength_mg_per_unit']))
+    for formulation, values in OTC_STRENGTHS.get(drug_name.upper(), {}).items():
+        strengths.setdefault(formulation, set()).update(float(v) for v in values)
+    for formulation, values in get_drug_store(db_path).strengths(drug_name).items():
+        strengths.setdefault(formulation, set()).update(values)
+    return {formulation: tuple(sorted(values)) for formulation, values in strengths.items()}
+
 def lookup_drug_features(drug_name, db_path='data/raw/chembl_drug_database.csv'):
     """
     Look up drug features including PK properties and strength information.
     """
-    # First check if input is a brand name and convert to drug name
-    drug_name = get_most_common_brand(drug_name)
+    # Brand names and misspellings resolve to the generic name the tables use
+    generic = get_name_resolver().generic_name(drug_name)
+    if generic is not None:
+        drug_name = generic
     
     # First check OTC drugs
     if drug_name.upper() in OTC_DRUGS:
         features = OTC_DRUGS[drug_name.upper()].copy()
-        # Add indications from drug_indications.csv
+        # Add indications from the drug_indications index
         try:
-            indications_df = load_drug_indications()
-            drug_indications = indications_df[indications_df['drug_name'].str.upper() == drug_name.upper()]
-            if not drug_indications.empty:
-                features['indications'] = drug_indications['indications'].iloc[0].split(',')
+            indications = get_indication_index().conditions_for(drug_name)
+            if indications:
+                features['indications'] = list(indications)
         except Exception:
             pass
         return features
     
     # Then check database
     try:
-        base_dir = os.path.dirname(__file__)
-        full_path = os.path.join(base_dir, '..', db_path)
-        df = pd.read_csv(full_path)
-
-        match = df[df['drug_name'].str.lower() == drug_name.lower()]
-        if match.empty:
+        match = get_drug_store(db_path).get(drug_name)
+        if match is None:
             raise ValueError(f"Drug '{drug_name}' not found in the database.")
+
+        _, features = match
         
-        row = match.iloc[0]
-        features = {
-            'molecular_weight': float(row['molecular_weight']),
-            'logP': float(row['logP']),
-            'pKa': float(row['pKa']),
-            'bioavailability': float(row['bioavailability']),
-            'strength_mg_per_unit': float(row['strength_mg_per_unit']),
-            'formulation_concentration': float(row['formulation_concentration'])
-        }
-        
-        # Add indications from drug_indications.csv
+        # Add indications from the drug_indications index
         try:
-            indications_df = load_drug_indications()
-            drug_indications = indications_df[indications_df['drug_name'].str.upper() == drug_name.upper()]
-            if not drug_indications.empty:
-                features['indications'] = drug_indications['indications'].iloc[0].split(',')
+            indications = get_indication_index().conditions_for(drug_name)
+            if indications:
+                features['indications'] = list(indications)
         except Exception:
             pass
-            
+
         return features
     except Exception as e:
         # If database lookup fails, try OTC drugs again
@@ -129,28 +134,37 @@ def suggest_alternative_drug(min_bioavailability=0.7, db_path='data/raw/chembl_d
     
     # Then check database
     try:
-        base_dir = os.path.dirname(__file__)
-        full_path = os.path.join(base_dir, '..', db_path)
-        df = pd.read_csv(full_path)
-
-        df_filtered = df[df['bioavailability'] > min_bioavailability]
-
-        if df_filtered.empty:
+        best = get_drug_store(db_path).best_above(min_bioavailability)
+        if best is None:
             raise ValueError("No alternative drug found with bioavailability above threshold.")
 
-        best = df_filtered.sort_values(by='bioavailability', ascending=False).iloc[0]
-
-        return best['drug_name'], {
-            'molecular_weight': float(best['molecular_weight']),
-            'logP': float(best['logP']),
-            'pKa': float(best['pKa']),
-            'bioavailability': float(best['bioavailability']),
-            'strength_mg_per_unit': float(best['strength_mg_per_unit']),
-            'formulation_concentration': float(best['formulation_concentration'])
-        }
+        return best
     except Exception:
         # If database lookup fails, try OTC drugs again
         for drug, features in OTC_DRUGS.items():
             if features['bioavailability'] > min_bioavailability:
                 return drug, features
         raise ValueError("No alternative drug found with bioavailability above threshold.")
+
+def suggest_alternative_drugs(min_bioavailability=0.7, k=5, db_path='data/raw/chembl_drug_database.csv'):
+    """
+    Up to k candidate alternatives with bioavailability above the threshold, best first.
+    Draws on the OTC drugs and the drug database; returns a list of (name, features).
+    """
+    candidates = [(drug, features) for drug, features in OTC_DRUGS.items()
+                  if features['bioavailability'] > min_bioavailability]
+    try:
+        candidates += get_drug_store(db_path).above_bioavailability(min_bioavailability, k)
+    except Exception:
+        pass
+
+    seen = set()
+    unique = []
+    for drug, features in candidates:
+        if drug.upper() not in seen:
+            seen.add(drug.upper())
+            unique.append((drug, features))
+    if not unique:
+        raise ValueError("No alternative drug found with bioavailability above threshold.")
+    unique.sort(key=lambda candidate: -candidate[1]['bioavailability'])
+    return unique[:k]
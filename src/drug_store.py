@@ -0,0 +1,158 @@
+import ast
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .columnar_store import read_table, resolve
+
+DEFAULT_DB_PATH = 'data/raw/chembl_drug_database.csv'
+
+FEATURE_COLUMNS = ['molecular_weight', 'logP', 'pKa', 'bioavailability',
+                   'strength_mg_per_unit', 'formulation_concentration']
+
+
+class DrugTable:
+    """
+    One loaded snapshot of a drug database file: names in file order, one
+    feature dict per row, the case-insensitive name index, strengths per
+    drug and formulation, and the rows presorted by descending
+    bioavailability. Built once and never modified, so readers holding it
+    always see a consistent table.
+    """
+    def __init__(self, df, fingerprint=None):
+        self.fingerprint = fingerprint
+        self.names = df['drug_name'].astype(str).tolist()
+        has_formulation = 'formulation' in df
+        columns = {col: df[col].to_numpy(dtype=float) for col in FEATURE_COLUMNS}
+
+        records = []
+        for i in range(len(df)):
+            record = {col: float(columns[col][i]) for col in FEATURE_COLUMNS}
+            # The ChEMBL extract has no formulation column; the training data labels every row as tablet
+            record['formulation'] = df['formulation'].iloc[i] if has_formulation else 'tablet'
+            records.append(record)
+        self.records = records
+
+        # First occurrence wins, as with the previous match.iloc[0]
+        index = {}
+        for i, name in enumerate(self.names):
+            index.setdefault(name.lower(), i)
+        self.index = index
+
+        # Every strength of every row of a drug, per formulation, including
+        # an available_strengths list column when the table has one
+        extra = df['available_strengths'] if 'available_strengths' in df else None
+        strengths = {}
+        for i, name in enumerate(self.names):
+            values = strengths.setdefault(name.lower(), {}).setdefault(records[i]['formulation'], set())
+            if not np.isnan(records[i]['strength_mg_per_unit']):
+                values.add(records[i]['strength_mg_per_unit'])
+            if extra is not None and pd.notna(extra.iloc[i]):
+                values.update(float(v) for v in ast.literal_eval(str(extra.iloc[i])))
+        self.strengths = {name: {form: tuple(sorted(values)) for form, values in forms.items() if values}
+                          for name, forms in strengths.items()}
+
+        # Descending bioavailability, ties in file order; rows without a value are left out
+        bioavailability = columns['bioavailability']
+        valid = np.flatnonzero(~np.isnan(bioavailability))
+        order = valid[np.lexsort((valid, -bioavailability[valid]))]
+        self.by_bioavailability = order
+        self.neg_bioavailability = -bioavailability[order]
+
+
+class DrugFeatureStore:
+    """
+    In-memory drug feature table with a case-insensitive name index.
+
+    The table is loaded once (from its Feather copy when current) into a
+    DrugTable: one feature dict per drug, a hash index from lower-cased
+    drug_name to row, and the rows presorted by descending bioavailability
+    so threshold queries are a binary search. The file is re-stat'ed on
+    access and a new DrugTable is built when it changes, then swapped in
+    with a single assignment, so a lookup racing a reload sees either the
+    old table or the new one, never a mix.
+    """
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        base = Path(__file__).resolve().parent.parent
+        self.path = base / db_path
+        self._lock = threading.Lock()
+        self._table = None
+
+    def _stat(self):
+        # The file actually read: the Feather copy when current, else the CSV
+        path = resolve(self.path)
+        stat = os.stat(path)
+        return (str(path), stat.st_mtime_ns, stat.st_size)
+
+    def _current(self):
+        """The DrugTable for the file as it is now, reloading it if it changed."""
+        fingerprint = self._stat()
+        table = self._table
+        if table is not None and table.fingerprint == fingerprint:
+            return table
+        with self._lock:
+            table = self._table
+            if table is None or table.fingerprint != fingerprint:
+                df = read_table(self.path)
+                # Reading the CSV may have just written its Feather copy
+                table = self._table = DrugTable(df, self._stat())
+            return table
+
+    @property
+    def version(self):
+        """Identifies the loaded table; changes whenever the file does."""
+        return self._current().fingerprint
+
+    def __len__(self):
+        return len(self._current().records)
+
+    def __contains__(self, drug_name):
+        return drug_name.lower() in self._current().index
+
+    def names(self):
+        """All drug names in file order."""
+        return list(self._current().names)
+
+    def get(self, drug_name):
+        """Return (canonical name, feature dict) for a drug, or None if it is not in the store."""
+        table = self._current()
+        i = table.index.get(drug_name.lower())
+        if i is None:
+            return None
+        return table.names[i], dict(table.records[i])
+
+    def strengths(self, drug_name):
+        """Available unit strengths (mg) of a drug as {formulation: sorted tuple}, empty if unknown."""
+        return dict(self._current().strengths.get(drug_name.lower(), {}))
+
+    def above_bioavailability(self, min_bioavailability, k=None):
+        """
+        Drugs with bioavailability strictly above min_bioavailability, best first.
+        Returns a list of (name, feature dict), at most k long when k is given.
+        """
+        table = self._current()
+        end = int(np.searchsorted(table.neg_bioavailability, -min_bioavailability, side='left'))
+        if k is not None:
+            end = min(end, k)
+        return [(table.names[i], dict(table.records[i])) for i in table.by_bioavailability[:end]]
+
+    def best_above(self, min_bioavailability):
+        """The single best drug above the threshold, or None."""
+        best = self.above_bioavailability(min_bioavailability, k=1)
+        return best[0] if best else None
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_drug_store(db_path=DEFAULT_DB_PATH):
+    """Process-wide store for a drug database file."""
+    store = _stores.get(db_path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(db_path, DrugFeatureStore(db_path))
+    return store
@@ -0,0 +1,93 @@
+import copy
+import json
+import os
+from pathlib import Path
+
+import torch
+
+from .model_registry import EXPORT_FILES, ModelRegistry
+from .model_runtime import EXPORT_METADATA_KEY
+from .numpy_model import preprocessor_affine
+
+
+def _fold_into_linear(linear, scale, offset):
+    # linear(x * s + o) = (W * s) x + (W o + b)
+    weight = linear.weight.data.double()
+    scale = torch.from_numpy(scale)
+    offset = torch.from_numpy(offset)
+    linear.bias.data = (linear.bias.data.double() + weight @ offset).float()
+    linear.weight.data = (weight * scale).float()
+
+
+def fold_preprocessor(model, preprocessor):
+    """
+    Copy of an AbsorpGenMultiTaskModel that takes raw (unscaled) features:
+    the preprocessor's scaling is folded into the first layer of the patient
+    and drug branches.
+    """
+    scale, offset = preprocessor_affine(preprocessor)
+    folded = copy.deepcopy(model).eval()
+    _fold_into_linear(folded.patient_branch[0], scale[:4], offset[:4])
+    _fold_into_linear(folded.drug_branch[0], scale[4:], offset[4:])
+    return folded
+
+
+def _metadata(artifacts, fmt):
+    return json.dumps({
+        'format': fmt,
+        'feature_names': [str(name) for name in artifacts.feature_names],
+        'classes': [str(label) for label in artifacts.classes],
+        'source_version': artifacts.version
+    })
+
+
+def export_torchscript(artifacts, path):
+    """Trace, freeze and optimize the folded model and save it as TorchScript."""
+    folded = fold_preprocessor(artifacts.model, artifacts.preprocessor)
+    example = torch.zeros(1, len(artifacts.feature_names))
+    with torch.no_grad():
+        traced = torch.jit.trace(folded, example)
+    frozen = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+    torch.jit.save(frozen, str(path), _extra_files={EXPORT_METADATA_KEY: _metadata(artifacts, 'torchscript')})
+
+
+def export_onnx(artifacts, path):
+    """Export the folded model as an ONNX graph with a dynamic batch dimension."""
+    import onnx
+
+    folded = fold_preprocessor(artifacts.model, artifacts.preprocessor)
+    example = torch.zeros(1, len(artifacts.feature_names))
+    torch.onnx.export(
+        folded, (example,), str(path),
+        input_names=['features'],
+        output_names=['regression', 'class_logits'],
+        dynamic_axes={'features': {0: 'batch'}, 'regression': {0: 'batch'}, 'class_logits': {0: 'batch'}},
+        dynamo=False
+    )
+    graph = onnx.load(str(path))
+    entry = graph.metadata_props.add()
+    entry.key = EXPORT_METADATA_KEY
+    entry.value = _metadata(artifacts, 'onnx')
+    onnx.save(graph, str(path))
+
+
+def export_model(fmt='torchscript', models_dir=None, output=None):
+    """
+    Export the current eager artifacts in models_dir to fmt ('torchscript' or
+    'onnx'). The file is written next to the checkpoint unless output is
+    given, and replaced atomically so a serving registry never reads a
+    partial export. Returns the output path.
+    """
+    if fmt not in EXPORT_FILES:
+        raise ValueError(f"Unknown export format '{fmt}'. Choose from {', '.join(EXPORT_FILES)}.")
+    registry = ModelRegistry(models_dir, backend='eager')
+    artifacts = registry.get()
+    output = Path(output) if output else registry.models_dir / EXPORT_FILES[fmt]
+
+    tmp_path = output.with_name(output.name + '.tmp')
+    if fmt == 'torchscript':
+        export_torchscript(artifacts, tmp_path)
+    else:
+        export_onnx(artifacts, tmp_path)
+    os.replace(tmp_path, output)
+    return output
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+# Every model input, in the order predict_new has always assembled them.
+# The preprocessor is fit on a subset of these; build_features returns
+# exactly the columns it is asked for, in that order.
+PATIENT_FEATURES = ['age', 'weight', 'sex', 'height', 'route_admin']
+DRUG_FEATURES = ['molecular_weight', 'logP', 'pKa', 'strength_mg_per_unit', 'formulation_concentration']
+FEATURE_COLUMNS = ['age', 'weight', 'sex', 'height', 'molecular_weight', 'logP', 'pKa',
+                   'route_admin', 'strength_mg_per_unit', 'formulation_concentration']
+# Regression outputs of the multitask model, in output column order
+TARGETS = ['bioavailability', 'tmax', 'cmax', 'dose']
+
+
+def _columns(data):
+    """A DataFrame, a dict of columns or a list of row dicts, as something indexable by column."""
+    if isinstance(data, (pd.DataFrame, dict)):
+        return data
+    return pd.DataFrame(list(data))
+
+
+def _length(columns):
+    if isinstance(columns, pd.DataFrame):
+        return len(columns)
+    return len(next(iter(columns.values()))) if columns else 0
+
+
+def _numeric(columns, name, n):
+    if name not in columns:
+        return np.full(n, np.nan)
+    return np.asarray(columns[name], dtype=float)
+
+
+def _flag(columns, name, value, n):
+    if name not in columns:
+        return np.zeros(n)
+    values = np.asarray(columns[name], dtype=str)
+    return (np.char.lower(values) == value).astype(float)
+
+
+def encode_patients(patients):
+    """
+    Patient inputs as model features, one array per column.
+
+    Age, weight and height are brought to roughly 0-1; sex and route of
+    administration become 1 for male / oral and 0 otherwise. A missing
+    height column gives NaN, which the current preprocessor never reads.
+    """
+    columns = _columns(patients)
+    n = _length(columns)
+    return {
+        'age': _numeric(columns, 'age', n) / 100,
+        'weight': _numeric(columns, 'weight', n) / 200,
+        'sex': _flag(columns, 'sex', 'male', n),
+        'height': _numeric(columns, 'height', n) / 200,
+        'route_admin': _flag(columns, 'route_admin', 'oral', n),
+    }
+
+
+def encode_drugs(drugs):
+    """
+    Drug properties as model features, one array per column.
+
+    These are the columns the preprocessor standardizes, so they stay in
+    the units it was fit on (g/mol, mg per unit, mg/mL). A missing
+    formulation concentration (solid forms) counts as 0.
+    """
+    columns = _columns(drugs)
+    n = _length(columns)
+    return {
+        'molecular_weight': _numeric(columns, 'molecular_weight', n),
+        'logP': _numeric(columns, 'logP', n),
+        'pKa': _numeric(columns, 'pKa', n),
+        'strength_mg_per_unit': _numeric(columns, 'strength_mg_per_unit', n),
+        'formulation_concentration': np.nan_to_num(_numeric(columns, 'formulation_concentration', n), nan=0.0),
+    }
+
+
+def build_features(patients, drugs, columns=FEATURE_COLUMNS, drug_rows=None):
+    """
+    Model features for many rows at once, as a DataFrame with exactly
+    columns in that order (pass preprocessor.feature_names_in_).
+
+    patients and drugs are DataFrames, dicts of columns or lists of row
+    dicts. Row i pairs patient i with drug drug_rows[i] when drug_rows is
+    given, else with drug i. A single patient or a single drug is paired
+    with every row of the other side.
+    Training, predict_new and predict_many all build their inputs here.
+    """
+    patient_features = encode_patients(patients)
+    drug_features = encode_drugs(drugs)
+    n_patients = len(patient_features['age'])
+    n_drugs = len(drug_features['molecular_weight'])
+    if drug_rows is not None:
+        drug_rows = np.asarray(drug_rows, dtype=np.intp)
+        n = len(drug_rows)
+    elif n_drugs == n_patients or n_drugs == 1:
+        n = n_patients
+        drug_rows = slice(None) if n_drugs == n else np.zeros(n, dtype=np.intp)
+    elif n_patients == 1:
+        n = n_drugs
+        drug_rows = slice(None)
+    else:
+        raise ValueError(f"Got {n_patients} patients but {n_drugs} drugs.")
+
+    if n_patients == n:
+        patient_rows = slice(None)
+    elif n_patients == 1:
+        patient_rows = np.zeros(n, dtype=np.intp)
+    else:
+        raise ValueError(f"Got {n_patients} patients but {n} drug rows.")
+    features = {**{name: values[patient_rows] for name, values in patient_features.items()},
+                **{name: values[drug_rows] for name, values in drug_features.items()}}
+
+    missing = [name for name in columns if name not in features]
+    if missing:
+        raise ValueError(f"No feature named {', '.join(missing)}.")
+    return pd.DataFrame({name: features[name] for name in columns})
@@ -0,0 +1,68 @@
+import numpy as np
+
+from .predict import predict_formulary
+
+# Predicted columns a ranking can be ordered by (higher is better)
+RANK_BY = ('bioavailability', 'cmax')
+
+
+def _best_first(scores, k):
+    """
+    Row indices by descending score (ties in formulary order), sorting only
+    the leading 4k candidates unless the caller keeps asking for more.
+    """
+    scores = np.where(np.isnan(scores), -np.inf, scores)
+    n = len(scores)
+    size = min(n, 4 * max(k, 1))
+    head = np.argpartition(-scores, size - 1)[:size] if size < n else np.arange(n)
+    head = head[np.lexsort((head, -scores[head]))]
+    yield from head
+    if size < n:
+        rest = np.setdiff1d(np.arange(n), head, assume_unique=True)
+        yield from rest[np.lexsort((rest, -scores[rest]))]
+
+
+def rank_formulary(user_input, k=10, rank_by='bioavailability', safety_checker=None, include_unsafe=False):
+    """
+    The k best drugs in the formulary for one patient.
+
+    The patient is scored against every drug in one batched pass
+    (predict_formulary, using the cached drug embeddings) and screened
+    against the patient's medications, allergies and conditions in one
+    check_safety_many pass; drugs are then taken in order of predicted
+    rank_by. Drugs with safety warnings are skipped unless include_unsafe
+    is set, in which case they are returned with their warnings.
+
+    Returns a list of dicts, best first.
+    """
+    if rank_by not in RANK_BY:
+        raise ValueError(f"Cannot rank by '{rank_by}'. Choose from {', '.join(RANK_BY)}.")
+    if safety_checker is None:
+        from .safety_checker import SafetyChecker
+        safety_checker = SafetyChecker()
+
+    predictions = predict_formulary(user_input)
+    screened = safety_checker.check_safety_many(
+        predictions['drug_name'],
+        current_medications=user_input.get('current_medications'),
+        allergies=user_input.get('allergies'),
+        conditions=user_input.get('medical_conditions')
+    )
+    ranked = []
+    for row in _best_first(predictions[rank_by], k):
+        if len(ranked) >= k:
+            break
+        drug_name = predictions['drug_name'][row]
+        warnings = screened[row]
+        if warnings and not include_unsafe:
+            continue
+        ranked.append({
+            'drug_name': drug_name,
+            'recommended_formulation': predictions['recommended_formulation'][row],
+            'bioavailability': float(predictions['bioavailability'][row]),
+            'tmax': float(predictions['tmax'][row]),
+            'cmax': float(predictions['cmax'][row]),
+            'dose': float(predictions['dose'][row]),
+            'warnings': warnings
+        })
+    return ranked
@@ -0,0 +1,191 @@
+import os
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .columnar_store import read_table, resolve
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_CSV_PATH = BASE_DIR / 'data' / 'processed' / 'drug_indications.csv'
+DEFAULT_INDEX_PATH = BASE_DIR / 'data' / 'processed' / 'drug_indications.idx'
+
+# Same join as scripts/run_sql_query.py
+INDICATION_QUERY = """
+SELECT md.pref_name AS drug_name, di.efo_term AS condition
+FROM drug_indication di
+JOIN molecule_dictionary md ON di.molregno = md.molregno
+WHERE di.efo_term IS NOT NULL;
+"""
+
+INDEX_FORMAT_VERSION = 1
+
+
+def _file_fingerprint(path):
+    # Keyed on the CSV; only a Feather-only checkout falls back to that file
+    if not os.path.exists(path):
+        path = resolve(path)
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _group(keys, values, n_keys):
+    """CSR grouping: offsets into values sorted (stably) by key."""
+    order = np.argsort(keys, kind='stable')
+    offsets = np.zeros(n_keys + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n_keys), out=offsets[1:])
+    return offsets, values[order].astype(np.int32)
+
+
+class IndicationIndex:
+    """
+    Two-way index between drugs and the conditions they are indicated for.
+
+    Both directions are stored in CSR form: the drug and condition name tables
+    plus offset and int32 code arrays. That is what gets pickled, so loading
+    the index is a handful of array reads rather than a CSV parse. Drug keys
+    are upper-cased and condition keys lower-cased; per-drug condition sets
+    are built on first use and memoized.
+    """
+    def __init__(self, drugs, conditions, drug_offsets, drug_conditions,
+                 condition_offsets, condition_drugs, source=None):
+        self.drugs = list(drugs)
+        self.conditions = list(conditions)
+        self.drug_offsets = drug_offsets
+        self.drug_conditions = drug_conditions
+        self.condition_offsets = condition_offsets
+        self.condition_drugs = condition_drugs
+        self.source = source
+
+        self._drug_ids = {name: i for i, name in enumerate(self.drugs)}
+        # Conditions differing only in case share one key
+        self._condition_ids = {}
+        for i, condition in enumerate(self.conditions):
+            self._condition_ids.setdefault(condition.lower(), []).append(i)
+        self._condition_keys = {}
+
+    @classmethod
+    def from_frame(cls, df, source=None):
+        """Build from a frame with drug_name and condition columns (one row per pair)."""
+        df = df.dropna(subset=['drug_name', 'condition'])
+        pairs = pd.DataFrame({
+            'drug_name': df['drug_name'].astype(str).str.upper(),
+            'condition': df['condition'].astype(str)
+        }).drop_duplicates()
+        drug_codes, drugs = pd.factorize(pairs['drug_name'])
+        condition_codes, conditions = pd.factorize(pairs['condition'])
+        drug_offsets, drug_conditions = _group(drug_codes, condition_codes, len(drugs))
+        condition_offsets, condition_drugs = _group(condition_codes, drug_codes, len(conditions))
+        return cls(drugs, conditions, drug_offsets, drug_conditions,
+                   condition_offsets, condition_drugs, source=source)
+
+    @classmethod
+    def from_csv(cls, csv_path=DEFAULT_CSV_PATH):
+        return cls.from_frame(read_table(csv_path), source=_file_fingerprint(csv_path))
+
+    @classmethod
+    def from_sqlite(cls, db_path):
+        """Build straight from a ChEMBL SQLite database, opened read-only."""
+        conn = sqlite3.connect(f"file:{Path(db_path).resolve()}?mode=ro", uri=True)
+        try:
+            df = pd.read_sql_query(INDICATION_QUERY, conn)
+        finally:
+            conn.close()
+        return cls.from_frame(df)
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        payload = {
+            'format': INDEX_FORMAT_VERSION,
+            'source': self.source,
+            'drugs': self.drugs,
+            'conditions': self.conditions,
+            'drug_offsets': self.drug_offsets,
+            'drug_conditions': self.drug_conditions,
+            'condition_offsets': self.condition_offsets,
+            'condition_drugs': self.condition_drugs,
+        }
+        tmp_path = Path(str(path) + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        with open(path, 'rb') as f:
+            payload = pickle.load(f)
+        if payload.get('format') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported indication index format in {path}")
+        return cls(payload['drugs'], payload['conditions'],
+                   payload['drug_offsets'], payload['drug_conditions'],
+                   payload['condition_offsets'], payload['condition_drugs'],
+                   source=payload['source'])
+
+    def _condition_codes_for(self, drug_name):
+        i = self._drug_ids.get(drug_name.upper())
+        if i is None:
+            return []
+        return self.drug_conditions[self.drug_offsets[i]:self.drug_offsets[i + 1]].tolist()
+
+    def conditions_for(self, drug_name):
+        """Conditions a drug is indicated for, in their original spelling."""
+        return tuple(self.conditions[c] for c in self._condition_codes_for(drug_name))
+
+    def condition_keys_for(self, drug_name):
+        """Lower-cased condition set for a drug, for membership tests."""
+        key = drug_name.upper()
+        keys = self._condition_keys.get(key)
+        if keys is None:
+            keys = frozenset(self.conditions[c].lower() for c in self._condition_codes_for(key))
+            self._condition_keys[key] = keys
+        return keys
+
+    def drugs_for(self, condition):
+        """Upper-cased names of the drugs indicated for a condition."""
+        names = set()
+        for c in self._condition_ids.get(condition.lower(), ()):
+            codes = self.condition_drugs[self.condition_offsets[c]:self.condition_offsets[c + 1]]
+            names.update(self.drugs[d] for d in codes.tolist())
+        return frozenset(names)
+
+    def __contains__(self, drug_name):
+        return drug_name.upper() in self._drug_ids
+
+
+_index = None
+_index_source = None
+_index_lock = threading.Lock()
+
+
+def get_indication_index(csv_path=DEFAULT_CSV_PATH, index_path=DEFAULT_INDEX_PATH):
+    """
+    Process-wide indication index.
+    Loads the binary index when it was built from the current CSV, otherwise
+    rebuilds it from the CSV and writes it back for the next process.
+    """
+    global _index, _index_source
+    source = _file_fingerprint(csv_path)
+    if _index is not None and _index_source == source:
+        return _index
+
+    with _index_lock:
+        if _index is None or _index_source != source:
+            index = None
+            if os.path.exists(index_path):
+                try:
+                    index = IndicationIndex.load(index_path)
+                except Exception:
+                    index = None
+                if index is not None and tuple(index.source or ()) != source:
+                    index = None
+            if index is None:
+                index = IndicationIndex.from_csv(csv_path)
+                try:
+                    index.save(index_path)
+                except OSError:
+                    pass
+            _index = index
+            _index_source = source
+        return _index
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+
+class PoolSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class InferencePool:
+    """
+    Bounded executor for blocking inference called from async handlers.
+
+    At most max_workers calls run at once and up to max_queue more wait for a
+    worker; further calls are rejected with PoolSaturated straight away
+    instead of piling up, which the API turns into a 503. The event loop
+    itself never runs inference, so /health and other requests stay
+    responsive. kind='process' runs calls in worker processes (each loads its
+    own model through the registry) for work that holds the GIL.
+    """
+    def __init__(self, max_workers=4, max_queue=64, kind='thread', timeout=None):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.kind = kind
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.kind == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='inference')
+        return self._executor
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the pool and await its result."""
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                raise PoolSaturated(
+                    f"Inference queue is full ({self.max_workers} running, {self.max_queue} waiting)"
+                )
+            self._in_flight += 1
+        try:
+            future = self._get_executor().submit(partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # The slot is held until the call itself finishes, not until we stop
+        # waiting for it: a timed-out call keeps its worker busy
+        future.add_done_callback(self._release)
+        if self.timeout:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self):
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            'kind': self.kind,
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'running': min(in_flight, self.max_workers),
+            'queued': max(0, in_flight - self.max_workers)
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def pool_from_env():
+    """
+    Build the API's pool from ABSORPGEN_INFERENCE_WORKERS, _QUEUE, _EXECUTOR
+    (thread or process) and _TIMEOUT (seconds, 0 for none).
+    """
+    timeout = float(os.environ.get('ABSORPGEN_INFERENCE_TIMEOUT', 0)) or None
+    return InferencePool(
+        max_workers=int(os.environ.get('ABSORPGEN_INFERENCE_WORKERS', min(4, os.cpu_count() or 1))),
+        max_queue=int(os.environ.get('ABSORPGEN_INFERENCE_QUEUE', 64)),
+        kind=os.environ.get('ABSORPGEN_INFERENCE_EXECUTOR', 'thread'),
+        timeout=timeout
+    )
@@ -0,0 +1,78 @@
+from typing import Dict, List
+
+import numpy as np
+from scipy import sparse
+
+
+class InteractionMatrix:
+    """
+    Drug-drug interactions as a symmetric sparse boolean matrix.
+
+    Every drug and medication named in the interactions database gets an
+    id; entry (i, j) is set when either drug lists the other. A k-drug
+    regimen is screened with one k x k slice, and "which drugs are free of
+    interactions with this regimen" is a single OR over the regimen's rows.
+    Names are resolved with the SafetyChecker's normalization, so brand
+    names and case variants land on the same id.
+    """
+    def __init__(self, database: Dict[str, List[str]], resolve):
+        self.resolve = resolve
+        pairs = [(resolve(drug), resolve(med)) for drug, meds in database.items() for med in meds]
+        names = sorted({name for pair in pairs for name in pair})
+        self.names = np.asarray(names, dtype=object)
+        self.ids = {name: i for i, name in enumerate(names)}
+
+        n = len(names)
+        rows = np.fromiter((self.ids[a] for a, _ in pairs), dtype=np.int64, count=len(pairs))
+        cols = np.fromiter((self.ids[b] for _, b in pairs), dtype=np.int64, count=len(pairs))
+        upper = sparse.coo_matrix((np.ones(len(pairs), dtype=bool), (rows, cols)), shape=(n, n))
+        self.matrix = (upper + upper.T).tocsr().astype(bool)
+        self.matrix.sum_duplicates()
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def n_interactions(self):
+        """Number of distinct interacting pairs."""
+        diagonal = int(self.matrix.diagonal().sum())
+        return (self.matrix.nnz - diagonal) // 2 + diagonal
+
+    def lookup(self, drug_names: List[str]) -> np.ndarray:
+        """Id of each drug name, -1 for drugs with no known interactions."""
+        return np.fromiter((self.ids.get(self.resolve(name), -1) for name in drug_names),
+                           dtype=np.int64, count=len(drug_names))
+
+    def regimen_interactions(self, regimen: List[str]) -> List[tuple]:
+        """
+        Every interacting pair within a regimen, as (name, name) tuples in
+        regimen order.
+        """
+        ids = self.lookup(regimen)
+        known = np.flatnonzero(ids >= 0)
+        if len(known) < 2:
+            return []
+        block = self.matrix[ids[known]][:, ids[known]].toarray()
+        first, second = np.nonzero(np.triu(block, k=1))
+        return [(regimen[known[a]], regimen[known[b]]) for a, b in zip(first, second)]
+
+    def interacting_with(self, regimen: List[str]) -> np.ndarray:
+        """Boolean mask over all ids: does the drug interact with anything in the regimen?"""
+        ids = self.lookup(regimen)
+        ids = ids[ids >= 0]
+        if len(ids) == 0:
+            return np.zeros(len(self), dtype=bool)
+        return np.asarray(self.matrix[ids].sum(axis=0)).ravel() > 0
+
+    def interaction_free(self, drug_names: List[str], regimen: List[str]) -> np.ndarray:
+        """
+        Boolean mask aligned with drug_names: True where the drug interacts
+        with nothing in the regimen. Drugs absent from the database are
+        interaction-free.
+        """
+        hits = self.interacting_with(regimen)
+        ids = self.lookup(drug_names)
+        free = np.ones(len(ids), dtype=bool)
+        known = ids >= 0
+        free[known] = ~hits[ids[known]]
+        return free
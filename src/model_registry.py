@@ -0,0 +1,171 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+from .model_runtime import EagerRuntime, NumpyRuntime, OnnxRuntime, QuantizedRuntime, TorchScriptRuntime
+
+# Files that make up one deployable model version
+ARTIFACT_FILES = {
+    'preprocessor': 'preprocessor_pipeline.pkl',
+    'encoder': 'formulation_encoder.pkl',
+    'model': 'absorpgen_multitask.pt',
+}
+
+# Single-file exports written by src.export_model; scaling and labels are baked in
+EXPORT_FILES = {
+    'torchscript': 'absorpgen_multitask.ts',
+    'onnx': 'absorpgen_multitask.onnx',
+}
+
+# 'quantized' is the eager checkpoint with dynamic int8 Linear layers,
+# 'numpy' the same checkpoint run by a fused NumPy forward pass
+BACKENDS = ('eager', 'quantized', 'numpy') + tuple(EXPORT_FILES)
+
+
+class ModelArtifacts:
+    """
+    One snapshot of the models directory.
+
+    runtime runs the model (see src.model_runtime); preprocessor, encoder and
+    model are the trained objects themselves and are only set for the eager
+    backend.
+    """
+    def __init__(self, runtime, version, preprocessor=None, encoder=None, model=None):
+        self.runtime = runtime
+        self.version = version
+        self.preprocessor = preprocessor
+        self.encoder = encoder
+        self.model = model
+
+    @property
+    def feature_names(self):
+        return self.runtime.feature_names
+
+    @property
+    def classes(self):
+        return self.runtime.classes
+
+    def run(self, features, batch_size=4096):
+        """Regression outputs and class indices for a frame of raw features."""
+        return self.runtime.run(features, batch_size)
+
+
+class ModelRegistry:
+    """
+    Keeps the model artifacts resident for the lifetime of the process.
+
+    Artifacts are loaded on first use and reused by every caller. Each call to
+    get() stats the artifact files (a few microseconds) and reloads the whole
+    set when any of them changed on disk, so a retrained model is picked up
+    without restarting the API workers.
+
+    backend picks what is loaded: 'eager' (the pickled preprocessor and
+    encoder plus the PyTorch checkpoint), 'quantized' (the same files, with
+    the model converted to dynamic int8 on load), 'numpy' (the same files
+    run by src.numpy_model without importing torch) or one exported graph,
+    'torchscript' or 'onnx', which is then the only file read. It defaults to
+    ABSORPGEN_MODEL_BACKEND, else eager.
+    """
+    def __init__(self, models_dir=None, use_hash=False, backend=None):
+        base = Path(__file__).resolve().parent.parent
+        # ABSORPGEN_MODELS_DIR lets deployments point at another artifact set
+        models_dir = models_dir or os.environ.get('ABSORPGEN_MODELS_DIR')
+        self.models_dir = Path(models_dir) if models_dir else base / 'models'
+        self.use_hash = use_hash
+        self.backend = backend or os.environ.get('ABSORPGEN_MODEL_BACKEND', 'eager')
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown model backend '{self.backend}'. Choose from {', '.join(BACKENDS)}.")
+        self._lock = threading.Lock()
+        self._artifacts = None
+        self._fingerprint = None
+
+    def _paths(self):
+        if self.backend in EXPORT_FILES:
+            return {'model': self.models_dir / EXPORT_FILES[self.backend]}
+        return {key: self.models_dir / name for key, name in ARTIFACT_FILES.items()}
+
+    def _fingerprint_files(self):
+        """Identify the current artifact files by mtime and size (or content hash)."""
+        fingerprint = []
+        for key, path in sorted(self._paths().items()):
+            if self.use_hash:
+                with open(path, 'rb') as f:
+                    fingerprint.append((key, hashlib.sha256(f.read()).hexdigest()))
+            else:
+                stat = os.stat(path)
+                fingerprint.append((key, stat.st_mtime_ns, stat.st_size))
+        return tuple(fingerprint)
+
+    def _load(self, fingerprint):
+        paths = self._paths()
+        version = hashlib.sha1(repr(fingerprint).encode()).hexdigest()[:12]
+        if self.backend == 'torchscript':
+            return ModelArtifacts(TorchScriptRuntime(paths['model']), version)
+        if self.backend == 'onnx':
+            return ModelArtifacts(OnnxRuntime(paths['model']), version)
+
+        # Imported here so exported backends never pay for torch/sklearn unpickling
+        import joblib
+
+        preprocessor = joblib.load(paths['preprocessor'])
+        encoder = joblib.load(paths['encoder'])
+
+        if self.backend == 'numpy':
+            from .numpy_model import NumpyMultiTaskModel, load_state_dict, preprocessor_affine
+            scale, offset = preprocessor_affine(preprocessor)
+            model = NumpyMultiTaskModel(load_state_dict(paths['model']), scale, offset)
+            return ModelArtifacts(NumpyRuntime(preprocessor, encoder, model), version, preprocessor, encoder, model)
+
+        import torch
+        from .model import AbsorpGenMultiTaskModel
+
+        model = AbsorpGenMultiTaskModel(len(preprocessor.feature_names_in_))
+        model.load_state_dict(torch.load(paths['model'], map_location='cpu'))
+        model.eval()
+        if self.backend == 'quantized':
+            from .quantization import quantize_dynamic
+            runtime = QuantizedRuntime(preprocessor, encoder, quantize_dynamic(model))
+        else:
+            runtime = EagerRuntime(preprocessor, encoder, model)
+        model = runtime.model
+        return ModelArtifacts(runtime, version, preprocessor, encoder, model)
+
+    def get(self):
+        """Return the resident artifacts, reloading them if the files changed."""
+        fingerprint = self._fingerprint_files()
+        artifacts = self._artifacts
+        if artifacts is not None and fingerprint == self._fingerprint:
+            return artifacts
+
+        with self._lock:
+            if self._artifacts is None or fingerprint != self._fingerprint:
+                # Build the new set completely before swapping it in so
+                # concurrent readers never see a half-loaded version
+                self._artifacts = self._load(fingerprint)
+                self._fingerprint = fingerprint
+            return self._artifacts
+
+    @property
+    def version(self):
+        """Short identifier of the currently loaded artifact set."""
+        return self.get().version
+
+    def clear(self):
+        """Drop the resident artifacts so the next get() reloads from disk."""
+        with self._lock:
+            self._artifacts = None
+            self._fingerprint = None
+
+
+_registry = ModelRegistry()
+
+
+def get_registry():
+    """Process-wide registry shared by predict, simulate and the API."""
+    return _registry
+
+
+def load_artifacts():
+    """Shortcut for get_registry().get()."""
+    return _registry.get()
@@ -0,0 +1,126 @@
+import json
+
+import numpy as np
+
+# Key under which export metadata (feature order, class labels) is embedded in the artifact
+EXPORT_METADATA_KEY = 'absorpgen'
+
+
+class ModelRuntime:
+    """
+    Something that turns raw feature rows into model outputs.
+
+    Subclasses provide feature_names (input column order), classes (the
+    formulation labels, indexed by class id), prepare() which turns a frame
+    into the float32 matrix the graph expects, and forward() which runs one
+    chunk of that matrix and returns the regression outputs and the class
+    logits as arrays.
+    """
+    kind = None
+    feature_names = ()
+    classes = np.empty(0, dtype=object)
+
+    def prepare(self, features):
+        return np.ascontiguousarray(features[list(self.feature_names)].to_numpy(), dtype=np.float32)
+
+    def forward(self, X):
+        raise NotImplementedError
+
+    def run(self, features, batch_size=4096):
+        """
+        Run the model over a frame holding (at least) feature_names, in
+        chunks of batch_size rows.
+        Returns the regression outputs and the predicted class indices.
+        """
+        X = self.prepare(features)
+        reg_chunks = []
+        class_chunks = []
+        for start in range(0, len(X), batch_size):
+            reg_output, class_logits = self.forward(X[start:start + batch_size])
+            reg_chunks.append(reg_output)
+            class_chunks.append(class_logits.argmax(axis=1))
+        if not reg_chunks:
+            return np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.int64)
+        return np.concatenate(reg_chunks), np.concatenate(class_chunks)
+
+
+class EagerRuntime(ModelRuntime):
+    """The sklearn preprocessor followed by the PyTorch module, as trained."""
+    kind = 'eager'
+
+    def __init__(self, preprocessor, encoder, model):
+        self.preprocessor = preprocessor
+        self.model = model
+        self.feature_names = tuple(preprocessor.feature_names_in_)
+        self.classes = np.asarray(encoder.classes_, dtype=object)
+
+    def prepare(self, features):
+        X = self.preprocessor.transform(features[list(self.feature_names)])
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def forward(self, X):
+        import torch
+        with torch.no_grad():
+            reg_output, class_logits = self.model(torch.from_numpy(X))
+        return reg_output.numpy(), class_logits.numpy()
+
+
+class QuantizedRuntime(EagerRuntime):
+    """EagerRuntime over the model with dynamic int8 Linear layers (src.quantization)."""
+    kind = 'quantized'
+
+
+class NumpyRuntime(ModelRuntime):
+    """
+    The checkpoint run by NumpyMultiTaskModel with the preprocessor folded
+    in; torch is never imported.
+    """
+    kind = 'numpy'
+
+    def __init__(self, preprocessor, encoder, model):
+        self.model = model
+        self.feature_names = tuple(preprocessor.feature_names_in_)
+        self.classes = np.asarray(encoder.classes_, dtype=object)
+
+    def forward(self, X):
+        return self.model(X)
+
+
+class _ExportedRuntime(ModelRuntime):
+    def _set_metadata(self, raw):
+        metadata = json.loads(raw)
+        self.metadata = metadata
+        self.feature_names = tuple(metadata['feature_names'])
+        self.classes = np.asarray(metadata['classes'], dtype=object)
+
+
+class TorchScriptRuntime(_ExportedRuntime):
+    """A frozen TorchScript graph with the preprocessor's scaling folded in."""
+    kind = 'torchscript'
+
+    def __init__(self, path):
+        import torch
+        extra_files = {EXPORT_METADATA_KEY: ''}
+        self.module = torch.jit.load(str(path), map_location='cpu', _extra_files=extra_files)
+        self._set_metadata(extra_files[EXPORT_METADATA_KEY])
+
+    def forward(self, X):
+        import torch
+        with torch.inference_mode():
+            reg_output, class_logits = self.module(torch.from_numpy(X))
+        return reg_output.numpy(), class_logits.numpy()
+
+
+class OnnxRuntime(_ExportedRuntime):
+    """An ONNX graph run by onnxruntime on CPU; torch is never imported."""
+    kind = 'onnx'
+
+    def __init__(self, path):
+        import onnxruntime as ort
+        self.session = ort.InferenceSession(str(path), providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self._set_metadata(self.session.get_modelmeta().custom_metadata_map[EXPORT_METADATA_KEY])
+
+    def forward(self, X):
+        reg_output, class_logits = self.session.run(None, {self.input_name: X})
+        return reg_output, class_logits
@@ -0,0 +1,284 @@
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .rxnorm_lookup import BRAND_NAMES, GENERIC_NAMES
+
+
+def normalize_name(name: str) -> str:
+    """Case-folded name with surrounding and repeated whitespace removed."""
+    return ' '.join(str(name).split()).casefold()
+
+
+def _trigrams(key):
+    """Distinct trigrams of a normalized key, padded so short names and prefixes count."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def default_max_distance(key):
+    """Typos tolerated for a name of this length: none for very short names, up to two for long ones."""
+    if len(key) <= 3:
+        return 0
+    if len(key) <= 7:
+        return 1
+    return 2
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent
+    transpositions) between a and b, or limit + 1 once it must exceed limit.
+    The common prefix and suffix are stripped first and only the diagonal
+    band of width limit is filled in.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return len(a) + len(b) if len(a) + len(b) <= limit else limit + 1
+
+    beyond = limit + 1
+    previous2 = None
+    previous = [j if j <= limit else beyond for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [beyond] * (len(b) + 1)
+        current[0] = i if i <= limit else beyond
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = min(value, beyond)
+        if min(current) > limit:
+            return beyond
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class NameResolver:
+    """
+    Resolves what a user typed (generic or brand name, any case, possibly
+    misspelled) to the generic name the drug databases use, and generic
+    names to their usual brand.
+
+    Every generic and brand name is a key in one exact-match dict and in a
+    trigram index: the distinct trigrams of each key, stored CSR-style
+    (sorted trigram table, offsets, int32 key ids). A fuzzy lookup counts
+    shared trigrams with one bincount over the query's posting lists, keeps
+    keys that could be within max_distance edits (each edit changes at most
+    four trigrams) and verifies only those with a bounded edit distance.
+    """
+    def __init__(self, names, brand_to_generic=None, generic_to_brand=None):
+        brand_to_generic = brand_to_generic or {}
+        generic_to_brand = generic_to_brand or {}
+
+        keys = []
+        targets = []
+        exact = {}
+
+        def add(name, generic):
+            key = normalize_name(name)
+            if key and key not in exact:
+                exact[key] = len(keys)
+                keys.append(key)
+                targets.append(generic)
+
+        # Brands come first, so a brand that is also a formulary entry (NyQuil)
+        # resolves to its generic, as the safety checker's aliases do; the
+        # generic is spelled the way the databases spell it
+        generics = {}
+        for name in names:
+            generics.setdefault(normalize_name(name), name)
+        for brand, generic in brand_to_generic.items():
+            add(brand, generics.get(normalize_name(generic), generic))
+        for name in names:
+            add(name, name)
+        for generic in list(generic_to_brand) + list(brand_to_generic.values()):
+            add(generic, generic)
+
+        self.keys = keys
+        self.targets = targets
+        self._exact = exact
+        self._brands = {}
+        for generic, brand in generic_to_brand.items():
+            self._brands.setdefault(normalize_name(generic), brand)
+        for brand, generic in brand_to_generic.items():
+            self._brands.setdefault(normalize_name(generic), brand)
+        self._build_index()
+
+    def _build_index(self):
+        postings = {}
+        for i, key in enumerate(self.keys):
+            for trigram in _trigrams(key):
+                postings.setdefault(trigram, []).append(i)
+        self._trigram_table = sorted(postings)
+        self._trigram_ids = {trigram: i for i, trigram in enumerate(self._trigram_table)}
+        sizes = np.fromiter((len(postings[t]) for t in self._trigram_table), dtype=np.int64,
+                            count=len(self._trigram_table))
+        self._offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self._offsets[1:])
+        self._postings = np.fromiter((i for t in self._trigram_table for i in postings[t]), dtype=np.int32,
+                                     count=int(self._offsets[-1]))
+        self._lengths = np.fromiter((len(key) for key in self.keys), dtype=np.int32, count=len(self.keys))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _closest(self, key, max_distance, k):
+        """
+        Keys within max_distance edits of key, closest first: at least the k
+        best, plus any tied with the k-th.
+        """
+        trigrams = _trigrams(key)
+        ids = [self._trigram_ids[t] for t in trigrams if t in self._trigram_ids]
+        if not ids:
+            return []
+        # An edit changes at most four of the query's trigrams (an adjacent
+        # transposition touches two positions), so a key within d edits
+        # shares at least len(trigrams) - 4d of them. The most common
+        # trigrams are left out of the count (the bound drops by one for
+        # each) as long as it still leaves at least two to match on.
+        ids.sort(key=lambda t: self._offsets[t + 1] - self._offsets[t])
+        skipped = max(0, min(len(ids) - 1, len(trigrams) - 4 * max_distance - 2))
+        ids = ids[:len(ids) - skipped]
+        hits = np.concatenate([self._postings[self._offsets[t]:self._offsets[t + 1]] for t in ids])
+        counts = np.bincount(hits)
+
+        candidates = np.flatnonzero(counts >= max(1, len(trigrams) - 4 * max_distance - skipped))
+        candidates = candidates[np.abs(self._lengths[candidates] - len(key)) <= max_distance]
+        candidates = candidates[np.argsort(-counts[candidates], kind='stable')]
+
+        # Most shared trigrams first; stop once the rest must be further away
+        # than the k-th match
+        matches = []
+        for c, shared in zip(candidates.tolist(), counts[candidates].tolist()):
+            limit = max_distance if len(matches) < k else matches[k - 1][2]
+            if -(-(len(trigrams) - skipped - shared) // 4) > limit:
+                break
+            distance = edit_distance(key, self.keys[c], limit)
+            if distance <= limit:
+                matches.append((self.keys[c], self.targets[c], distance))
+                matches.sort(key=lambda match: match[2])
+        if len(matches) > k:
+            matches = [match for match in matches if match[2] <= matches[k - 1][2]]
+        return matches
+
+    def suggest(self, name, k=5, max_distance=None):
+        """
+        Closest keys to name as (key, generic name, distance) tuples, best
+        first, at most k and within max_distance edits (by default
+        default_max_distance of the name).
+        """
+        key = normalize_name(name)
+        if max_distance is None:
+            max_distance = default_max_distance(key)
+        if max_distance == 0 or not key:
+            i = self._exact.get(key)
+            return [(key, self.targets[i], 0)] if i is not None else []
+        return self._closest(key, max_distance, k)[:k]
+
+    def generic_name(self, name, fuzzy=True):
+        """
+        The generic name for a generic or brand name, or None. A misspelled
+        name is resolved only when one generic is strictly closest.
+        """
+        key = normalize_name(name)
+        i = self._exact.get(key)
+        if i is not None:
+            return self.targets[i]
+        max_distance = default_max_distance(key)
+        if not fuzzy or max_distance == 0:
+            return None
+        generics = {generic for _, generic, _ in self._closest(key, max_distance, 1)}
+        return generics.pop() if len(generics) == 1 else None
+
+    def brand_name(self, name):
+        """The usual brand for a drug given by generic or brand name, or None."""
+        generic = self.generic_name(name)
+        return self._brands.get(normalize_name(generic if generic is not None else name))
+
+
+def brand_names_from_aliases(aliases):
+    """
+    Brands named in drug_aliases-style display strings, e.g. "Cipro
+    (Antibiotic)" for CIPROFLOXACIN: a single word before the parenthesis
+    that is not the generic itself.
+    """
+    brands = {}
+    for generic, display in aliases.items():
+        head = display.split('(')[0].strip()
+        if '(' in display and head and ' ' not in head and head.casefold() != generic.casefold():
+            brands[head] = generic
+    return brands
+
+
+def load_aliases():
+    """
+    Brand and alternative names mapped to the generic the databases use:
+    the brands named in drug_aliases, the rxnorm brand map and
+    data/drug_aliases.json, later ones winning. NameResolver and
+    SafetyChecker both resolve names through this one table.
+    """
+    from .drug_aliases import drug_aliases
+
+    aliases = {**brand_names_from_aliases(drug_aliases), **GENERIC_NAMES}
+    path = Path(__file__).resolve().parent.parent / 'data' / 'drug_aliases.json'
+    if path.exists():
+        with open(path, 'r') as f:
+            aliases.update(json.load(f))
+    return aliases
+
+
+def build_name_resolver(db_path=None):
+    """
+    A resolver over the drug table, the OTC list, ChEMBL pref_names from
+    the indication index, the brand map and load_aliases.
+    """
+    from .drug_lookup import OTC_DRUGS
+    from .drug_store import DEFAULT_DB_PATH, get_drug_store
+    from .indication_index import get_indication_index
+
+    names = list(OTC_DRUGS) + get_drug_store(db_path or DEFAULT_DB_PATH).names()
+    try:
+        names += get_indication_index().drugs
+    except Exception:
+        pass
+    return NameResolver(names, load_aliases(), BRAND_NAMES)
+
+
+_resolver = None
+_resolver_version = None
+_resolver_lock = threading.Lock()
+
+
+def _sources_version():
+    from .drug_store import get_drug_store
+    from .indication_index import get_indication_index
+    try:
+        index_source = get_indication_index().source
+    except Exception:
+        index_source = None
+    return (get_drug_store().version, str(index_source))
+
+
+def get_name_resolver():
+    """Process-wide resolver, rebuilt when the drug table or the indication data changes."""
+    global _resolver, _resolver_version
+    version = _sources_version()
+    if _resolver is not None and _resolver_version == version:
+        return _resolver
+    with _resolver_lock:
+        if _resolver is None or _resolver_version != version:
+            _resolver = build_name_resolver()
+            _resolver_version = version
+    return _resolver
@@ -0,0 +1,217 @@
+import pickle
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Storage classes that can appear in a state dict, as NumPy dtypes
+_STORAGE_DTYPES = {
+    'FloatStorage': np.float32,
+    'DoubleStorage': np.float64,
+    'HalfStorage': np.float16,
+    'LongStorage': np.int64,
+    'IntStorage': np.int32,
+    'ShortStorage': np.int16,
+    'CharStorage': np.int8,
+    'ByteStorage': np.uint8,
+    'BoolStorage': np.bool_,
+}
+
+
+def _rebuild_tensor(storage, offset, size, stride, requires_grad=False, backward_hooks=None, metadata=None):
+    itemsize = storage.dtype.itemsize
+    view = np.lib.stride_tricks.as_strided(storage[offset:], shape=tuple(size),
+                                           strides=tuple(s * itemsize for s in stride))
+    return np.array(view)
+
+
+def _rebuild_parameter(data, requires_grad=False, backward_hooks=None):
+    return data
+
+
+class _StateDictUnpickler(pickle.Unpickler):
+    """
+    Reads the data.pkl of a torch.save zip archive into NumPy arrays.
+    Only the handful of globals a plain state dict uses are allowed.
+    """
+    def __init__(self, file, archive, prefix, byteorder):
+        super().__init__(file)
+        self.archive = archive
+        self.prefix = prefix
+        self.byteorder = byteorder
+        self.storages = {}
+
+    def find_class(self, module, name):
+        if (module, name) == ('collections', 'OrderedDict'):
+            return OrderedDict
+        if (module, name) == ('torch._utils', '_rebuild_tensor_v2'):
+            return _rebuild_tensor
+        if (module, name) == ('torch._utils', '_rebuild_parameter'):
+            return _rebuild_parameter
+        if module == 'torch' and name in _STORAGE_DTYPES:
+            return np.dtype(_STORAGE_DTYPES[name]).newbyteorder(self.byteorder)
+        raise pickle.UnpicklingError(f"Unsupported object in checkpoint: {module}.{name}")
+
+    def persistent_load(self, pid):
+        _, dtype, key, _, _ = pid
+        if key not in self.storages:
+            data = self.archive.read(f"{self.prefix}/data/{key}")
+            self.storages[key] = np.frombuffer(data, dtype=dtype).astype(dtype.newbyteorder('='))
+        return self.storages[key]
+
+
+def load_state_dict(path):
+    """
+    Load a state dict saved with torch.save as {name: ndarray}, without
+    importing torch. Only the zip format (torch >= 1.6) is supported.
+    """
+    if not zipfile.is_zipfile(path):
+        raise ValueError(f"{path} is not a zip-format torch checkpoint.")
+    with zipfile.ZipFile(path) as archive:
+        pickle_name = next(name for name in archive.namelist() if name.endswith('/data.pkl'))
+        prefix = pickle_name[:-len('/data.pkl')]
+        try:
+            byteorder = archive.read(f"{prefix}/byteorder").decode().strip()
+        except KeyError:
+            byteorder = 'little'
+        with archive.open(pickle_name) as f:
+            state_dict = _StateDictUnpickler(f, archive, prefix, '<' if byteorder == 'little' else '>').load()
+    return OrderedDict((name, np.asarray(value)) for name, value in state_dict.items())
+
+
+def preprocessor_affine(preprocessor):
+    """
+    Express the fitted preprocessor as transform(x) = x * scale + offset.
+
+    The pipeline is probed rather than inspected, so any chain of per-feature
+    affine steps (StandardScaler, MinMaxScaler, ...) works; anything else
+    (imputation, one-hot, polynomial features) raises ValueError because it
+    cannot be folded into a linear layer.
+    """
+    names = list(preprocessor.feature_names_in_)
+    n = len(names)
+    probe = np.vstack([np.zeros(n), np.eye(n)])
+    out = np.asarray(preprocessor.transform(pd.DataFrame(probe, columns=names)), dtype=np.float64)
+    if out.shape[1] != n:
+        raise ValueError("Preprocessor changes the number of features and cannot be folded into the model.")
+    offset = out[0]
+    scale = out[1:] - offset
+    if not np.allclose(scale, np.diag(np.diag(scale))):
+        raise ValueError("Preprocessor mixes features and cannot be folded into the model.")
+    scale = np.diag(scale).copy()
+
+    rng = np.random.default_rng(0)
+    check = rng.normal(size=(8, n)) * 100
+    expected = np.asarray(preprocessor.transform(pd.DataFrame(check, columns=names)), dtype=np.float64)
+    if not np.allclose(check * scale + offset, expected, rtol=1e-6, atol=1e-6):
+        raise ValueError("Preprocessor is not affine and cannot be folded into the model.")
+    return scale, offset
+
+
+def _block_diagonal(a, b):
+    out = np.zeros((a.shape[0] + b.shape[0], a.shape[1] + b.shape[1]), dtype=np.float64)
+    out[:a.shape[0], :a.shape[1]] = a
+    out[a.shape[0]:, a.shape[1]:] = b
+    return out
+
+
+class NumpyMultiTaskModel:
+    """
+    AbsorpGenMultiTaskModel's forward pass as four fused NumPy matmuls.
+
+    The patient and drug branches are block-diagonal halves of the same two
+    layers (their outputs are concatenated anyway), the two heads share one
+    output matrix, and the preprocessor's scaling, when given as
+    (scale, offset), is folded into the first layer so raw features go in
+    directly. Dropout is a no-op at inference and is left out.
+    """
+    def __init__(self, state_dict, scale=None, offset=None):
+        w = {name: np.asarray(value, dtype=np.float64) for name, value in state_dict.items()}
+        n_patient = w['patient_branch.0.weight'].shape[1]
+
+        # Weights are stored transposed, (in, out), so each layer is X @ W + b
+        W1 = _block_diagonal(w['patient_branch.0.weight'].T, w['drug_branch.0.weight'].T)
+        b1 = np.concatenate([w['patient_branch.0.bias'], w['drug_branch.0.bias']])
+        if scale is not None:
+            # layer(x * s + o) = x @ (s[:, None] * W) + (o @ W + b)
+            b1 = b1 + offset @ W1
+            W1 = scale[:, None] * W1
+        W2 = _block_diagonal(w['patient_branch.2.weight'].T, w['drug_branch.2.weight'].T)
+        b2 = np.concatenate([w['patient_branch.2.bias'], w['drug_branch.2.bias']])
+        W5 = np.concatenate([w['regression_head.weight'], w['classification_head.weight']]).T
+        b5 = np.concatenate([w['regression_head.bias'], w['classification_head.bias']])
+
+        self.n_patient = n_patient
+        self.n_features = n_patient + w['drug_branch.0.weight'].shape[1]
+        self.n_regression = w['regression_head.weight'].shape[0]
+        # Widths of the patient half of the two fused branch layers
+        self._patient_widths = (w['patient_branch.0.weight'].shape[0], w['patient_branch.2.weight'].shape[0])
+        self.layers = [
+            (W1, b1),
+            (W2, b2),
+            (w['combined.0.weight'].T, w['combined.0.bias']),
+            (w['combined.3.weight'].T, w['combined.3.bias']),
+            (W5, b5),
+        ]
+        self.layers = [(np.ascontiguousarray(W, dtype=np.float32), b.astype(np.float32)) for W, b in self.layers]
+
+    def __call__(self, X):
+        """Regression outputs and class logits for a float32 (rows, features) matrix."""
+        h = X
+        for W, b in self.layers[:-1]:
+            h = h @ W
+            h += b
+            np.maximum(h, 0, out=h)
+        W, b = self.layers[-1]
+        out = h @ W
+        out += b
+        return out[:, :self.n_regression], out[:, self.n_regression:]
+
+    def drug_embeddings(self, X_drug):
+        """
+        Drug-branch output (the 16-dim drug embedding) for raw drug columns,
+        i.e. features n_patient onwards.
+        """
+        p1, p2 = self._patient_widths
+        (W1, b1), (W2, b2) = self.layers[:2]
+        h = X_drug @ W1[self.n_patient:, p1:]
+        h += b1[p1:]
+        np.maximum(h, 0, out=h)
+        h = h @ W2[p1:, p2:]
+        h += b2[p2:]
+        np.maximum(h, 0, out=h)
+        return h
+
+    def drug_terms(self, embeddings):
+        """What each drug embedding contributes to the first combined layer."""
+        p2 = self._patient_widths[1]
+        W3, _ = self.layers[2]
+        return embeddings @ W3[p2:]
+
+    def forward_with_drug_terms(self, X, drug_terms):
+        """
+        The forward pass for raw feature rows whose drug side is already
+        known: only the patient branch, the rest of the trunk and the heads
+        run. drug_terms holds one drug_terms() row per row of X.
+        """
+        p1, p2 = self._patient_widths
+        (W1, b1), (W2, b2), (W3, b3) = self.layers[:3]
+        h = X[:, :self.n_patient] @ W1[:self.n_patient, :p1]
+        h += b1[:p1]
+        np.maximum(h, 0, out=h)
+        h = h @ W2[:p1, :p2]
+        h += b2[:p2]
+        np.maximum(h, 0, out=h)
+        h = h @ W3[:p2]
+        h += drug_terms
+        h += b3
+        np.maximum(h, 0, out=h)
+        for W, b in self.layers[3:-1]:
+            h = h @ W
+            h += b
+            np.maximum(h, 0, out=h)
+        W, b = self.layers[-1]
+        out = h @ W
+        out += b
+        return out[:, :self.n_regression], out[:, self.n_regression:]
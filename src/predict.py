@@ -1,103 +1,261 @@
-import torch
 import pandas as pd
 import numpy as np
-from pathlib import Path
-import joblib
 import sys
 import os
 
 # Add the parent directory to the path so we can import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from .model import AbsorpGenMultiTaskModel
-from .drug_lookup import lookup_drug_features, suggest_alternative_drug
-from .rxnorm_lookup import get_most_common_brand
+from .model_registry import get_registry
+from .drug_lookup import lookup_drug_features, suggest_alternative_drugs
+from .drug_store import get_drug_store
+from .drug_embeddings import get_drug_embeddings
+from .features import build_features
+from .prediction_cache import get_prediction_cache, make_key
+from .name_resolver import get_name_resolver
 
-def predict_new(user_input, drug_name):
-    # Load drug features
-    drug_features = lookup_drug_features(drug_name)
+# Below this predicted bioavailability predict_new switches to the best of
+# the top FALLBACK_CANDIDATES alternatives, if that is predicted to do better
+FALLBACK_BIOAVAILABILITY = 0.7
+FALLBACK_CANDIDATES = 5
 
-    # Prepare patient features
-    patient_features = {
-        'age': user_input['age'] / 100,  # Scale to 0-1 range
-        'weight': user_input['weight'] / 200,  # Scale to 0-1 range
-        'sex': 1 if user_input['sex'].lower() == 'male' else 0,  # Binary encoding
-        'height': user_input['height'] / 200  # Scale to 0-1 range
+def predict_new(user_input, drug_name, use_cache=True):
+    """
+    Predict pharmacokinetics for one patient and drug.
+
+    The model is deterministic in eval mode, so results are cached on the
+    normalized patient fields, the drug name and the versions of the model
+    artifacts and drug table; a retrained model or edited table misses the
+    cache automatically. Pass use_cache=False to always run the model.
+    """
+    if not use_cache:
+        return _predict_new(user_input, drug_name)
+
+    cache = get_prediction_cache()
+    key = make_key(user_input, drug_name, get_registry().version, get_drug_store().version)
+    cached = cache.get(key)
+    if cached is not None:
+        return dict(cached)
+
+    results = _predict_new(user_input, drug_name)
+    cache.set(key, dict(results))
+    return results
+
+def _predict_new(user_input, drug_name):
+    outcome = _predict_new_many([(user_input, drug_name)])[0]
+    if isinstance(outcome, Exception):
+        raise outcome
+    return outcome
+
+def _drug_feature_table(drug_names, known=None):
+    """
+    Look up each distinct drug once, unless its features are given in known.
+    Returns the looked-up features as a table indexed by drug name.
+    """
+    raw = {}
+    missing = []
+    for name in drug_names:
+        if known and name in known:
+            raw[name] = known[name]
+            continue
+        try:
+            raw[name] = lookup_drug_features(name)
+        except ValueError:
+            missing.append(name)
+    if missing:
+        raise ValueError(f"Drugs not found in the database: {', '.join(missing)}")
+    return pd.DataFrame.from_dict(raw, orient='index')
+
+def predict_many(patients, drug_names, batch_size=4096, drug_features=None):
+    """
+    Vectorized predict_new for many patient/drug pairs.
+
+    patients is a DataFrame, a list of user_input dicts or a dict of columns
+    (age, weight, sex, height, route_admin). drug_names is either one name,
+    applied to every patient, or a sequence with one name per patient. Each
+    distinct drug is looked up once, the whole feature matrix goes through
+    the preprocessor in one call and the model runs on chunks of batch_size
+    rows.
+
+    drug_features optionally maps drug names to already looked-up features.
+
+    Unlike predict_new there is no low-bioavailability fallback; callers can
+    filter on the returned bioavailability column instead.
+
+    Returns a dict of equal-length columns.
+    """
+    patients = pd.DataFrame(patients).reset_index(drop=True)
+    n = len(patients)
+    if n == 0:
+        raise ValueError("No patients given.")
+
+    if isinstance(drug_names, str):
+        drug_names = [drug_names] * n
+    drug_names = pd.Series(list(drug_names), dtype=object)
+    if len(drug_names) != n:
+        raise ValueError(f"Got {n} patients but {len(drug_names)} drug names.")
+
+    codes, unique_drugs = pd.factorize(drug_names)
+    raw_table = _drug_feature_table(list(unique_drugs), drug_features)
+
+    # Each drug's features are broadcast to its rows by code
+    artifacts = get_registry().get()
+    features = build_features(patients, raw_table, artifacts.feature_names, drug_rows=codes)
+    reg_output, class_pred = artifacts.run(features, batch_size)
+
+    if 'formulation' in raw_table:
+        formulations = raw_table['formulation'].fillna('tablet').to_numpy(dtype=object)
+    else:
+        formulations = np.full(len(raw_table), 'tablet', dtype=object)
+    return {
+        'drug_name': drug_names.to_numpy(),
+        'bioavailability': reg_output[:, 0],
+        'tmax': reg_output[:, 1],
+        'cmax': reg_output[:, 2],
+        'dose': reg_output[:, 3],
+        'predicted_formulation_type': artifacts.classes[class_pred],
+        'recommended_formulation': formulations[codes],
+        'strength_mg_per_unit': raw_table['strength_mg_per_unit'].to_numpy(dtype=float)[codes],
+        'formulation_concentration': raw_table['formulation_concentration'].to_numpy(dtype=float)[codes]
     }
 
-    # Prepare drug features
-    drug_features_scaled = {
-        'molecular_weight': drug_features['molecular_weight'] / 1000,  # Scale to kg/mol
-        'logP': drug_features['logP'],
-        'pKa': drug_features['pKa'],
-        'route_admin': 1 if user_input['route_admin'].lower() == 'oral' else 0,  # Binary encoding
-        'strength_mg_per_unit': drug_features['strength_mg_per_unit'] / 1000,  # Scale to g/unit
-        'formulation_concentration': drug_features['formulation_concentration'] / 1000 if drug_features['formulation_concentration'] else 0  # Scale to g/mL
+def predict_formulary(user_input, drug_names=None, use_embeddings=True):
+    """
+    Score one patient against every drug in the formulary (the OTC list
+    and the drug store), or against drug_names.
+
+    With use_embeddings the drug branch is not run at all: each drug's
+    embedding comes from the precomputed cache (src.drug_embeddings), so
+    only the patient side of the network runs per drug. Otherwise, or when
+    the model backend has no separate drug branch, this is predict_many
+    with the patient repeated. Returns predict_many's columns.
+    """
+    cache = get_drug_embeddings()
+    table = cache.get()
+    rows = np.arange(len(table)) if drug_names is None else table.rows(drug_names)
+
+    if not use_embeddings or table.model is None:
+        names = list(table.names[rows])
+        known = dict(zip(names, table.drugs.iloc[rows].to_dict('records')))
+        return predict_many([user_input] * len(names), names, drug_features=known)
+
+    features = build_features([user_input], table.drugs, table.artifacts.feature_names, drug_rows=rows)
+    reg_output, class_pred = cache.run(features, rows, table)
+
+    drugs = table.drugs.iloc[rows]
+    return {
+        'drug_name': table.names[rows],
+        'bioavailability': reg_output[:, 0],
+        'tmax': reg_output[:, 1],
+        'cmax': reg_output[:, 2],
+        'dose': reg_output[:, 3],
+        'predicted_formulation_type': table.artifacts.classes[class_pred],
+        'recommended_formulation': drugs['formulation'].fillna('tablet').to_numpy(dtype=object),
+        'strength_mg_per_unit': drugs['strength_mg_per_unit'].to_numpy(dtype=float),
+        'formulation_concentration': drugs['formulation_concentration'].to_numpy(dtype=float)
     }
 
-    # Combine all features
-    all_features = {**patient_features, **drug_features_scaled}
-
-    df = pd.DataFrame([all_features])
-    for col in ['bioavailability', 'tmax', 'cmax', 'dose', 'formulation_type']:
-        df[col] = 0
-
-    # Load preprocessor and encoder
-    base = Path(__file__).resolve().parent.parent
-    preprocessor = joblib.load(base / 'models' / 'preprocessor_pipeline.pkl')
-    encoder = joblib.load(base / 'models' / 'formulation_encoder.pkl')
-
-    # Align with training features
-    X_input = df.drop(columns=['bioavailability', 'tmax', 'cmax', 'dose', 'formulation_type'])
-    X_input = X_input[preprocessor.feature_names_in_]
-    X = preprocessor.transform(X_input)
-    X_tensor = torch.tensor(X, dtype=torch.float32)
-
-    # Load model
-    model = AbsorpGenMultiTaskModel(X_tensor.shape[1])
-    model.load_state_dict(torch.load(base / 'models' / 'absorpgen_multitask.pt'))
-    model.eval()
-
-    # Predict
-    with torch.no_grad():
-        reg_output, class_logits = model(X_tensor)
-        class_probs = torch.softmax(class_logits, dim=1)
-        class_pred = class_probs.argmax(dim=1).item()
-
-    predicted_bioavailability = reg_output.numpy().flatten()[0]
-
-    # 🔁 Fallback if bioavailability too low
-    if predicted_bioavailability < 0.7:
-        alt_name, alt_features = suggest_alternative_drug(min_bioavailability=0.7)
-        print(f"\n⚠️  Bioavailability too low for '{drug_name}'. Switching to alternative: '{alt_name}'")
-        all_features.update(alt_features)
-        drug_name = alt_name
-        df = pd.DataFrame([all_features])
-        for col in ['bioavailability', 'tmax', 'cmax', 'dose', 'formulation_type']:
-            df[col] = 0
-        X_input = df.drop(columns=['bioavailability', 'tmax', 'cmax', 'dose', 'formulation_type'])
-        X_input = X_input[preprocessor.feature_names_in_]
-        X = preprocessor.transform(X_input)
-        X_tensor = torch.tensor(X, dtype=torch.float32)
-        with torch.no_grad():
-            reg_output, class_logits = model(X_tensor)
-            class_probs = torch.softmax(class_logits, dim=1)
-            class_pred = class_probs.argmax(dim=1).item()
-
-    # Format output
-    regression_outputs = reg_output.numpy().flatten()
-    # Use formulation from drug lookup instead of model prediction
-    formulation = drug_features['formulation']
-    labels = ['bioavailability', 'tmax', 'cmax', 'dose']
-    results = dict(zip(labels, regression_outputs))
-    results.update({
-        'recommended_formulation': formulation,
-        'final_drug_used': drug_name,
-        'strength_mg_per_unit': drug_features['strength_mg_per_unit'],
-        'formulation_concentration': drug_features['formulation_concentration']
-    })
+def predict_new_many(requests, use_cache=True):
+    """
+    predict_new for a list of (user_input, drug_name) requests, run as
+    batched forward passes. Used by the API's micro-batcher.
 
-    return results
+    Returns one entry per request: the same dict predict_new returns
+    (including the low-bioavailability fallback), or the exception raised
+    for that request, so one bad drug name does not fail the others.
+    Shares predict_new's cache; only the misses reach the model.
+    """
+    if not use_cache:
+        return _predict_new_many(requests)
+
+    cache = get_prediction_cache()
+    versions = (get_registry().version, get_drug_store().version)
+    keys = [make_key(user_input, drug_name, *versions) for user_input, drug_name in requests]
+    outcomes = [cache.get(key) for key in keys]
+    misses = [i for i, cached in enumerate(outcomes) if cached is None]
+    for i, cached in enumerate(outcomes):
+        if cached is not None:
+            outcomes[i] = dict(cached)
+
+    if misses:
+        computed = _predict_new_many([requests[i] for i in misses])
+        for i, results in zip(misses, computed):
+            if not isinstance(results, Exception):
+                cache.set(keys[i], dict(results))
+            outcomes[i] = results
+    return outcomes
+
+def _predict_new_many(requests):
+    outcomes = [None] * len(requests)
+    features = {}
+    valid = []
+    for i, (user_input, drug_name) in enumerate(requests):
+        try:
+            if drug_name not in features:
+                features[drug_name] = lookup_drug_features(drug_name)
+            valid.append(i)
+        except Exception as e:
+            outcomes[i] = e
+    if not valid:
+        return outcomes
+
+    patients = pd.DataFrame([requests[i][0] for i in valid])
+    names = [requests[i][1] for i in valid]
+    m = len(valid)
+
+    # 🔁 The fallback candidates are scored in the same forward pass as the
+    # requested drugs: rows [c*m, (c+1)*m) pair every request with candidate c-1
+    try:
+        alternatives = suggest_alternative_drugs(FALLBACK_BIOAVAILABILITY, k=FALLBACK_CANDIDATES)
+    except ValueError:
+        alternatives = []
+    known = {**dict(alternatives), **features}
+    scored = predict_many(pd.concat([patients] * (len(alternatives) + 1), ignore_index=True),
+                          names + [alt_name for alt_name, _ in alternatives for _ in range(m)],
+                          drug_features=known)
+    bioavailability = scored['bioavailability'].reshape(len(alternatives) + 1, m)
+
+    # Fallback if bioavailability too low: the candidate predicted best for
+    # this patient, as long as it is another drug (brand names and aliases
+    # are compared by generic) and is predicted to do better than the request
+    resolver = get_name_resolver()
+    def generic(name):
+        resolved = resolver.generic_name(name)
+        return (resolved if resolved is not None else name).upper()
+    alternative_generics = [generic(alt_name) for alt_name, _ in alternatives]
+
+    fallback = {}
+    for j in np.flatnonzero(bioavailability[0] < FALLBACK_BIOAVAILABILITY):
+        requested = generic(names[j])
+        allowed = [c for c, alt_generic in enumerate(alternative_generics) if alt_generic != requested]
+        if not allowed:
+            continue
+        best = max(allowed, key=lambda c: bioavailability[c + 1, j])
+        if bioavailability[best + 1, j] > bioavailability[0, j]:
+            fallback[j] = best
+
+    labels = ['bioavailability', 'tmax', 'cmax', 'dose']
+    for j, i in enumerate(valid):
+        if outcomes[i] is not None:
+            continue
+        if j in fallback:
+            row = (fallback[j] + 1) * m + j
+            final_drug, drug_features = alternatives[fallback[j]]
+        else:
+            row = j
+            final_drug, drug_features = names[j], features[names[j]]
+        results = {label: scored[label][row] for label in labels}
+        # Formulation and strength describe the drug actually recommended;
+        # switched_from names the requested drug when the fallback replaced it
+        results.update({
+            'recommended_formulation': drug_features['formulation'],
+            'final_drug_used': final_drug,
+            'strength_mg_per_unit': drug_features['strength_mg_per_unit'],
+            'formulation_concentration': drug_features['formulation_concentration'],
+            'switched_from': names[j] if j in fallback else None
+        })
+        outcomes[i] = results
+    return outcomes
 
 # 🧪 Manual test
 if __name__ == "__main__":
@@ -112,6 +270,9 @@ if __name__ == "__main__":
     advanced_mode = False
 
     predicted = predict_new(user_input, drug_name)
+    if predicted['switched_from']:
+        print(f"\n⚠️  Bioavailability too low for '{predicted['switched_from']}'. "
+              f"Switching to alternative: '{predicted['final_drug_used']}'")
 
     # Dose formatting
     dose = predicted['dose']
@@ -123,12 +284,14 @@ if __name__ == "__main__":
         mL = max(1.0, dose / concentration)
         formatted_dose = f"{round(mL, 1)} mL"
     else:
-        tablets = max(1, round(dose / strength))
-        formatted_dose = f"{tablets} tablet(s) of {int(strength)} mg"
+        from .dose_composition import compose_dose, describe_composition
+        from .drug_lookup import available_strengths
+        strengths = available_strengths(predicted['final_drug_used']).get(form) or (strength,)
+        formatted_dose = describe_composition(compose_dose(dose, strengths))
 
     # ✅ Get most common brand name
-    brand_name = get_most_common_brand(predicted['final_drug_used'])
-    if "❌" in brand_name:
+    brand_name = get_name_resolver().brand_name(predicted['final_drug_used'])
+    if brand_name is None:
         final_display = predicted['final_drug_used']
     else:
         final_display = f"{brand_name} ({predicted['final_drug_used']})"
@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Fields of user_input that predict_new actually reads
+PREDICTION_FIELDS = ('age', 'weight', 'sex', 'height', 'route_admin')
+
+
+def _canonical_number(value):
+    if value is None:
+        return None
+    return round(float(value), 6)
+
+
+def make_key(user_input, drug_name, *versions):
+    """
+    Cache key for one prediction: the normalized patient fields, the drug
+    name and the versions of everything the result depends on (model
+    artifacts, drug data), so retraining invalidates old entries.
+    """
+    get = user_input.get
+    return (
+        _canonical_number(get('age')),
+        _canonical_number(get('weight')),
+        str(get('sex') or '').strip().lower(),
+        _canonical_number(get('height')),
+        str(get('route_admin') or '').strip().lower(),
+        drug_name.strip().upper(),
+    ) + tuple(versions)
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with a per-entry time-to-live.
+
+    Holds at most maxsize entries; the least recently used one is evicted
+    when full, and entries older than ttl seconds count as misses.
+    """
+    def __init__(self, maxsize=4096, ttl=300.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+_cache = PredictionCache(
+    maxsize=int(os.environ.get('ABSORPGEN_CACHE_SIZE', 4096)),
+    ttl=float(os.environ.get('ABSORPGEN_CACHE_TTL', 300))
+)
+
+
+def get_prediction_cache():
+    """Process-wide cache used by predict_new."""
+    return _cache
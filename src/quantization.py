@@ -0,0 +1,51 @@
+import copy
+import io
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from .features import TARGETS
+
+
+def quantize_dynamic(model):
+    """
+    Dynamic int8 copy of a trained model: every nn.Linear stores int8
+    weights and quantizes its activations on the fly, so no calibration
+    data is needed. Works for AbsorpGenMultiTaskModel and
+    BioavailabilityMLP alike; the original model is left untouched.
+    """
+    model = copy.deepcopy(model).eval()
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def serialized_size(model):
+    """Bytes taken by the model's state dict, i.e. its resident weights."""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def drift_report(reference, quantized, reference_classes=None, quantized_classes=None):
+    """
+    Compare quantized regression outputs with the float model's, per target.
+
+    Both arrays are (rows, targets) in TARGETS order (a single column is
+    treated as bioavailability). Returns {target: {mae, max_abs, relative}}
+    where relative is the MAE over the mean absolute float output, plus
+    class_agreement when class predictions are given.
+    """
+    reference = np.asarray(reference, dtype=np.float64).reshape(len(reference), -1)
+    quantized = np.asarray(quantized, dtype=np.float64).reshape(len(quantized), -1)
+    report = {}
+    for i, target in enumerate(TARGETS[:reference.shape[1]]):
+        error = np.abs(quantized[:, i] - reference[:, i])
+        scale = np.abs(reference[:, i]).mean()
+        report[target] = {
+            'mae': float(error.mean()),
+            'max_abs': float(error.max()),
+            'relative': float(error.mean() / scale) if scale else 0.0
+        }
+    if reference_classes is not None:
+        report['class_agreement'] = float(np.mean(np.asarray(reference_classes) == np.asarray(quantized_classes)))
+    return report
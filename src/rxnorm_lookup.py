@@ -1,38 +1,40 @@
+# Common brand names mapping
+BRAND_NAMES = {
+    "ACETAMINOPHEN": "Tylenol",
+    "IBUPROFEN": "Advil",
+    "DEXTROMETHORPHAN": "Robitussin",
+    "PRAZOSIN": "Minipress",
+    "DOXAZOSIN": "Cardura",
+    "TERAZOSIN": "Hytrin",
+    "CIPROFLOXACIN": "Cipro",
+    "WARFARIN": "Coumadin",
+    "NYQUIL": "NyQuil"
+}
+
+# Reverse mapping for brand to drug name
+GENERIC_NAMES = {
+    "Tylenol": "ACETAMINOPHEN",
+    "Advil": "IBUPROFEN",
+    "Robitussin": "DEXTROMETHORPHAN",
+    "Minipress": "PRAZOSIN",
+    "Cardura": "DOXAZOSIN",
+    "Hytrin": "TERAZOSIN",
+    "Cipro": "CIPROFLOXACIN",
+    "Coumadin": "WARFARIN",
+    "NyQuil": "DEXTROMETHORPHAN"  # NyQuil contains dextromethorphan
+}
+
 def get_most_common_brand(drug_name: str) -> str:
     """
     Get the most common brand name for a given drug.
     Returns the drug name itself if no brand name is found.
+
+    Given a brand name this returns its generic instead; callers that need
+    one direction should use name_resolver's generic_name / brand_name.
     """
-    # Common brand names mapping
-    brand_mapping = {
-        "ACETAMINOPHEN": "Tylenol",
-        "IBUPROFEN": "Advil",
-        "DEXTROMETHORPHAN": "Robitussin",
-        "PRAZOSIN": "Minipress",
-        "DOXAZOSIN": "Cardura",
-        "TERAZOSIN": "Hytrin",
-        "CIPROFLOXACIN": "Cipro",
-        "WARFARIN": "Coumadin",
-        "NYQUIL": "NyQuil",
-        "NYQUILL": "NyQuil"  # Common misspelling
-    }
-    
-    # Reverse mapping for brand to drug name
-    drug_mapping = {
-        "Tylenol": "ACETAMINOPHEN",
-        "Advil": "IBUPROFEN",
-        "Robitussin": "DEXTROMETHORPHAN",
-        "Minipress": "PRAZOSIN",
-        "Cardura": "DOXAZOSIN",
-        "Hytrin": "TERAZOSIN",
-        "Cipro": "CIPROFLOXACIN",
-        "Coumadin": "WARFARIN",
-        "NyQuil": "DEXTROMETHORPHAN"  # NyQuil contains dextromethorphan
-    }
-    
     # If input is a brand name, return the corresponding drug name
-    if drug_name in drug_mapping:
-        return drug_mapping[drug_name]
+    if drug_name in GENERIC_NAMES:
+        return GENERIC_NAMES[drug_name]
     
     # If input is a drug name, return the brand name
-    return brand_mapping.get(drug_name.upper(), drug_name) 
\ No newline at end of file
+    return BRAND_NAMES.get(drug_name.upper(), drug_name) 
\ No newline at end of file
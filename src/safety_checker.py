@@ -1,13 +1,110 @@
 from typing import List, Dict, Set
-import requests
 from pathlib import Path
 import json
+import threading
+
+import numpy as np
+
+from .name_resolver import load_aliases, normalize_name
+
+
+class SafetyIndex:
+    """
+    One safety database compiled for lookups.
+
+    Drug keys and the listed terms (medications, conditions or allergens)
+    are normalized and alias-resolved once. by_drug maps each drug to the
+    frozenset of its terms for single-drug checks; by_term maps each term
+    to the sorted array of drug ids it is listed under, so a whole
+    candidate list is screened against one term with a single np.isin.
+    """
+    def __init__(self, database: Dict[str, List[str]], resolve):
+        by_drug = {}
+        for drug, terms in database.items():
+            key = resolve(drug)
+            by_drug[key] = by_drug.get(key, frozenset()) | frozenset(resolve(term) for term in terms)
+        self.by_drug = by_drug
+        self.drug_ids = {drug: i for i, drug in enumerate(by_drug)}
+
+        rows = {}
+        for drug, terms in by_drug.items():
+            for term in terms:
+                rows.setdefault(term, []).append(self.drug_ids[drug])
+        self.by_term = {term: np.array(sorted(ids), dtype=np.int64) for term, ids in rows.items()}
+
+    def updated(self, changes, resolve):
+        """
+        A new index with (drug, term, action) changes applied, oldest first.
+        Only the drugs and terms the changes name are rebuilt; everything
+        else is shared with this index, which is left untouched for
+        readers still using it.
+        """
+        updated = SafetyIndex.__new__(SafetyIndex)
+        by_drug = dict(self.by_drug)
+        drug_ids = dict(self.drug_ids)
+        touched = {}
+        for drug, term, action in changes:
+            key, term_key = resolve(drug), resolve(term)
+            if key not in drug_ids:
+                drug_ids[key] = len(drug_ids)
+            if term_key not in touched:
+                touched[term_key] = set(self.by_term[term_key].tolist()) if term_key in self.by_term else set()
+            terms = by_drug.get(key, frozenset())
+            if action == 'add':
+                by_drug[key] = terms | {term_key}
+                touched[term_key].add(drug_ids[key])
+            else:
+                by_drug[key] = terms - {term_key}
+                touched[term_key].discard(drug_ids[key])
+
+        by_term = dict(self.by_term)
+        for term_key, ids in touched.items():
+            if ids:
+                by_term[term_key] = np.array(sorted(ids), dtype=np.int64)
+            else:
+                by_term.pop(term_key, None)
+        updated.by_drug = by_drug
+        updated.drug_ids = drug_ids
+        updated.by_term = by_term
+        return updated
+
+    def matches(self, drug_key: str, term_key: str) -> bool:
+        return term_key in self.by_drug.get(drug_key, ())
+
+    def ids(self, drug_keys: List[str]) -> np.ndarray:
+        """Drug id of each key, -1 for drugs the database does not list."""
+        return np.fromiter((self.drug_ids.get(key, -1) for key in drug_keys), dtype=np.int64, count=len(drug_keys))
+
+    def flagged(self, drug_ids: np.ndarray, term_key: str) -> np.ndarray:
+        """Positions in drug_ids whose drug lists term_key."""
+        listed = self.by_term.get(term_key)
+        if listed is None:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(np.isin(drug_ids, listed))
+
+
+# Raw database attribute and position in SafetyChecker._compiled of each dataset
+_DATASETS = {
+    'interactions': ('interactions_db', 1),
+    'contraindications': ('contraindications_db', 2),
+    'allergies': ('allergy_db', 3),
+}
+
 
 class SafetyChecker:
-    def __init__(self):
+    def __init__(self, aliases: Dict[str, str] = None, store=None):
         self.interactions_db = self._load_interactions_db()
         self.contraindications_db = self._load_contraindications_db()
         self.allergy_db = self._load_allergy_db()
+        self.aliases = self._load_aliases() if aliases is None else aliases
+        self._matrix = None
+        self._compile()
+
+        # With a SafetyStore the databases come from it and follow its syncs
+        self.store = store
+        self._store_state = None
+        self._refresh_lock = threading.Lock()
+        self.refresh()
 
     def _load_interactions_db(self) -> Dict[str, List[str]]:
         """Load drug interactions database from file."""
@@ -36,8 +133,139 @@ class SafetyChecker:
                 return json.load(f)
         return {}
 
-    def check_safety(self, 
-                    drug_name: str, 
+    def _load_aliases(self) -> Dict[str, str]:
+        """Brand and alternative names mapped to the name the databases use (shared with NameResolver)."""
+        return load_aliases()
+
+    def _compile(self):
+        """
+        Build the normalized indexes from the raw databases. They are
+        swapped in with a single assignment, so concurrent checks see either
+        the old databases or the new ones, never a mix.
+        """
+        aliases = {normalize_name(alias): normalize_name(name) for alias, name in self.aliases.items()}
+
+        def resolve(name):
+            key = normalize_name(name)
+            return aliases.get(key, key)
+
+        self._spelling_cache = {}
+        self._compiled = (resolve,
+                          SafetyIndex(self.interactions_db, resolve),
+                          SafetyIndex(self.contraindications_db, resolve),
+                          SafetyIndex(self.allergy_db, resolve))
+
+    def resolve(self, name: str) -> str:
+        """Normalized key for a drug, medication, condition or allergen name."""
+        return self._compiled[0](name)
+
+    def set_databases(self,
+                      interactions: Dict[str, List[str]] = None,
+                      contraindications: Dict[str, List[str]] = None,
+                      allergies: Dict[str, List[str]] = None):
+        """Replace any of the raw databases and recompile the indexes."""
+        if interactions is not None:
+            self.interactions_db = interactions
+        if contraindications is not None:
+            self.contraindications_db = contraindications
+        if allergies is not None:
+            self.allergy_db = allergies
+        self._compile()
+
+    def _spellings(self, attribute, database, resolve):
+        """Raw drug keys of a database grouped by resolved key, cached until the next recompile."""
+        spellings = self._spelling_cache.get(attribute)
+        if spellings is None:
+            spellings = {}
+            for drug in database:
+                spellings.setdefault(resolve(drug), []).append(drug)
+            self._spelling_cache[attribute] = spellings
+        return spellings
+
+    def apply_changes(self, changes):
+        """
+        Apply (dataset, drug, term, action) changes to the databases and
+        swap in indexes updated for just the drugs and terms involved.
+
+        Drugs and terms are matched by normalize_name, as the safety store
+        keys its rows: a change for ' aspirin' edits the 'Aspirin' entry
+        and removes 'WARFARIN' as well as 'Warfarin'. A brand or alias
+        (e.g. Tylenol) is an entry of its own, and the indexes list a pair
+        for as long as any entry resolving to it does, which is exactly
+        what a full recompile of the raw databases gives.
+        """
+        compiled = list(self._compiled)
+        resolve = compiled[0]
+        raw = {}
+        spelling_cache = dict(self._spelling_cache)
+        by_dataset = {}
+        for dataset, drug, term, action in changes:
+            by_dataset.setdefault(dataset, []).append((drug, term, action))
+        for dataset, dataset_changes in by_dataset.items():
+            if dataset not in _DATASETS:
+                raise ValueError(f"Unknown safety dataset '{dataset}'.")
+            attribute, position = _DATASETS[dataset]
+            database = dict(getattr(self, attribute))
+            spellings = dict(self._spellings(attribute, database, resolve))
+            touched = {}
+            for drug, term, action in dataset_changes:
+                key, name, term_name = resolve(drug), normalize_name(drug), normalize_name(term)
+                matching = [d for d in spellings.get(key, ()) if normalize_name(d) == name]
+                if not matching:
+                    matching = [drug]
+                    spellings[key] = spellings.get(key, []) + matching
+                for raw_drug in matching:
+                    database[raw_drug] = [t for t in database.get(raw_drug, []) if normalize_name(t) != term_name]
+                if action == 'add':
+                    database[matching[0]] = database[matching[0]] + [term]
+                touched[(key, resolve(term))] = None
+
+            # Other spellings or aliases of the drug may still list the term
+            index_changes = []
+            for key, term_key in touched:
+                listed = any(resolve(t) == term_key for d in spellings[key] for t in database.get(d, ()))
+                index_changes.append((key, term_key, 'add' if listed else 'remove'))
+            raw[attribute] = database
+            spelling_cache[attribute] = spellings
+            compiled[position] = compiled[position].updated(index_changes, lambda name: name)
+
+        for attribute, database in raw.items():
+            setattr(self, attribute, database)
+        self._spelling_cache = spelling_cache
+        self._compiled = tuple(compiled)
+
+    def refresh(self) -> bool:
+        """
+        Pick up whatever has been synced into the store since the last
+        refresh: a full load the first time, then only the newer changes.
+        A stat call when nothing changed. Returns True if anything was
+        applied.
+        """
+        if self.store is None:
+            return False
+        version = self.store.version
+        if version is None or (self._store_state is not None and self._store_state[0] == version):
+            return False
+        with self._refresh_lock:
+            state = self._store_state
+            if state is not None and state[0] == version:
+                return False
+            if state is None or state[1] is None:
+                # An unseeded store holds at most a delta; keep the JSON databases until it is seeded
+                if not self.store.is_seeded():
+                    self._store_state = (version, None)
+                    return False
+                databases, seq = self.store.load()
+                self.set_databases(**databases)
+            else:
+                changes, seq = self.store.changes_since(state[1])
+                if changes:
+                    self.apply_changes(changes)
+            self._store_state = (version, seq)
+        return True
+
+    def check_safety(self,
+                    drug_name: str,
                     current_medications: List[str] = None,
                     allergies: List[str] = None,
                     conditions: List[str] = None) -> List[str]:
@@ -46,49 +274,128 @@ class SafetyChecker:
         Returns a list of warnings if any safety issues are found.
         """
         warnings = []
-        
+
         # Check drug interactions
         if current_medications:
             interactions = self.check_interactions(drug_name, current_medications)
             warnings.extend(interactions)
-        
+
         # Check contraindications
         if conditions:
             contraindications = self.check_contraindications(drug_name, conditions)
             warnings.extend(contraindications)
-        
+
         # Check allergies
         if allergies:
             allergy_warnings = self.check_allergies(drug_name, allergies)
             warnings.extend(allergy_warnings)
-        
+
         return warnings
 
     def check_interactions(self, drug_name: str, current_medications: List[str]) -> List[str]:
         """Check for drug-drug interactions."""
-        warnings = []
-        for med in current_medications:
-            if med in self.interactions_db.get(drug_name, []):
-                warnings.append(f"Warning: {drug_name} may interact with {med}")
-        return warnings
+        resolve, index, _, _ = self._compiled
+        key = resolve(drug_name)
+        return [f"Warning: {drug_name} may interact with {med}"
+                for med in current_medications if index.matches(key, resolve(med))]
 
     def check_contraindications(self, drug_name: str, conditions: List[str]) -> List[str]:
         """Check for contraindications based on medical conditions."""
-        warnings = []
-        for condition in conditions:
-            if condition in self.contraindications_db.get(drug_name, []):
-                warnings.append(f"Warning: {drug_name} is contraindicated in {condition}")
-        return warnings
+        resolve, _, index, _ = self._compiled
+        key = resolve(drug_name)
+        return [f"Warning: {drug_name} is contraindicated in {condition}"
+                for condition in conditions if index.matches(key, resolve(condition))]
 
     def check_allergies(self, drug_name: str, allergies: List[str]) -> List[str]:
         """Check for potential allergic reactions."""
-        warnings = []
-        for allergy in allergies:
-            if allergy in self.allergy_db.get(drug_name, []):
-                warnings.append(f"Warning: {drug_name} may cause cross-reactivity with {allergy} allergy")
+        resolve, _, _, index = self._compiled
+        key = resolve(drug_name)
+        return [f"Warning: {drug_name} may cause cross-reactivity with {allergy} allergy"
+                for allergy in allergies if index.matches(key, resolve(allergy))]
+
+    def check_safety_many(self,
+                          drug_names: List[str],
+                          current_medications: List[str] = None,
+                          allergies: List[str] = None,
+                          conditions: List[str] = None) -> List[List[str]]:
+        """
+        check_safety for a whole candidate list or formulary at once.
+        Each of the patient's medications, conditions and allergies is
+        screened against every drug with one vectorized lookup. Returns one
+        warning list per drug name, in the same order and wording as
+        check_safety.
+        """
+        resolve, interactions, contraindications, allergy_index = self._compiled
+        drug_names = list(drug_names)
+        warnings = [[] for _ in drug_names]
+        checks = [
+            (interactions, current_medications, "Warning: {drug} may interact with {term}"),
+            (contraindications, conditions, "Warning: {drug} is contraindicated in {term}"),
+            (allergy_index, allergies, "Warning: {drug} may cause cross-reactivity with {term} allergy"),
+        ]
+        checks = [(index, terms, message) for index, terms, message in checks if terms and index.by_term]
+        if not checks:
+            return warnings
+
+        keys = [resolve(name) for name in drug_names]
+        for index, terms, message in checks:
+            drug_ids = index.ids(keys)
+            for term in terms:
+                for position in index.flagged(drug_ids, resolve(term)):
+                    warnings[position].append(message.format(drug=drug_names[position], term=term))
         return warnings
 
-    def update_databases(self):
-        """Update safety databases from external sources."""
-        # TODO: Implement OpenFDA API integration for real-time updates
-        pass 
\ No newline at end of file
+    def interaction_matrix(self):
+        """The InteractionMatrix for the current interactions database, built on first use."""
+        compiled = self._compiled
+        cached = self._matrix
+        if cached is None or cached[0] is not compiled:
+            from .interaction_matrix import InteractionMatrix
+            cached = (compiled, InteractionMatrix(self.interactions_db, compiled[0]))
+            self._matrix = cached
+        return cached[1]
+
+    def check_regimen(self, medications: List[str]) -> List[str]:
+        """Warnings for every interacting pair within a patient's medication list."""
+        return [f"Warning: {a} may interact with {b}"
+                for a, b in self.interaction_matrix().regimen_interactions(medications)]
+
+    def interaction_free(self, drug_names: List[str], medications: List[str]) -> np.ndarray:
+        """Boolean mask aligned with drug_names: True where the drug interacts with none of the medications."""
+        return self.interaction_matrix().interaction_free(drug_names, medications)
+
+    def update_databases(self, base_url: str = None, **kwargs) -> Dict:
+        """
+        Update the safety databases from an OpenFDA-compatible endpoint
+        (see safety_sync.sync) and apply the changes here. Other processes
+        sharing the store pick them up on their next refresh().
+        """
+        from .safety_store import SafetyStore
+        from .safety_sync import sync
+
+        if self.store is None:
+            self.store = SafetyStore()
+        self.store.seed_if_needed({dataset: getattr(self, attribute) for dataset, (attribute, _) in _DATASETS.items()})
+        summary = sync(base_url, self.store, **kwargs)
+        self.refresh()
+        return summary
+
+
+_checker = None
+_checker_lock = threading.Lock()
+
+
+def get_safety_checker():
+    """
+    Process-wide SafetyChecker backed by the default SafetyStore. Every call
+    refreshes it, so syncs are picked up without restarting the process;
+    until the store exists the bundled JSON files are used.
+    """
+    global _checker
+    if _checker is None:
+        with _checker_lock:
+            if _checker is None:
+                from .safety_store import SafetyStore
+                _checker = SafetyChecker(store=SafetyStore())
+    _checker.refresh()
+    return _checker
@@ -0,0 +1,217 @@
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from .name_resolver import normalize_name
+
+DEFAULT_STORE_PATH = os.environ.get('ABSORPGEN_SAFETY_STORE', 'data/safety.sqlite')
+
+# The three safety databases, by the names SafetyChecker.set_databases uses
+DATASETS = ('interactions', 'contraindications', 'allergies')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    dataset TEXT NOT NULL,
+    drug TEXT NOT NULL,
+    term TEXT NOT NULL,
+    PRIMARY KEY (dataset, drug, term)
+);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    dataset TEXT NOT NULL,
+    drug TEXT NOT NULL,
+    term TEXT NOT NULL,
+    action TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    dataset TEXT PRIMARY KEY,
+    cursor TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# The JSON files the safety databases ship as, under data/
+BUNDLED_FILES = {
+    'interactions': 'drug_interactions.json',
+    'contraindications': 'contraindications.json',
+    'allergies': 'allergy_cross_reactivity.json',
+}
+
+
+def bundled_databases():
+    """The safety databases shipped with the repo, as {dataset: {drug: [terms]}}."""
+    base = Path(__file__).resolve().parent.parent / 'data'
+    databases = {}
+    for dataset, name in BUNDLED_FILES.items():
+        path = base / name
+        databases[dataset] = {}
+        if path.exists():
+            with open(path, 'r') as f:
+                databases[dataset] = json.load(f)
+    return databases
+
+
+class SafetyStore:
+    """
+    On-disk copy of the safety databases that sync jobs update in place.
+
+    entries holds the current (dataset, drug, term) rows, indexed by their
+    primary key, so applying a delta touches only the rows it names.
+    Every change that actually alters entries is also appended to the
+    changes log; SafetyChecker instances (one per API worker) remember the
+    last seq they applied and read only the newer changes, so picking up a
+    sync costs as much as the delta rather than a full reload. sync_state
+    keeps each dataset's cursor for the next incremental pull.
+
+    A store only replaces the bundled JSON databases once it has been
+    seeded with them (see seed_if_needed, which sync calls first), so a
+    store holding nothing but a delta is never loaded as the full set.
+
+    Drugs and terms are stored normalized (normalize_name), as the
+    checker's indexes key them, so a delta for ' Aspirin' and one for
+    'aspirin' address the same row.
+    """
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        base = Path(__file__).resolve().parent.parent
+        self.path = base / path
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def exists(self):
+        return self.path.exists()
+
+    @property
+    def version(self):
+        """Changes whenever a sync commits; None while the store does not exist."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def is_empty(self):
+        if not self.exists():
+            return True
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT 1 FROM entries LIMIT 1").fetchone() is None
+        finally:
+            conn.close()
+
+    def is_seeded(self):
+        """Whether the store has been seeded with full databases, so a load is complete."""
+        if not self.exists():
+            return False
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT 1 FROM meta WHERE key = 'seeded'").fetchone() is not None
+        finally:
+            conn.close()
+
+    def seed(self, databases):
+        """
+        Fill an empty store from {dataset: {drug: [terms]}}, e.g. the bundled
+        JSON files, before the first sync. Seeding is not logged as changes.
+        """
+        rows = [(dataset, normalize_name(drug), normalize_name(term))
+                for dataset in DATASETS
+                for drug, terms in databases.get(dataset, {}).items()
+                for term in terms]
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany("INSERT OR IGNORE INTO entries VALUES (?, ?, ?)", rows)
+                    conn.execute("INSERT OR REPLACE INTO meta VALUES ('seeded', '1')")
+            finally:
+                conn.close()
+        return len(rows)
+
+    def seed_if_needed(self, databases=None):
+        """Seed the store from databases (default: bundled_databases()) unless it already is. Returns rows seeded."""
+        if self.is_seeded():
+            return 0
+        return self.seed(bundled_databases() if databases is None else databases)
+
+    def load(self):
+        """
+        All three databases as {dataset: {drug: [terms]}} plus the last seq
+        they include, read in one transaction.
+        """
+        databases = {dataset: {} for dataset in DATASETS}
+        conn = self._connect()
+        try:
+            with conn:
+                for dataset, drug, term in conn.execute("SELECT dataset, drug, term FROM entries ORDER BY rowid"):
+                    if dataset in databases:
+                        databases[dataset].setdefault(drug, []).append(term)
+                seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+        finally:
+            conn.close()
+        return databases, seq
+
+    def changes_since(self, seq):
+        """Changes after seq as (dataset, drug, term, action) tuples, oldest first, and the new last seq."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT seq, dataset, drug, term, action FROM changes WHERE seq > ? ORDER BY seq",
+                                (seq,)).fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            return [], seq
+        return [row[1:] for row in rows], rows[-1][0]
+
+    def cursor(self, dataset):
+        """Where the next incremental pull of a dataset starts, or None before the first sync."""
+        if not self.exists():
+            return None
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT cursor FROM sync_state WHERE dataset = ?", (dataset,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def apply(self, dataset, deltas, cursor=None):
+        """
+        Apply (drug, term, action) deltas to one dataset, in order, and move
+        its cursor, all in one transaction. action is 'add' or 'remove';
+        deltas that change nothing (re-delivered records) are not logged.
+        Returns the number of changes made.
+        """
+        if dataset not in DATASETS:
+            raise ValueError(f"Unknown safety dataset '{dataset}'. Choose from {', '.join(DATASETS)}.")
+        applied = 0
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    for drug, term, action in deltas:
+                        drug, term = normalize_name(drug), normalize_name(term)
+                        if action == 'add':
+                            cur = conn.execute("INSERT OR IGNORE INTO entries VALUES (?, ?, ?)", (dataset, drug, term))
+                        elif action == 'remove':
+                            cur = conn.execute("DELETE FROM entries WHERE dataset = ? AND drug = ? AND term = ?",
+                                               (dataset, drug, term))
+                        else:
+                            raise ValueError(f"Unknown delta action '{action}'.")
+                        if cur.rowcount:
+                            conn.execute("INSERT INTO changes (dataset, drug, term, action) VALUES (?, ?, ?, ?)",
+                                         (dataset, drug, term, action))
+                            applied += 1
+                    if cursor is not None:
+                        conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (dataset, cursor))
+            finally:
+                conn.close()
+        return applied
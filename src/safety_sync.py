@@ -0,0 +1,119 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .safety_store import DATASETS, SafetyStore
+
+# Endpoint path of each dataset, relative to the base URL
+ENDPOINTS = {
+    'interactions': 'drug/interactions.json',
+    'contraindications': 'drug/contraindications.json',
+    'allergies': 'drug/allergies.json',
+}
+
+DEFAULT_PAGE_SIZE = 1000
+
+
+def make_session(pool_size=8, retries=3):
+    """A requests session with a connection pool sized for the concurrent page fetches."""
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=('GET',))
+    adapter = HTTPAdapter(pool_connections=len(ENDPOINTS), pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def _get_page(session, url, since, skip, limit, timeout):
+    params = {'sort': 'last_updated:asc', 'skip': skip, 'limit': limit}
+    if since:
+        # Inclusive: a record published later with the cursor's own timestamp
+        # is still pulled; re-delivered ones are no-ops in SafetyStore.apply
+        params['search'] = f'last_updated:[{since} TO *]'
+    response = session.get(url, params=params, timeout=timeout)
+    # OpenFDA answers 404 NOT_FOUND when a search matches nothing
+    if response.status_code == 404:
+        return [], 0
+    response.raise_for_status()
+    body = response.json()
+    return body.get('results', []), body.get('meta', {}).get('results', {}).get('total', 0)
+
+
+def fetch_deltas(session, base_url, dataset, since=None, page_size=DEFAULT_PAGE_SIZE, executor=None, timeout=10):
+    """
+    Yield pages of a dataset's delta records updated at or after since,
+    oldest first.
+
+    The endpoint follows OpenFDA's conventions: search/sort/skip/limit
+    query parameters, a meta.results.total count and a results list. Each
+    record is {"drug", "term", "action": "add" | "remove", "last_updated"}.
+    The first page gives the total; the rest are fetched concurrently on
+    executor and yielded in order.
+    """
+    url = f"{base_url.rstrip('/')}/{ENDPOINTS[dataset]}"
+    first, total = _get_page(session, url, since, 0, page_size, timeout)
+    yield first
+    skips = range(page_size, total, page_size)
+    if executor is None or len(skips) < 2:
+        for skip in skips:
+            yield _get_page(session, url, since, skip, page_size, timeout)[0]
+        return
+    yield from (page for page, _ in executor.map(
+        lambda skip: _get_page(session, url, since, skip, page_size, timeout), skips))
+
+
+def sync_dataset(session, base_url, store, dataset, page_size=DEFAULT_PAGE_SIZE, executor=None, timeout=10):
+    """Pull one dataset's deltas from its cursor on and apply them page by page. Returns (received, applied)."""
+    cursor = store.cursor(dataset)
+    received = 0
+    applied = 0
+    for page in fetch_deltas(session, base_url, dataset, cursor, page_size, executor, timeout):
+        if not page:
+            continue
+        deltas = [(record['drug'], record['term'], record.get('action', 'add')) for record in page]
+        cursor = max([cursor or ''] + [str(record['last_updated']) for record in page])
+        applied += store.apply(dataset, deltas, cursor)
+        received += len(page)
+    return received, applied
+
+
+def sync(base_url=None, store=None, page_size=DEFAULT_PAGE_SIZE, workers=8, timeout=10):
+    """
+    Bring the safety store up to date with the endpoint at base_url
+    (ABSORPGEN_SAFETY_SYNC_URL by default).
+
+    The three datasets are pulled concurrently over one pooled session and
+    only records newer than each dataset's cursor are requested, so the
+    time and memory a sync takes follow the size of the delta. A store
+    that has not been seeded yet is first seeded from the bundled JSON
+    databases, so the deltas land on top of the full set. Running
+    SafetyCheckers pick the changes up on their next refresh().
+
+    Returns {dataset: {'received', 'applied'}} plus 'seconds'.
+    """
+    base_url = base_url or os.environ.get('ABSORPGEN_SAFETY_SYNC_URL')
+    if not base_url:
+        raise ValueError("No safety sync endpoint given; pass base_url or set ABSORPGEN_SAFETY_SYNC_URL.")
+    store = store or SafetyStore()
+    store.seed_if_needed()
+
+    start = time.perf_counter()
+    session = make_session(pool_size=workers)
+    summary = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pages, ThreadPoolExecutor(max_workers=len(DATASETS)) as datasets:
+            futures = {dataset: datasets.submit(sync_dataset, session, base_url, store, dataset,
+                                                page_size, pages, timeout)
+                       for dataset in DATASETS}
+            for dataset, future in futures.items():
+                received, applied = future.result()
+                summary[dataset] = {'received': received, 'applied': applied}
+    finally:
+        session.close()
+    summary['seconds'] = time.perf_counter() - start
+    return summary
@@ -1,27 +1,49 @@
 import sys
 import os
+import threading
 from pathlib import Path
 import json
-import pandas as pd
 
 # Add the parent directory to the path so we can import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Import from current directory
-from .predict import predict_new
-from .safety_checker import SafetyChecker
-from .drug_lookup import lookup_drug_features, suggest_alternative_drug
-from .rxnorm_lookup import get_most_common_brand
+# The prediction stack (pandas, the drug table, the model) is imported on first
+# use so the prompts appear at once; run_simulation loads it in the background
+# while the user is typing
+
+def _warm_up():
+    """
+    Import the prediction modules and load the model and drug table.
+    """
+    try:
+        from .model_registry import get_registry
+        from .drug_store import get_drug_store
+        from .name_resolver import get_name_resolver
+        from . import predict, symptom_search
+        get_registry().get()
+        len(get_drug_store())
+        get_name_resolver()
+    except Exception:
+        # Whatever failed fails again, with its message, when the simulation needs it
+        pass
+
+def _start_warm_up():
+    thread = threading.Thread(target=_warm_up, name='simulate-warm-up', daemon=True)
+    thread.start()
+    return thread
 
 def load_drug_database():
     """
     Load drug database from ChEMBL.
     """
+    import pandas as pd
+    from .columnar_store import read_table
+
     try:
         # Load the ChEMBL drug database
         drug_db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
                                    "data", "chembl_drug_database.csv")
-        drug_db = pd.read_csv(drug_db_path)
+        drug_db = read_table(drug_db_path)
         
         # Convert to dictionary format for easier access
         drug_dict = {}
@@ -105,80 +127,57 @@ def get_user_input():
 def find_alternative_drug(current_drug: str, required_dose: float, formulation: str, drug_db: dict) -> tuple[str, float, str]:
     """
     Find an alternative drug that better matches the required dose.
+    Each alternative formulation is scored by the best combination of its
+    strengths (see dose_composition.compose_dose); the strength returned is
+    the largest one that combination uses.
     """
+    from .dose_composition import compose_dose
+
     if current_drug not in drug_db:
         return "", 0, ""
     
     # Find the best matching alternative
     best_match = None
-    smallest_diff = float('inf')
+    best_score = None
     
-    for alt in drug_db[current_drug]:
-        if alt["formulation"] != formulation:
+    for alt in drug_db[current_drug]["alternatives"]:
+        if alt["formulation"] != formulation or not alt["strengths"]:
             continue
-            
-        for strength in alt["strengths"]:
-            # Calculate how many units would be needed
-            units_needed = required_dose / strength
-            # Round to nearest whole unit
-            rounded_units = round(units_needed)
-            # Calculate the actual dose this would give
-            actual_dose = rounded_units * strength
-            # Calculate the difference
-            diff = abs(actual_dose - required_dose) / required_dose
-            
-            if diff < smallest_diff:
-                smallest_diff = diff
-                best_match = (alt["brand"], strength, alt["formulation"])
+
+        composition = compose_dose(required_dose, alt["strengths"])
+        # Smallest dose error first, then fewest units
+        score = (abs(composition['error_mg']), composition['n_units'])
+        if best_score is None or score < best_score:
+            best_score = score
+            best_match = (alt["brand"], max(composition['units']), alt["formulation"])
     
     return best_match if best_match else ("", 0, "")
 
-def format_dose(dose_mg: float, formulation: str, strength_mg_per_unit: float, concentration_mg_per_ml: float = None) -> str:
+def format_dose(dose_mg: float, formulation: str, strength_mg_per_unit: float, concentration_mg_per_ml: float = None,
+                strengths: tuple = None) -> str:
     """
     Format the dose into user-friendly units (tablets or mL).
+    Tablets are made up from all available strengths when given (see
+    drug_lookup.available_strengths), otherwise from strength_mg_per_unit.
     """
-    if formulation.lower() == 'liquid' or (concentration_mg_per_ml is not None and concentration_mg_per_ml > 0):
-        if concentration_mg_per_ml is None:
+    if formulation.lower() == 'liquid':
+        if not concentration_mg_per_ml:
             concentration_mg_per_ml = strength_mg_per_unit
         ml_needed = dose_mg / concentration_mg_per_ml
         # Ensure minimum dose of 0.5 mL and round to nearest 0.5 mL
         ml_needed = max(0.5, round(ml_needed * 2) / 2)
         return f"{ml_needed} mL"
-    else:
-        # Calculate number of tablets needed
-        tablets_needed = dose_mg / strength_mg_per_unit
-        
-        # If less than 1 tablet, use the smallest available tablet
-        if tablets_needed < 1:
-            return f"1 tablet of {int(strength_mg_per_unit)} mg"
-        
-        # For multiple tablets, round to nearest whole tablet
-        tablets_needed = round(tablets_needed)
-        
-        # If we need more than one tablet, try to split into convenient combinations
-        if tablets_needed > 1:
-            # Try to find a combination of tablet strengths
-            for combo in [(1, tablets_needed-1), (2, tablets_needed-2)]:
-                if combo[0] > 0 and combo[1] > 0:
-                    return f"{combo[0]} tablet(s) of {int(strength_mg_per_unit)} mg and {combo[1]} tablet(s) of {int(strength_mg_per_unit)} mg"
-        
-        return f"{tablets_needed} tablet(s) of {int(strength_mg_per_unit)} mg"
+
+    from .dose_composition import compose_dose, describe_composition
+
+    # Closest combination to the dose, then fewest tablets; at least one of the smallest
+    composition = compose_dose(dose_mg, strengths or (strength_mg_per_unit,))
+    return describe_composition(composition)
 
 def select_initial_drug(symptoms: list, pain_level: int, pain_type: str) -> str:
     """
     Select the most appropriate initial drug based on symptoms and pain.
     """
-    # Get drug features for common OTC medications
-    common_drugs = ["ACETAMINOPHEN", "IBUPROFEN", "DEXTROMETHORPHAN"]
-    drug_features = {}
-    
-    for drug in common_drugs:
-        try:
-            features = lookup_drug_features(drug)
-            drug_features[drug] = features
-        except Exception:
-            continue
-    
     # If no symptoms provided, use pain level to select drug
     if not symptoms:
         if pain_level >= 7:
@@ -186,12 +185,18 @@ def select_initial_drug(symptoms: list, pain_level: int, pain_type: str) -> str:
         else:
             return "ACETAMINOPHEN"  # Milder pain relief
     
-    # Check symptoms against drug indications
-    for drug, features in drug_features.items():
-        if "indications" in features:
-            for symptom in symptoms:
-                if symptom.lower() in [ind.lower() for ind in features["indications"]]:
-                    return drug
+    # Rank every drug we can predict for by symptom overlap and bioavailability
+    try:
+        from .drug_lookup import OTC_DRUGS
+        from .drug_store import get_drug_store
+        from .symptom_search import search_drugs_by_symptoms
+
+        candidates = set(OTC_DRUGS) | {name.upper() for name in get_drug_store().names()}
+        ranked = search_drugs_by_symptoms(symptoms, k=1, restrict_to=candidates)
+        if ranked:
+            return ranked[0]['drug_name']
+    except Exception:
+        pass
     
     # Default to pain-based selection if no symptom match
     if pain_level >= 7:
@@ -200,6 +205,11 @@ def select_initial_drug(symptoms: list, pain_level: int, pain_type: str) -> str:
         return "ACETAMINOPHEN"
 
 def run_simulation():
+    from .safety_checker import SafetyChecker
+
+    # Load the model while the user answers the prompts
+    warm_up = _start_warm_up()
+
     # Initialize safety checker
     safety_checker = SafetyChecker()
     
@@ -207,6 +217,11 @@ def run_simulation():
     user_input = get_user_input()
     
     try:
+        from .predict import predict_new
+        from .drug_lookup import available_strengths
+        from .name_resolver import get_name_resolver
+        warm_up.join()
+
         # Select initial drug based on symptoms and pain
         initial_drug = select_initial_drug(
             user_input["current_symptoms"],
@@ -220,6 +235,9 @@ def run_simulation():
         
         # Get prediction
         prediction = predict_new(user_input, initial_drug)
+        if prediction['switched_from']:
+            print(f"\n⚠️  Bioavailability too low for '{prediction['switched_from']}'. "
+                  f"Switching to alternative: '{prediction['final_drug_used']}'")
         
         # Check for safety concerns
         warnings = safety_checker.check_safety(
@@ -229,18 +247,18 @@ def run_simulation():
             conditions=user_input["medical_conditions"]
         )
         
-        # Format the dose
+        # Format the dose from every strength the drug comes in
+        strengths = available_strengths(prediction['final_drug_used']).get(prediction['recommended_formulation'])
         formatted_dose = format_dose(
             dose_mg=prediction['dose'],
             formulation=prediction['recommended_formulation'],
             strength_mg_per_unit=prediction['strength_mg_per_unit'],
-            concentration_mg_per_ml=prediction.get('formulation_concentration')
+            concentration_mg_per_ml=prediction.get('formulation_concentration'),
+            strengths=strengths
         )
         
         # Get brand name
-        brand_name = get_most_common_brand(prediction['final_drug_used'])
-        if "❌" in brand_name:
-            brand_name = prediction['final_drug_used']
+        brand_name = get_name_resolver().brand_name(prediction['final_drug_used']) or prediction['final_drug_used']
         
         # Print results
         print("\n=== Recommendation ===")
@@ -0,0 +1,196 @@
+import re
+import threading
+
+import numpy as np
+
+from .indication_index import get_indication_index
+from .drug_store import get_drug_store
+
+# Words that carry no meaning on their own in EFO condition names
+STOPWORDS = frozenset(['a', 'an', 'and', 'by', 'due', 'for', 'in', 'of', 'or', 'the', 'to', 'with'])
+
+# The patient the tie-break bioavailability is predicted for: the synthetic
+# inputs the model is trained on (see data_loader._prepare)
+REFERENCE_PATIENT = {'age': 35, 'weight': 70, 'sex': 'male', 'height': 175, 'route_admin': 'oral'}
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lower-cased alphanumeric tokens of a symptom or condition name, minus stopwords."""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+class SymptomSearchIndex:
+    """
+    Reverse search from symptoms to drugs over the whole indication table.
+
+    Condition names are tokenized into an inverted index (token -> condition
+    ids). A symptom matches every condition containing all of its tokens; an
+    exact match scores 1 and a partial one the share of the condition's tokens
+    the symptom covers. A drug's score is the sum over symptoms of its best
+    matching condition, and ties are broken by bioavailability (for the
+    process-wide index, as predicted by the registry model; see
+    get_symptom_search).
+    """
+    def __init__(self, indication_index, bioavailability=None):
+        self.indications = indication_index
+        self.drugs = indication_index.drugs
+        self._drug_ids = {name: i for i, name in enumerate(self.drugs)}
+
+        postings = {}
+        self._condition_sizes = np.zeros(len(indication_index.conditions), dtype=np.float32)
+        self._condition_keys = {}
+        for c, condition in enumerate(indication_index.conditions):
+            tokens = set(tokenize(condition))
+            self._condition_sizes[c] = max(len(tokens), 1)
+            self._condition_keys.setdefault(condition.lower(), []).append(c)
+            for token in tokens:
+                postings.setdefault(token, []).append(c)
+        self._postings = {token: np.array(ids, dtype=np.int32) for token, ids in postings.items()}
+
+        self.bioavailability = np.full(len(self.drugs), np.nan)
+        if bioavailability:
+            self.set_bioavailability(bioavailability)
+
+    def set_bioavailability(self, bioavailability):
+        """
+        Replace the tie-break values with a {drug name: bioavailability}
+        mapping; drugs it leaves out become unknown. The new values are
+        swapped in with one assignment, so searches never see a mix.
+        """
+        values = np.full(len(self.drugs), np.nan)
+        for name, value in bioavailability.items():
+            i = self._drug_ids.get(name.upper())
+            if i is not None and value is not None:
+                values[i] = value
+        self.bioavailability = values
+
+    def _match_conditions(self, symptom):
+        """Condition ids matching a symptom and the match quality of each."""
+        exact = self._condition_keys.get(symptom.strip().lower())
+        tokens = set(tokenize(symptom))
+        if not tokens:
+            ids = np.array(exact or [], dtype=np.int32)
+            return ids, np.ones(len(ids), dtype=np.float32)
+
+        # Intersect the shortest posting lists first
+        lists = sorted((self._postings.get(token) for token in tokens),
+                       key=lambda ids: -1 if ids is None else len(ids))
+        if lists[0] is None:
+            ids = np.array(exact or [], dtype=np.int32)
+            return ids, np.ones(len(ids), dtype=np.float32)
+        ids = lists[0]
+        for other in lists[1:]:
+            ids = np.intersect1d(ids, other, assume_unique=True)
+            if not len(ids):
+                break
+
+        quality = len(tokens) / np.maximum(self._condition_sizes[ids], len(tokens))
+        if exact:
+            quality[np.isin(ids, exact)] = 1.0
+        return ids, quality
+
+    def _symptom_scores(self, symptom):
+        """Best match quality per drug for one symptom."""
+        scores = np.zeros(len(self.drugs), dtype=np.float32)
+        ids, quality = self._match_conditions(symptom)
+        if not len(ids):
+            return scores
+        offsets = self.indications.condition_offsets
+        condition_drugs = self.indications.condition_drugs
+        # Gather every (drug, quality) pair of the matched conditions and reduce in one call
+        drugs = np.concatenate([condition_drugs[offsets[c]:offsets[c + 1]] for c in ids.tolist()])
+        counts = offsets[ids + 1] - offsets[ids]
+        np.maximum.at(scores, drugs, np.repeat(quality.astype(np.float32), counts))
+        return scores
+
+    def search(self, symptoms, k=10, restrict_to=None):
+        """
+        Rank drugs for a list of symptoms.
+
+        restrict_to optionally limits the candidates to a collection of drug
+        names. Returns up to k dicts with drug_name, score, bioavailability
+        (None when unknown) and the symptoms each drug matched, best first.
+        """
+        symptoms = [s for s in symptoms if s and s.strip()]
+        if not symptoms or not len(self.drugs):
+            return []
+
+        per_symptom = np.vstack([self._symptom_scores(s) for s in symptoms])
+        scores = per_symptom.sum(axis=0)
+        if restrict_to is not None:
+            mask = np.zeros(len(self.drugs), dtype=bool)
+            ids = [self._drug_ids.get(name.upper()) for name in restrict_to]
+            mask[[i for i in ids if i is not None]] = True
+            scores = np.where(mask, scores, 0)
+
+        candidates = np.flatnonzero(scores > 0)
+        if not len(candidates):
+            return []
+
+        # Higher score first, then higher bioavailability (unknown last), then name order
+        known = self.bioavailability
+        bioavailability = np.nan_to_num(known[candidates], nan=-np.inf)
+        order = np.lexsort((candidates, -bioavailability, -scores[candidates]))
+        top = candidates[order[:k]]
+
+        results = []
+        for i in top.tolist():
+            value = known[i]
+            results.append({
+                'drug_name': self.drugs[i],
+                'score': float(scores[i]),
+                'bioavailability': None if np.isnan(value) else float(value),
+                'matched_symptoms': [s for s, row in zip(symptoms, per_symptom) if row[i] > 0]
+            })
+        return results
+
+
+_search = None
+_search_bioavailability = None
+_search_lock = threading.Lock()
+
+
+def _model_version():
+    """Versions of the registry model and the drug table, or None when no model can be loaded."""
+    from .model_registry import get_registry
+    try:
+        return (get_registry().version, get_drug_store().version)
+    except Exception:
+        return None
+
+
+def _predicted_bioavailability():
+    """Bioavailability the registry model predicts for REFERENCE_PATIENT, for every formulary drug."""
+    from .predict import predict_formulary
+    predictions = predict_formulary(REFERENCE_PATIENT)
+    return {str(name).upper(): float(value)
+            for name, value in zip(predictions['drug_name'], predictions['bioavailability'])}
+
+
+def get_symptom_search():
+    """
+    Process-wide search index, rebuilt when the indication index is. Its
+    tie-break bioavailability is predicted in one formulary pass and
+    recomputed only when the model or the drug table changes.
+    """
+    global _search, _search_bioavailability
+    index = get_indication_index()
+    version = _model_version()
+    search = _search
+    if search is not None and search.indications is index and _search_bioavailability == version:
+        return search
+    with _search_lock:
+        if _search is None or _search.indications is not index:
+            _search = SymptomSearchIndex(index)
+            _search_bioavailability = None
+        if _search_bioavailability != version:
+            _search.set_bioavailability(_predicted_bioavailability() if version is not None else {})
+            _search_bioavailability = version
+        return _search
+
+
+def search_drugs_by_symptoms(symptoms, k=10, restrict_to=None):
+    """Top-k drugs for the given symptoms; see SymptomSearchIndex.search."""
+    return get_symptom_search().search(symptoms, k=k, restrict_to=restrict_to)
@@ -1,8 +1,12 @@
+import argparse
+import time
 import torch
+import numpy as np
 import pandas as pd
 import joblib
 from pathlib import Path
-from src.data_loader import load_data
+from torch.utils.data import DataLoader, IterableDataset, get_worker_info
+from src.data_loader import load_data, iter_data_chunks
 from src.model import AbsorpGenMultiTaskModel
 from sklearn.model_selection import train_test_split
 import torch.nn as nn
@@ -51,5 +55,136 @@ def train():
     torch.save(model.state_dict(), base / 'models' / 'absorpgen_multitask.pt')
     print("✅ Model trained and saved.")
 
+class StreamingDrugDataset(IterableDataset):
+    """
+    Mini-batches streamed from iter_data_chunks.
+
+    Each chunk is preprocessed as it arrives and pushed into a shuffle buffer
+    of at most shuffle_buffer rows; once the buffer is full it is permuted and
+    drained as batches, so memory stays bounded by the buffer and chunk size
+    regardless of the table size. With DataLoader workers every worker reads
+    its own shard of the source; shard=(rank, world_size) further splits the
+    source between distributed training processes.
+    """
+    def __init__(self, preprocessor, encoder, source=None, chunksize=50_000,
+                 batch_size=256, shuffle_buffer=100_000, seed=42, shard=None):
+        self.preprocessor = preprocessor
+        self.encoder = encoder
+        self.source = source
+        self.chunksize = chunksize
+        self.batch_size = batch_size
+        self.shuffle_buffer = max(shuffle_buffer, batch_size)
+        self.seed = seed
+        self.shard = shard
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        """Reshuffle differently on every epoch."""
+        self.epoch = epoch
+
+    def _chunks(self, shard):
+        for X, y_reg, y_class in iter_data_chunks(self.source, self.chunksize, shard):
+            if X.empty:
+                continue
+            X_processed = self.preprocessor.transform(X[self.preprocessor.feature_names_in_])
+            yield (np.asarray(X_processed, dtype=np.float32),
+                   y_reg.to_numpy(dtype=np.float32),
+                   self.encoder.transform(y_class).astype(np.int64))
+
+    def _drain(self, buffer, rng, keep):
+        """Shuffle the buffered rows and yield full batches, keeping up to keep rows back."""
+        X, y_reg, y_class = (np.concatenate(parts) for parts in zip(*buffer))
+        order = rng.permutation(len(X))
+        n_out = len(X) - keep
+        n_out -= n_out % self.batch_size if keep else 0
+        for start in range(0, n_out, self.batch_size):
+            idx = order[start:min(start + self.batch_size, n_out)]
+            yield torch.from_numpy(X[idx]), torch.from_numpy(y_reg[idx]), torch.from_numpy(y_class[idx])
+        rest = order[n_out:]
+        buffer[:] = [(X[rest], y_reg[rest], y_class[rest])] if len(rest) else []
+
+    def __iter__(self):
+        worker = get_worker_info()
+        worker_id, num_workers = (worker.id, worker.num_workers) if worker else (0, 1)
+        rank, world_size = self.shard if self.shard else (0, 1)
+        shard = (rank * num_workers + worker_id, world_size * num_workers)
+        rng = np.random.default_rng((self.seed, self.epoch, shard[0]))
+
+        buffer = []
+        buffered = 0
+        for chunk in self._chunks(shard):
+            buffer.append(chunk)
+            buffered += len(chunk[0])
+            if buffered >= self.shuffle_buffer:
+                # Keep half the buffer so rows from neighbouring chunks get mixed
+                yield from self._drain(buffer, rng, keep=self.shuffle_buffer // 2)
+                buffered = len(buffer[0][0]) if buffer else 0
+        if buffer:
+            yield from self._drain(buffer, rng, keep=0)
+
+def train_streaming(source=None, epochs=30, batch_size=256, num_workers=0, chunksize=50_000,
+                    shuffle_buffer=100_000, lr=0.001, output_path=None):
+    """
+    Mini-batch training over a streamed dataset.
+
+    source is a CSV or ChEMBL SQLite path (see data_loader.iter_data_chunks).
+    Rows are read chunksize at a time by num_workers DataLoader workers, so
+    the full table never has to fit in memory. Prints the mean loss and the
+    throughput in rows/second for every epoch.
+    """
+    base = Path(__file__).resolve().parent.parent
+    preprocessor = joblib.load(base / 'models' / 'preprocessor_pipeline.pkl')
+    encoder = joblib.load(base / 'models' / 'formulation_encoder.pkl')
+    output_path = Path(output_path) if output_path else base / 'models' / 'absorpgen_multitask.pt'
+
+    dataset = StreamingDrugDataset(preprocessor, encoder, source=source, chunksize=chunksize,
+                                   batch_size=batch_size, shuffle_buffer=shuffle_buffer)
+    # The dataset yields ready-made batches, so automatic batching is turned off
+    loader = DataLoader(dataset, batch_size=None, num_workers=num_workers)
+
+    model = AbsorpGenMultiTaskModel(len(preprocessor.feature_names_in_))
+    optimizer = optim.Adam(model.parameters(), lr=lr)
+    reg_criterion = nn.MSELoss()
+    class_criterion = nn.CrossEntropyLoss()
+
+    for epoch in range(epochs):
+        dataset.set_epoch(epoch)
+        model.train()
+        total_loss = 0.0
+        rows = 0
+        start = time.perf_counter()
+        for X_batch, y_reg_batch, y_class_batch in loader:
+            optimizer.zero_grad()
+            reg_output, class_logits = model(X_batch)
+            loss = reg_criterion(reg_output, y_reg_batch) + class_criterion(class_logits, y_class_batch)
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item() * len(X_batch)
+            rows += len(X_batch)
+        elapsed = time.perf_counter() - start
+        if rows == 0:
+            raise ValueError("No training rows were read from the data source.")
+        print(f"Epoch {epoch+1}: Loss = {total_loss / rows:.4f} | {rows} rows in {elapsed:.2f}s "
+              f"({rows / elapsed:,.0f} rows/s)")
+
+    torch.save(model.state_dict(), output_path)
+    print(f"✅ Model trained and saved to {output_path}")
+
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Train AbsorpGenMultiTaskModel")
+    parser.add_argument('--streaming', action='store_true', help="Stream mini-batches instead of full-batch training")
+    parser.add_argument('--source', help="CSV or ChEMBL SQLite file to stream from")
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--workers', type=int, default=0, help="DataLoader worker processes")
+    parser.add_argument('--chunksize', type=int, default=50_000, help="Rows read from the source at a time")
+    parser.add_argument('--shuffle-buffer', type=int, default=100_000, help="Rows held for shuffling")
+    parser.add_argument('--output', help="Where to save the trained state_dict")
+    args = parser.parse_args()
+
+    if args.streaming:
+        train_streaming(source=args.source, epochs=args.epochs, batch_size=args.batch_size,
+                        num_workers=args.workers, chunksize=args.chunksize,
+                        shuffle_buffer=args.shuffle_buffer, output_path=args.output)
+    else:
+        train()
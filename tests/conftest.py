@@ -0,0 +1,73 @@
+import os
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+# Run from the project root: python -m pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.features import DRUG_FEATURES, FEATURE_COLUMNS
+
+# The five drug columns the shipped preprocessor is fit on
+SHIPPED_FEATURES = list(DRUG_FEATURES)
+
+
+def write_artifacts(models_dir, feature_names=FEATURE_COLUMNS, seed=0):
+    """
+    A small but complete artifact set in models_dir: a StandardScaler
+    pipeline fit on feature_names, the formulation encoder and a randomly
+    initialized AbsorpGenMultiTaskModel checkpoint.
+    """
+    import torch
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+    from src.model import AbsorpGenMultiTaskModel
+
+    rng = np.random.default_rng(seed)
+    sample = pd.DataFrame(rng.normal(size=(64, len(feature_names))) * 10 + 50, columns=list(feature_names))
+    preprocessor = Pipeline([('scaler', StandardScaler())]).fit(sample)
+    encoder = LabelEncoder().fit(['capsule', 'liquid', 'tablet'])
+
+    torch.manual_seed(seed)
+    model = AbsorpGenMultiTaskModel(len(feature_names))
+    os.makedirs(models_dir, exist_ok=True)
+    joblib.dump(preprocessor, os.path.join(models_dir, 'preprocessor_pipeline.pkl'))
+    joblib.dump(encoder, os.path.join(models_dir, 'formulation_encoder.pkl'))
+    torch.save(model.state_dict(), os.path.join(models_dir, 'absorpgen_multitask.pt'))
+    return models_dir
+
+
+@pytest.fixture
+def use_registry(monkeypatch):
+    """Make a ModelRegistry over the given directory the process-wide one."""
+    from src import drug_embeddings, model_registry
+    from src.prediction_cache import get_prediction_cache
+
+    def use(models_dir, backend='eager'):
+        registry = model_registry.ModelRegistry(str(models_dir), backend=backend)
+        monkeypatch.setattr(model_registry, '_registry', registry)
+        monkeypatch.setattr(drug_embeddings, '_cache', None)
+        get_prediction_cache().clear()
+        return registry
+    yield use
+    get_prediction_cache().clear()
+
+
+@pytest.fixture
+def shipped_models(tmp_path):
+    """Artifacts whose preprocessor reads the drug columns only, like the shipped one."""
+    return write_artifacts(tmp_path / 'shipped', SHIPPED_FEATURES)
+
+
+@pytest.fixture
+def patient_models(tmp_path):
+    """Artifacts whose preprocessor reads every patient and drug column."""
+    return write_artifacts(tmp_path / 'patient', FEATURE_COLUMNS)
+
+
+@pytest.fixture
+def patient():
+    return {'age': 30, 'weight': 68, 'sex': 'male', 'height': 175, 'route_admin': 'oral'}
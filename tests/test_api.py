@@ -0,0 +1,44 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import main
+
+
+@pytest.fixture
+def client(use_registry, shipped_models):
+    use_registry(shipped_models)
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_predict_batch_scores_every_patient(client, patient):
+    response = client.post('/predict/batch', json={'patients': [patient, {**patient, 'age': 70}],
+                                                    'drug_names': ['IBUPROFEN']})
+    assert response.status_code == 200
+    assert response.json()['drug_name'] == ['IBUPROFEN', 'IBUPROFEN']
+
+
+@pytest.mark.parametrize('body, detail', [
+    ({'patients': [], 'drug_names': ['IBUPROFEN']}, 'patients must not be empty'),
+    ({'drug_names': []}, 'drug_names must not be empty'),
+    ({'drug_names': ['IBUPROFEN', 'ASPIRIN', 'ACETAMINOPHEN']}, 'Got 2 patients but 3 drug names'),
+])
+def test_predict_batch_rejects_malformed_requests(client, patient, body, detail):
+    body.setdefault('patients', [patient, patient])
+    response = client.post('/predict/batch', json=body)
+    assert response.status_code == 400
+    assert detail in response.json()['detail']
+
+
+def test_formulary_rank_returns_the_best_k(client, patient):
+    response = client.post('/formulary/rank', params={'k': 3, 'rank_by': 'cmax'}, json=patient)
+    assert response.status_code == 200
+    ranked = response.json()
+    assert len(ranked) == 3
+    cmax = [drug['cmax'] for drug in ranked]
+    assert cmax == sorted(cmax, reverse=True)
+
+
+@pytest.mark.parametrize('params', [{'rank_by': 'dose'}, {'k': 0}, {'k': 101}])
+def test_formulary_rank_rejects_bad_parameters(client, patient, params):
+    assert client.post('/formulary/rank', params=params, json=patient).status_code == 422
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from src.batcher import MicroBatcher
+
+
+def test_requests_in_one_window_share_a_batch_and_keep_their_own_errors():
+    batches = []
+
+    def batch_fn(requests):
+        batches.append(requests)
+        return [ValueError(f"unknown drug {name}") if name == 'BAD' else name.lower()
+                for (name,) in requests]
+
+    async def scenario():
+        batcher = MicroBatcher(batch_fn, window_ms=20, max_batch_size=8)
+        outcomes = await asyncio.gather(batcher.submit('ASPIRIN'), batcher.submit('BAD'),
+                                        batcher.submit('IBUPROFEN'), return_exceptions=True)
+        await batcher.close()
+        return outcomes
+
+    good, bad, other = asyncio.run(scenario())
+    assert len(batches) == 1 and len(batches[0]) == 3
+    assert good == 'aspirin' and other == 'ibuprofen'
+    assert isinstance(bad, ValueError) and 'BAD' in str(bad)
+
+
+def test_a_failing_batch_fails_only_its_own_requests():
+    def batch_fn(requests):
+        if any(name == 'CRASH' for (name,) in requests):
+            raise RuntimeError("model crashed")
+        return [name for (name,) in requests]
+
+    async def scenario():
+        batcher = MicroBatcher(batch_fn, window_ms=5, max_batch_size=1)
+        crashed = asyncio.ensure_future(batcher.submit('CRASH'))
+        fine = asyncio.ensure_future(batcher.submit('ASPIRIN'))
+        with pytest.raises(RuntimeError):
+            await crashed
+        result = await fine
+        await batcher.close()
+        return result
+
+    assert asyncio.run(scenario()) == 'ASPIRIN'
+
+
+def test_batches_are_capped_at_max_batch_size():
+    sizes = []
+
+    def batch_fn(requests):
+        sizes.append(len(requests))
+        return [None] * len(requests)
+
+    async def scenario():
+        batcher = MicroBatcher(batch_fn, window_ms=50, max_batch_size=4)
+        await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        await batcher.close()
+
+    asyncio.run(scenario())
+    assert sum(sizes) == 10 and max(sizes) == 4
+
+
+def test_predict_new_many_isolates_unknown_drugs(use_registry, shipped_models, patient):
+    from src.predict import predict_new, predict_new_many
+
+    use_registry(shipped_models)
+    known, unknown = predict_new_many([(patient, 'IBUPROFEN'), (patient, 'NOT A DRUG')])
+    assert isinstance(unknown, ValueError)
+    assert known == predict_new(patient, 'IBUPROFEN', use_cache=False)
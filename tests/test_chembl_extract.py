@@ -0,0 +1,78 @@
+import importlib.util
+import os
+import sqlite3
+import sys
+import time
+
+import pandas as pd
+
+from src.columnar_store import columnar_path, read_table
+from src.drug_store import DrugFeatureStore
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'scripts', 'extract_drugs_from_chembl.py')
+
+
+def load_script():
+    spec = importlib.util.spec_from_file_location('extract_drugs_from_chembl', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so the worker processes can unpickle extract_range
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_chembl(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS molecule_dictionary (molregno INTEGER PRIMARY KEY, pref_name TEXT)")
+    conn.execute("CREATE TABLE IF NOT EXISTS compound_properties (molregno INTEGER PRIMARY KEY, mw_freebase REAL, "
+                 "alogp REAL, cx_most_bpka REAL)")
+    for molregno, name, mw, logp, pka in rows:
+        conn.execute("INSERT INTO molecule_dictionary VALUES (?, ?)", (molregno, name))
+        conn.execute("INSERT INTO compound_properties VALUES (?, ?, ?, ?)", (molregno, mw, logp, pka))
+    conn.commit()
+    conn.close()
+
+
+def test_default_output_is_the_table_the_store_reads():
+    from src.drug_store import DEFAULT_DB_PATH
+    assert load_script().OUTPUT_PATH == DEFAULT_DB_PATH
+
+
+def test_extract_reaches_the_drug_store(tmp_path):
+    extract = load_script().extract
+    db = tmp_path / 'chembl.db'
+    make_chembl(db, [(1, 'ALPHAMINE', 300.0, 1.5, 7.0), (2, 'BETAZOLE', 111.1, -0.5, 9.2)])
+    csv_path = tmp_path / 'drugs.csv'
+    pd.DataFrame([{'drug_name': 'OLDDRUG', 'molecular_weight': 1.0, 'logP': 1.0, 'pKa': 1.0,
+                   'bioavailability': 0.5, 'strength_mg_per_unit': 1.0,
+                   'formulation_concentration': 1.0}]).to_csv(csv_path, index=False)
+
+    # The shipped table has no molregnos, so incremental starts over
+    read_table(csv_path)
+    assert extract(db, csv_path, workers=1, incremental=True) == 2
+
+    store = DrugFeatureStore(str(csv_path))
+    assert store.names() == ['ALPHAMINE', 'BETAZOLE']
+    assert read_table(csv_path)['molecular_weight'].tolist() == [300.0, 111.1]
+
+    make_chembl(db, [(3, 'GAMMACILLIN', 420.0, 0.7, 3.1)])
+    assert extract(db, csv_path, workers=1, incremental=True) == 1
+    assert store.names() == ['ALPHAMINE', 'BETAZOLE', 'GAMMACILLIN']
+
+
+def test_extract_survives_a_touched_csv(tmp_path):
+    extract = load_script().extract
+    db = tmp_path / 'chembl.db'
+    make_chembl(db, [(i, f'DRUG{i}', 100.0 + i, 1.0, 7.0) for i in range(1, 51)])
+    csv_path = tmp_path / 'drugs.csv'
+    assert extract(db, csv_path, workers=1) == 50
+
+    store = DrugFeatureStore(str(csv_path))
+    assert len(store) == 50
+    assert columnar_path(csv_path).exists()
+
+    # A checkout or pull gives the CSV a new mtime; the mirror is rebuilt from it
+    os.utime(csv_path, ns=(time.time_ns() + 10**9,) * 2)
+    assert len(store) == 50
+    assert len(read_table(csv_path)) == 50
@@ -0,0 +1,90 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src import columnar_store
+from src.columnar_store import columnar_path, convert, read_table, resolve
+
+
+def write_csv(path, weights, mtime_ns):
+    pd.DataFrame({'drug_name': [f'DRUG{i}' for i in range(len(weights))],
+                  'molecular_weight': weights,
+                  'strength_mg_per_unit': [200] * len(weights)}).to_csv(path, index=False)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def set_mtime(path, mtime_ns):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'drugs.csv'
+    write_csv(path, [100, 200, 300], 10**18)
+    return path
+
+
+def test_first_read_parses_the_csv_and_writes_the_feather_copy(csv_path):
+    assert resolve(csv_path) == csv_path
+    df = read_table(csv_path)
+    assert df['molecular_weight'].tolist() == [100.0, 200.0, 300.0]
+    # Integer-looking strengths are still floats
+    assert df['strength_mg_per_unit'].dtype == 'float64'
+
+    assert resolve(csv_path) == columnar_path(csv_path)
+    cached = read_table(csv_path)
+    pd.testing.assert_frame_equal(cached, df)
+
+
+def test_a_newer_csv_wins_over_the_feather_copy(csv_path):
+    read_table(csv_path)
+    set_mtime(columnar_path(csv_path), 10**18)
+    write_csv(csv_path, [1, 2], 15 * 10**17)
+    assert resolve(csv_path) == csv_path
+    assert read_table(csv_path)['molecular_weight'].tolist() == [1.0, 2.0]
+    # ... and refreshes the copy
+    assert resolve(csv_path) == columnar_path(csv_path)
+    assert read_table(csv_path)['molecular_weight'].tolist() == [1.0, 2.0]
+
+
+def test_a_current_feather_copy_is_read_instead_of_the_csv(csv_path, tmp_path):
+    other = tmp_path / 'other.csv'
+    write_csv(other, [7, 8], 10**18)
+    convert(other, columnar_path(csv_path))
+    set_mtime(columnar_path(csv_path), 10**18)
+    assert read_table(csv_path)['molecular_weight'].tolist() == [7.0, 8.0]
+
+    # Without the CSV the copy is used whatever its age
+    os.remove(csv_path)
+    set_mtime(columnar_path(csv_path), 1)
+    assert resolve(csv_path) == columnar_path(csv_path)
+    assert read_table(csv_path, columns=['molecular_weight']).columns.tolist() == ['molecular_weight']
+
+
+def test_column_reads_do_not_write_a_partial_copy(csv_path):
+    df = read_table(csv_path, columns=['drug_name', 'molecular_weight'])
+    assert df.columns.tolist() == ['drug_name', 'molecular_weight']
+    assert not columnar_path(csv_path).exists()
+
+    read_table(csv_path, convert_missing=False)
+    assert not columnar_path(csv_path).exists()
+
+
+def test_without_pyarrow_the_csv_is_read(csv_path, monkeypatch):
+    read_table(csv_path)
+    monkeypatch.setattr(columnar_store, 'feather', None)
+    os.remove(columnar_path(csv_path))
+    assert resolve(csv_path) == csv_path
+    assert read_table(csv_path)['molecular_weight'].tolist() == [100.0, 200.0, 300.0]
+    assert not columnar_path(csv_path).exists()
+    with pytest.raises(ImportError):
+        convert(csv_path)
+
+
+def test_a_failed_write_still_returns_the_csv(csv_path, monkeypatch):
+    def fail(df, output_path):
+        raise OSError('read-only')
+    monkeypatch.setattr(columnar_store, '_write', fail)
+    assert read_table(csv_path)['molecular_weight'].tolist() == [100.0, 200.0, 300.0]
+    assert not columnar_path(csv_path).exists()
@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from src.columnar_store import convert
+from src.data_loader import DEFAULT_CSV_PATH, iter_data_chunks
+
+
+@pytest.fixture
+def drug_csv(tmp_path):
+    """A drug table of 103 rows, each identified by its molecular_weight."""
+    path = tmp_path / 'drugs.csv'
+    pd.DataFrame({'drug_name': [f'DRUG{i}' for i in range(103)],
+                  'molecular_weight': [100.0 + i for i in range(103)],
+                  'logP': 1.0, 'pKa': 7.0, 'bioavailability': 0.8,
+                  'strength_mg_per_unit': 200.0, 'formulation_concentration': 40.0}).to_csv(path, index=False)
+    return path
+
+
+def shard_rows(source, chunksize, shard):
+    return [value for X, _, _ in iter_data_chunks(source, chunksize, shard)
+            for value in X['molecular_weight'].tolist()]
+
+
+@pytest.mark.parametrize('chunksize', [50_000, 10])
+@pytest.mark.parametrize('fmt', ['csv', 'feather'])
+def test_shards_are_disjoint_non_empty_and_cover_every_row(drug_csv, chunksize, fmt):
+    source = drug_csv if fmt == 'csv' else convert(drug_csv)
+    everything = shard_rows(source, chunksize, None)
+    assert sorted(everything) == [100.0 + i for i in range(103)]
+
+    for world_size in (2, 3, 4):
+        shards = [shard_rows(source, chunksize, (rank, world_size)) for rank in range(world_size)]
+        assert all(shards)
+        assert sorted(value for shard in shards for value in shard) == sorted(everything)
+
+
+def test_the_shipped_table_is_split_across_ranks():
+    rows = sum(len(X) for X, _, _ in iter_data_chunks(DEFAULT_CSV_PATH))
+    sizes = [sum(len(X) for X, _, _ in iter_data_chunks(DEFAULT_CSV_PATH, shard=(rank, 4))) for rank in range(4)]
+    assert sum(sizes) == rows
+    assert max(sizes) - min(sizes) <= 1
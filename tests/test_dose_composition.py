@@ -0,0 +1,93 @@
+import itertools
+import random
+
+import pytest
+
+from src.dose_composition import DoseTable, compose_dose, compose_doses
+
+
+def brute_force_table(strengths, max_units):
+    """Fewest units for every total reachable with up to max_units units, by enumeration."""
+    fewest = {}
+    for n in range(1, max_units + 1):
+        for combination in itertools.combinations_with_replacement(strengths, n):
+            total = round(sum(combination), 3)
+            fewest.setdefault(total, n)
+    return fewest
+
+
+def brute_force_best(dose, strengths, max_units):
+    """Closest total to the dose, then fewest units."""
+    fewest = brute_force_table(strengths, max_units)
+    return min(fewest.items(), key=lambda item: (abs(item[0] - dose), item[1]))
+
+
+def test_table_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(60):
+        strengths = tuple(rng.sample([2.5, 5, 10, 12.5, 20, 25, 40, 50, 75, 80, 100, 325, 500], rng.randint(1, 3)))
+        max_units = rng.randint(1, 6)
+        table = DoseTable(strengths, max_units)
+        fewest = brute_force_table(strengths, max_units)
+        assert dict(zip(table.amounts.tolist(), table.units.tolist())) == fewest
+        for position in range(len(table.amounts)):
+            counts = table.counts(position)
+            assert sum(counts.values()) == table.units[position]
+            assert sum(s * c for s, c in counts.items()) == pytest.approx(table.amounts[position])
+
+
+def test_compose_dose_matches_brute_force():
+    rng = random.Random(1)
+    for _ in range(200):
+        strengths = tuple(rng.sample([5, 10, 25, 50, 88, 100, 200, 325, 500, 800, 1000], rng.randint(1, 3)))
+        # Doses up to four of the largest strength keep the five-unit bound
+        dose = rng.uniform(1, 4 * max(strengths))
+        composition = compose_dose(dose, strengths, max_units=5)
+        total, n_units = brute_force_best(dose, strengths, 5)
+        assert composition['total_mg'] == pytest.approx(total)
+        assert composition['n_units'] == n_units
+
+
+def test_the_closest_composition_wins_by_default():
+    composition = compose_dose(1888, (1000, 800, 88))
+    assert composition['units'] == {1000.0: 1, 800.0: 1, 88.0: 1}
+    assert composition['error_mg'] == 0
+
+    # A tolerance trades accuracy for fewer units
+    assert compose_dose(1888, (1000, 800, 88), tolerance=0.05)['units'] == {1000.0: 1, 800.0: 1}
+
+
+def test_doses_needing_many_units():
+    composition = compose_dose(1000, (0.025,))
+    assert composition['n_units'] == 40000
+    assert composition['total_mg'] == 1000
+
+    composition = compose_dose(1e5, (1,))
+    assert composition['units'] == {1.0: 100000}
+    assert composition['error_mg'] == 0
+
+
+def test_fractional_strengths_keep_their_step():
+    composition = compose_dose(0.1, (0.025,))
+    assert composition['units'] == {0.025: 4}
+    assert composition['error_mg'] == pytest.approx(0)
+
+
+def test_small_doses_get_one_unit():
+    assert compose_dose(10, (325, 500))['units'] == {325.0: 1}
+
+
+def test_compose_doses_matches_compose_dose():
+    strengths = [(325, 500), (200,), (325, 500)]
+    doses = [850, 610, 1300]
+    assert compose_doses(doses, strengths) == [compose_dose(d, s) for d, s in zip(doses, strengths)]
+    assert compose_doses(doses, (200,)) == [compose_dose(d, (200,)) for d in doses]
+    with pytest.raises(ValueError):
+        compose_doses(doses, [(200,)] * 2)
+
+
+def test_unusable_strengths_are_rejected():
+    with pytest.raises(ValueError):
+        compose_dose(500, [0.0004, 500])
+    with pytest.raises(ValueError):
+        compose_dose(500, [0, None])
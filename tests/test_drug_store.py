@@ -0,0 +1,67 @@
+import os
+import threading
+
+import pandas as pd
+
+from src.drug_store import DrugFeatureStore
+
+
+def write_table(path, names, bioavailability=0.5, mtime_ns=None):
+    """A drug table in which each drug's molecular_weight is its number."""
+    rows = [{'drug_name': name, 'molecular_weight': float(name[4:]), 'logP': 1.0, 'pKa': 7.0,
+             'bioavailability': bioavailability, 'strength_mg_per_unit': 100.0,
+             'formulation_concentration': 10.0} for name in names]
+    tmp_path = path.with_name(path.name + '.tmp')
+    pd.DataFrame(rows).to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_store_reloads_when_the_file_changes(tmp_path):
+    path = tmp_path / 'drugs.csv'
+    write_table(path, ['DRUG1', 'DRUG2'], mtime_ns=10**18)
+    store = DrugFeatureStore(str(path))
+    assert store.names() == ['DRUG1', 'DRUG2']
+    version = store.version
+
+    write_table(path, ['DRUG3', 'DRUG1'], bioavailability=0.9, mtime_ns=2 * 10**18)
+    assert store.version != version
+    assert store.names() == ['DRUG3', 'DRUG1']
+    assert 'drug2' not in store
+    assert store.get('drug3') == ('DRUG3', {'molecular_weight': 3.0, 'logP': 1.0, 'pKa': 7.0,
+                                            'bioavailability': 0.9, 'strength_mg_per_unit': 100.0,
+                                            'formulation_concentration': 10.0, 'formulation': 'tablet'})
+    assert [name for name, _ in store.above_bioavailability(0.5)] == ['DRUG3', 'DRUG1']
+
+
+def test_lookups_during_reloads_never_mix_tables(tmp_path):
+    path = tmp_path / 'drugs.csv'
+    names = [f'DRUG{i}' for i in range(1, 200)]
+    write_table(path, names, mtime_ns=10**18)
+    store = DrugFeatureStore(str(path))
+    store.names()
+
+    errors = []
+    stop = threading.Event()
+
+    def read():
+        while not stop.is_set():
+            for i in (1, 50, 199):
+                match = store.get(f'DRUG{i}')
+                if match is not None and match[1]['molecular_weight'] != i:
+                    errors.append(match)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    try:
+        # Each rewrite reverses the row order, so a stale index points at another drug's row
+        for n in range(1, 30):
+            write_table(path, names[::-1] if n % 2 else names, mtime_ns=(n + 1) * 10**18)
+            store.names()
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+    assert errors == []
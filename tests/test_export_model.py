@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.export_model import export_model
+from src.model_registry import EXPORT_FILES, ModelRegistry
+
+
+@pytest.fixture(params=['shipped_models', 'patient_models'])
+def models_dir(request):
+    return request.getfixturevalue(request.param)
+
+
+def raw_features(feature_names, n_rows=257, seed=0):
+    """Unscaled rows around the values write_artifacts fits its scaler on."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(size=(n_rows, len(feature_names))) * 10 + 50, columns=list(feature_names))
+
+
+@pytest.mark.parametrize('fmt', list(EXPORT_FILES))
+def test_exported_model_matches_eager(models_dir, fmt):
+    if fmt == 'onnx':
+        pytest.importorskip('onnx')
+        pytest.importorskip('onnxruntime')
+    eager = ModelRegistry(str(models_dir), backend='eager').get()
+    path = export_model(fmt, models_dir)
+    assert path == models_dir / EXPORT_FILES[fmt]
+    assert not path.with_name(path.name + '.tmp').exists()
+
+    exported = ModelRegistry(str(models_dir), backend=fmt).get()
+    assert exported.runtime.kind == fmt
+    assert tuple(exported.feature_names) == tuple(eager.feature_names)
+    assert list(exported.classes) == list(eager.classes)
+    assert exported.runtime.metadata['source_version'] == eager.version
+
+    features = raw_features(eager.feature_names)
+    X_eager, X_exported = eager.runtime.prepare(features), exported.runtime.prepare(features)
+    expected_reg, expected_logits = eager.runtime.forward(X_eager)
+    reg, logits = exported.runtime.forward(X_exported)
+    np.testing.assert_allclose(reg, expected_reg, rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(logits, expected_logits, rtol=1e-5, atol=1e-5)
+
+    # Chunked runs agree too, including a batch of one
+    expected_classes = expected_logits.argmax(axis=1)
+    for batch_size in (1, 100, 4096):
+        reg, classes = exported.run(features, batch_size=batch_size)
+        np.testing.assert_allclose(reg, expected_reg, rtol=1e-5, atol=1e-5)
+        assert np.array_equal(classes, expected_classes)
+
+
+def test_unknown_format_is_rejected(shipped_models):
+    with pytest.raises(ValueError, match='Unknown export format'):
+        export_model('tflite', shipped_models)
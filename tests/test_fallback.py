@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from src import predict
+from src.drug_lookup import OTC_DRUGS
+
+
+@pytest.fixture
+def scored(monkeypatch):
+    """
+    Stand in for the model: predict_many returns bioavailability[name] for
+    every row, and the only fallback candidates are the OTC drugs given.
+    """
+    bioavailability = {}
+
+    def fake_predict_many(patients, drug_names, drug_features=None):
+        names = np.asarray(drug_names, dtype=object)
+        values = np.array([bioavailability[name.upper()] for name in names])
+        return {'drug_name': names, 'bioavailability': values, 'tmax': values, 'cmax': values, 'dose': values}
+
+    def use(values, candidates):
+        bioavailability.update(values)
+        monkeypatch.setattr(predict, 'suggest_alternative_drugs',
+                            lambda threshold, k: [(name, dict(OTC_DRUGS[name])) for name in candidates])
+
+    monkeypatch.setattr(predict, 'predict_many', fake_predict_many)
+    return use
+
+
+def final_drug(patient, name):
+    outcome = predict._predict_new_many([(patient, name)])[0]
+    assert not isinstance(outcome, Exception)
+    return outcome['final_drug_used']
+
+
+def test_low_bioavailability_switches_to_a_better_candidate(scored, patient):
+    scored({'DEXTROMETHORPHAN': 0.3, 'IBUPROFEN': 0.9, 'ACETAMINOPHEN': 0.5}, ['IBUPROFEN', 'ACETAMINOPHEN'])
+    assert final_drug(patient, 'DEXTROMETHORPHAN') == 'IBUPROFEN'
+
+
+def test_brand_names_never_switch_to_their_own_generic(scored, patient):
+    scored({'TYLENOL': 0.3, 'ACETAMINOPHEN': 0.9}, ['ACETAMINOPHEN'])
+    assert final_drug(patient, 'Tylenol') == 'Tylenol'
+
+
+def test_no_switch_when_every_candidate_is_predicted_worse(scored, patient):
+    scored({'DEXTROMETHORPHAN': 0.5, 'IBUPROFEN': 0.4}, ['IBUPROFEN'])
+    assert final_drug(patient, 'DEXTROMETHORPHAN') == 'DEXTROMETHORPHAN'
+
+
+def test_no_switch_above_the_threshold(scored, patient):
+    scored({'DEXTROMETHORPHAN': predict.FALLBACK_BIOAVAILABILITY, 'IBUPROFEN': 0.99}, ['IBUPROFEN'])
+    assert final_drug(patient, 'DEXTROMETHORPHAN') == 'DEXTROMETHORPHAN'
+
+
+def test_a_switch_reports_the_chosen_drug_and_its_formulation(scored, patient, capsys):
+    scored({'DEXTROMETHORPHAN': 0.3, 'IBUPROFEN': 0.9}, ['IBUPROFEN'])
+    outcome = predict._predict_new_many([(patient, 'DEXTROMETHORPHAN')])[0]
+    assert outcome['final_drug_used'] == 'IBUPROFEN'
+    assert outcome['switched_from'] == 'DEXTROMETHORPHAN'
+    assert outcome['recommended_formulation'] == OTC_DRUGS['IBUPROFEN']['formulation']
+    assert outcome['strength_mg_per_unit'] == OTC_DRUGS['IBUPROFEN']['strength_mg_per_unit']
+    assert outcome['formulation_concentration'] == OTC_DRUGS['IBUPROFEN']['formulation_concentration']
+    assert capsys.readouterr().out == ''
+
+
+def test_no_switch_keeps_the_requested_drug(scored, patient):
+    scored({'DEXTROMETHORPHAN': 0.9, 'IBUPROFEN': 0.99}, ['IBUPROFEN'])
+    outcome = predict._predict_new_many([(patient, 'DEXTROMETHORPHAN')])[0]
+    assert outcome['switched_from'] is None
+    assert outcome['recommended_formulation'] == 'liquid'
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_loader import DEFAULT_CSV_PATH, load_data
+from src.features import DRUG_FEATURES, FEATURE_COLUMNS, build_features
+
+
+def old_patient_encoding(user_input):
+    """The per-request encoding predict_new used before build_features."""
+    return {
+        'age': user_input['age'] / 100,
+        'weight': user_input['weight'] / 200,
+        'sex': 1 if user_input['sex'].lower() == 'male' else 0,
+        'height': user_input['height'] / 200,
+        'route_admin': 1 if user_input['route_admin'].lower() == 'oral' else 0,
+    }
+
+
+DRUG = {'molecular_weight': 206.28, 'logP': 3.97, 'pKa': 4.91, 'strength_mg_per_unit': 200.0,
+        'formulation_concentration': None}
+
+
+def test_patient_columns_match_the_old_encoding():
+    patients = [{'age': 30, 'weight': 68, 'sex': 'Male', 'height': 175, 'route_admin': 'ORAL'},
+                {'age': 81, 'weight': 54.5, 'sex': 'female', 'height': 160, 'route_admin': 'iv'}]
+    features = build_features(patients, [DRUG])
+    for row, patient in zip(features.to_dict('records'), patients):
+        for name, value in old_patient_encoding(patient).items():
+            assert row[name] == pytest.approx(value)
+
+
+def test_drug_columns_stay_in_training_units():
+    features = build_features([{'age': 30, 'weight': 68, 'sex': 'male', 'height': 175, 'route_admin': 'oral'}],
+                              [DRUG])
+    assert features['molecular_weight'][0] == 206.28
+    assert features['strength_mg_per_unit'][0] == 200.0
+    assert features['formulation_concentration'][0] == 0.0
+
+
+def test_training_features_match_the_original_loader():
+    X, _, _ = load_data()
+    raw = pd.read_csv(DEFAULT_CSV_PATH).dropna()
+    np.testing.assert_allclose(X[DRUG_FEATURES].to_numpy(), raw[DRUG_FEATURES].to_numpy())
+    assert (X['sex'] == 1).all() and (X['route_admin'] == 1).all()
+
+
+def test_columns_come_back_in_the_requested_order():
+    columns = ['pKa', 'age', 'route_admin']
+    features = build_features([{'age': 30, 'weight': 68, 'sex': 'male', 'route_admin': 'oral'}], [DRUG], columns)
+    assert list(features.columns) == columns
+    with pytest.raises(ValueError, match='bmi'):
+        build_features([{'age': 30}], [DRUG], ['bmi'])
+
+
+def test_batch_rows_equal_rows_built_one_at_a_time():
+    rng = np.random.default_rng(0)
+    patients = [{'age': int(a), 'weight': float(w), 'sex': s, 'height': float(h), 'route_admin': r}
+                for a, w, s, h, r in zip(rng.integers(18, 90, 20), rng.uniform(40, 120, 20),
+                                         rng.choice(['male', 'female'], 20), rng.uniform(150, 200, 20),
+                                         rng.choice(['oral', 'iv'], 20))]
+    drugs = pd.DataFrame([{**DRUG, 'molecular_weight': 100.0 + i, 'formulation_concentration': 10.0 * i}
+                          for i in range(3)])
+    codes = rng.integers(0, 3, 20)
+    batch = build_features(patients, drugs, FEATURE_COLUMNS, drug_rows=codes)
+    for i, (patient, code) in enumerate(zip(patients, codes)):
+        single = build_features([patient], drugs.iloc[[code]], FEATURE_COLUMNS)
+        np.testing.assert_array_equal(batch.iloc[[i]].to_numpy(), single.to_numpy())
+
+
+def test_one_patient_is_paired_with_every_drug_row():
+    patient = {'age': 30, 'weight': 68, 'sex': 'male', 'height': 175, 'route_admin': 'oral'}
+    drugs = pd.DataFrame([{**DRUG, 'molecular_weight': 100.0 + i} for i in range(3)])
+    rows = np.array([2, 0, 2, 1])
+    features = build_features([patient], drugs, FEATURE_COLUMNS, drug_rows=rows)
+    assert len(features) == 4
+    assert (features['age'] == 0.3).all() and (features['sex'] == 1).all()
+    assert features['molecular_weight'].tolist() == [102.0, 100.0, 102.0, 101.0]
+    assert len(build_features([patient], drugs, FEATURE_COLUMNS)) == 3
+
+
+def test_mismatched_patients_and_drugs_are_rejected():
+    patients = [{'age': 30}, {'age': 40}]
+    with pytest.raises(ValueError, match='2 patients but 3 drugs'):
+        build_features(patients, [DRUG] * 3)
+    with pytest.raises(ValueError, match='2 patients but 3 drug rows'):
+        build_features(patients, [DRUG], drug_rows=[0, 0, 0])
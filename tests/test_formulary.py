@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from src.drug_embeddings import get_drug_embeddings
+from src.features import DRUG_FEATURES
+from src.formulary import RANK_BY, _best_first, rank_formulary
+from src.model_registry import get_registry
+from src.predict import predict_formulary
+from src.safety_checker import SafetyChecker
+
+from conftest import write_artifacts
+
+REGRESSION = ('bioavailability', 'tmax', 'cmax', 'dose')
+
+
+def assert_paths_agree(patient):
+    cached = predict_formulary(patient, use_embeddings=True)
+    full = predict_formulary(patient, use_embeddings=False)
+    assert list(cached['drug_name']) == list(full['drug_name'])
+    for column in REGRESSION:
+        np.testing.assert_allclose(cached[column], full[column], rtol=1e-4, atol=1e-4)
+    assert list(cached['predicted_formulation_type']) == list(full['predicted_formulation_type'])
+    return cached
+
+
+@pytest.mark.parametrize('backend', ['eager', 'numpy'])
+def test_formulary_with_a_patient_column_preprocessor(use_registry, patient_models, patient, backend):
+    use_registry(patient_models, backend)
+    cached = assert_paths_agree(patient)
+    # route_admin lands in the drug branch, so its output is not cacheable per drug
+    assert get_drug_embeddings().get().model is None
+    older = predict_formulary({**patient, 'age': 85, 'weight': 50})
+    assert not np.allclose(older['bioavailability'], cached['bioavailability'])
+
+
+@pytest.mark.parametrize('backend', ['eager', 'numpy'])
+def test_cached_embeddings_with_patient_columns(use_registry, tmp_path, patient, backend):
+    use_registry(write_artifacts(tmp_path / 'split', ['age', 'weight', 'sex', 'height'] + DRUG_FEATURES), backend)
+    cached = assert_paths_agree(patient)
+    assert get_drug_embeddings().get().model is not None
+    # The patient columns reach the model: another patient scores differently
+    older = predict_formulary({**patient, 'age': 85, 'weight': 50})
+    assert not np.allclose(older['bioavailability'], cached['bioavailability'])
+
+
+def test_formulary_with_the_shipped_feature_set(use_registry, shipped_models, patient):
+    use_registry(shipped_models)
+    assert_paths_agree(patient)
+
+
+def test_embeddings_follow_the_process_registry(use_registry, shipped_models, patient_models):
+    use_registry(shipped_models)
+    table = get_drug_embeddings().get()
+    assert table.artifacts is get_registry().get()
+
+    use_registry(patient_models)
+    assert get_drug_embeddings().get().artifacts is get_registry().get()
+    assert get_drug_embeddings().get().artifacts is not table.artifacts
+
+
+def test_backends_without_a_drug_branch_fall_back_to_the_full_pass(use_registry, tmp_path, patient):
+    # A feature split the eager backend caches embeddings for
+    use_registry(write_artifacts(tmp_path / 'split', ['age', 'weight', 'sex', 'height'] + DRUG_FEATURES), 'quantized')
+    assert get_registry().get().runtime.kind == 'quantized'
+    assert get_drug_embeddings().get().model is None
+    results = predict_formulary(patient, drug_names=['IBUPROFEN', 'ACETAMINOPHEN'])
+    assert list(results['drug_name']) == ['IBUPROFEN', 'ACETAMINOPHEN']
+
+
+def expected_order(predictions, rank_by):
+    """Row order by descending score, ties in formulary order."""
+    scores = np.nan_to_num(predictions[rank_by], nan=-np.inf)
+    return sorted(range(len(scores)), key=lambda row: (-scores[row], row))
+
+
+def test_best_first_matches_a_full_sort():
+    rng = np.random.default_rng(0)
+    for n, k in [(100, 3), (100, 30), (7, 10), (1, 1)]:
+        scores = rng.integers(0, 20, size=n).astype(float)
+        scores[rng.random(n) < 0.1] = np.nan
+        assert list(_best_first(scores, k)) == expected_order({'s': scores}, 's')
+
+
+@pytest.mark.parametrize('rank_by', RANK_BY)
+def test_ranking_follows_the_predicted_column(use_registry, shipped_models, patient, rank_by):
+    use_registry(shipped_models)
+    predictions = predict_formulary(patient)
+    ranked = rank_formulary(patient, k=5, rank_by=rank_by, safety_checker=SafetyChecker(aliases={}))
+    expected = [predictions['drug_name'][row] for row in expected_order(predictions, rank_by)[:5]]
+    assert [drug['drug_name'] for drug in ranked] == expected
+    assert all(drug['warnings'] == [] for drug in ranked)
+
+
+def test_unknown_rank_by_is_rejected(patient):
+    with pytest.raises(ValueError, match="Cannot rank by 'dose'"):
+        rank_formulary(patient, rank_by='dose')
+
+
+def test_drugs_with_warnings_are_left_out(use_registry, shipped_models, patient):
+    use_registry(shipped_models)
+    predictions = predict_formulary(patient)
+    order = [predictions['drug_name'][row] for row in expected_order(predictions, 'bioavailability')]
+    # Flag the top three drugs for the patient's medication and the fourth for an allergy
+    checker = SafetyChecker(aliases={})
+    checker.set_databases(interactions={name: ['Warfarin'] for name in order[:3]},
+                          contraindications={}, allergies={order[3]: ['Sulfa']})
+    user_input = {**patient, 'current_medications': ['warfarin'], 'allergies': ['Sulfa']}
+
+    ranked = rank_formulary(user_input, k=3, safety_checker=checker)
+    assert [drug['drug_name'] for drug in ranked] == order[4:7]
+
+    with_unsafe = rank_formulary(user_input, k=5, safety_checker=checker, include_unsafe=True)
+    assert [drug['drug_name'] for drug in with_unsafe] == order[:5]
+    assert [bool(drug['warnings']) for drug in with_unsafe] == [True, True, True, True, False]
@@ -0,0 +1,104 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src import indication_index
+from src.indication_index import IndicationIndex, get_indication_index
+
+PAIRS = [
+    ('Aspirin', 'Pain'),
+    ('ASPIRIN', 'Fever'),
+    ('Ibuprofen', 'pain'),
+    ('Ibuprofen', 'Fever'),
+    ('Ibuprofen', 'Fever'),
+    ('Loratadine', 'Allergic rhinitis'),
+    (None, 'Headache'),
+]
+
+
+def write_pairs(path, pairs, mtime_ns=None):
+    pd.DataFrame(pairs, columns=['drug_name', 'condition']).to_csv(path, index=False)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def brute_force(pairs):
+    """Drug -> condition set and condition -> drug set, straight from the rows."""
+    by_drug, by_condition = {}, {}
+    for drug, condition in pairs:
+        if drug is None or condition is None:
+            continue
+        by_drug.setdefault(drug.upper(), set()).add(condition)
+        by_condition.setdefault(condition.lower(), set()).add(drug.upper())
+    return by_drug, by_condition
+
+
+def assert_matches(index, pairs):
+    by_drug, by_condition = brute_force(pairs)
+    assert set(index.drugs) == set(by_drug)
+    for drug, conditions in by_drug.items():
+        assert drug.lower() in index
+        assert set(index.conditions_for(drug.lower())) == conditions
+        assert index.condition_keys_for(drug) == {condition.lower() for condition in conditions}
+    for condition, drugs in by_condition.items():
+        assert index.drugs_for(condition.upper()) == drugs
+    assert index.conditions_for('UNKNOWN') == ()
+    assert index.drugs_for('unknown') == frozenset()
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    monkeypatch.setattr(indication_index, '_index', None)
+    monkeypatch.setattr(indication_index, '_index_source', None)
+
+
+def test_saved_index_round_trips_against_the_csv(tmp_path):
+    csv_path = tmp_path / 'indications.csv'
+    write_pairs(csv_path, PAIRS)
+    built = IndicationIndex.from_csv(csv_path)
+    assert_matches(built, PAIRS)
+
+    built.save(tmp_path / 'indications.idx')
+    loaded = IndicationIndex.load(tmp_path / 'indications.idx')
+    assert loaded.source == built.source
+    assert_matches(loaded, PAIRS)
+
+
+def test_the_shipped_csv_matches_its_index():
+    df = pd.read_csv(indication_index.DEFAULT_CSV_PATH).dropna(subset=['drug_name', 'condition'])
+    pairs = list(zip(df['drug_name'].astype(str), df['condition'].astype(str)))
+    assert_matches(IndicationIndex.from_csv(), pairs)
+
+
+def test_index_is_rebuilt_when_the_csv_changes(tmp_path, fresh):
+    csv_path, index_path = tmp_path / 'indications.csv', tmp_path / 'indications.idx'
+    write_pairs(csv_path, PAIRS, mtime_ns=10**18)
+    first = get_indication_index(csv_path, index_path)
+    assert index_path.exists()
+    assert get_indication_index(csv_path, index_path) is first
+
+    # A new process loads the saved index rather than parsing the CSV
+    indication_index._index = None
+    reloaded = get_indication_index(csv_path, index_path)
+    assert reloaded is not first
+    assert_matches(reloaded, PAIRS)
+
+    changed = PAIRS + [('Cetirizine', 'Allergic rhinitis')]
+    write_pairs(csv_path, changed, mtime_ns=2 * 10**18)
+    rebuilt = get_indication_index(csv_path, index_path)
+    assert 'CETIRIZINE' in rebuilt
+    assert_matches(rebuilt, changed)
+    assert IndicationIndex.load(index_path).source == rebuilt.source
+
+
+def test_a_stale_saved_index_is_ignored(tmp_path, fresh):
+    csv_path, index_path = tmp_path / 'indications.csv', tmp_path / 'indications.idx'
+    write_pairs(csv_path, PAIRS, mtime_ns=10**18)
+    IndicationIndex.from_frame(pd.DataFrame([('Other', 'Cough')], columns=['drug_name', 'condition']),
+                               source=(1, 1)).save(index_path)
+    assert_matches(get_indication_index(csv_path, index_path), PAIRS)
+
+    index_path.write_bytes(b'not a pickle')
+    indication_index._index = None
+    assert_matches(get_indication_index(csv_path, index_path), PAIRS)
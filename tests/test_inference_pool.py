@@ -0,0 +1,47 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.inference_pool import InferencePool, PoolSaturated
+
+
+def test_pool_rejects_calls_beyond_workers_and_queue():
+    release = threading.Event()
+
+    async def scenario():
+        pool = InferencePool(max_workers=1, max_queue=1)
+        calls = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(PoolSaturated):
+            await pool.run(release.wait)
+        release.set()
+        await asyncio.gather(*calls)
+        assert pool.stats()['running'] == 0
+        pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_calls_keep_their_slot_until_they_finish():
+    release = threading.Event()
+
+    async def scenario():
+        pool = InferencePool(max_workers=1, max_queue=1, timeout=0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(release.wait)
+        # The timed-out call still occupies the only worker
+        assert pool.stats()['running'] == 1
+        queued = asyncio.ensure_future(pool.run(time.sleep, 0))
+        await asyncio.sleep(0.01)
+        assert pool.stats()['queued'] == 1
+        with pytest.raises(PoolSaturated):
+            await pool.run(time.sleep, 0)
+        release.set()
+        await queued
+        await asyncio.sleep(0.01)
+        assert pool.stats()['running'] == 0 and pool.stats()['queued'] == 0
+        pool.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,60 @@
+import itertools
+import random
+
+from src.interaction_matrix import InteractionMatrix
+from src.name_resolver import normalize_name
+
+ALIASES = {'tylenol': 'acetaminophen', 'advil': 'ibuprofen'}
+
+
+def resolve(name):
+    key = normalize_name(name)
+    return ALIASES.get(key, key)
+
+
+def random_database(rng, names, n_pairs):
+    database = {}
+    for _ in range(n_pairs):
+        a, b = rng.sample(names, 2)
+        database.setdefault(a, []).append(b)
+    return database
+
+
+def interacts(database, a, b):
+    """Does either drug list the other, by brute force over the raw database."""
+    a, b = resolve(a), resolve(b)
+    return any((resolve(drug), resolve(med)) in ((a, b), (b, a))
+               for drug, meds in database.items() for med in meds)
+
+
+NAMES = ['Aspirin', 'Warfarin', 'Ibuprofen', 'Acetaminophen', 'Alcohol', 'Lisinopril', 'Potassium',
+         'Simvastatin', 'Clarithromycin', 'Sertraline', 'Tramadol', 'Digoxin']
+
+
+def test_regimen_interactions_match_brute_force():
+    rng = random.Random(0)
+    for _ in range(50):
+        database = random_database(rng, NAMES, rng.randint(0, 25))
+        matrix = InteractionMatrix(database, resolve)
+        regimen = rng.sample(NAMES + ['Tylenol', 'Advil', 'Zolpidem'], rng.randint(0, 6))
+        expected = [(a, b) for a, b in itertools.combinations(regimen, 2) if interacts(database, a, b)]
+        assert matrix.regimen_interactions(regimen) == expected
+
+
+def test_interaction_free_matches_brute_force():
+    rng = random.Random(1)
+    for _ in range(50):
+        database = random_database(rng, NAMES, rng.randint(0, 25))
+        matrix = InteractionMatrix(database, resolve)
+        regimen = rng.sample(NAMES, rng.randint(0, 4))
+        candidates = NAMES + ['tylenol', 'ADVIL', 'Zolpidem']
+        expected = [not any(interacts(database, drug, med) for med in regimen) for drug in candidates]
+        assert matrix.interaction_free(candidates, regimen).tolist() == expected
+
+
+def test_pairs_are_counted_once():
+    database = {'Aspirin': ['Warfarin', 'Ibuprofen'], 'Warfarin': ['aspirin'], 'Tylenol': ['Alcohol']}
+    matrix = InteractionMatrix(database, resolve)
+    assert matrix.n_interactions == 3
+    assert len(matrix) == 5
+    assert matrix.regimen_interactions(['Alcohol', 'ACETAMINOPHEN']) == [('Alcohol', 'ACETAMINOPHEN')]
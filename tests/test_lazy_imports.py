@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ('torch', 'pandas', 'sklearn', 'joblib')
+
+
+def loaded_after_import(module):
+    """Top-level packages a fresh interpreter has loaded after importing module."""
+    code = f"import sys, {module}; print(' '.join(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+@pytest.mark.parametrize('module', ['src.simulate', 'src.api.main'])
+def test_importing_does_not_load_the_prediction_stack(module):
+    if module == 'src.api.main':
+        pytest.importorskip('fastapi')
+    loaded = loaded_after_import(module)
+    assert module.split('.')[0] in loaded
+    assert loaded.isdisjoint(HEAVY), sorted(loaded.intersection(HEAVY))
@@ -0,0 +1,70 @@
+import os
+
+from src.model_registry import ModelRegistry
+from src.predict import predict_new
+from src.prediction_cache import PredictionCache, get_prediction_cache, make_key
+
+from conftest import write_artifacts
+
+
+def test_registry_keeps_artifacts_resident(shipped_models):
+    registry = ModelRegistry(str(shipped_models))
+    assert registry.get() is registry.get()
+
+
+def test_registry_reloads_changed_artifacts(shipped_models):
+    registry = ModelRegistry(str(shipped_models))
+    first = registry.get()
+    model_path = os.path.join(shipped_models, 'absorpgen_multitask.pt')
+    write_artifacts(shipped_models, seed=1, feature_names=list(first.feature_names))
+    stat = os.stat(model_path)
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    second = registry.get()
+    assert second is not first
+    assert second.version != first.version
+
+
+def test_make_key_normalizes_patient_fields_and_drug_name():
+    a = make_key({'age': 30, 'weight': 68.0, 'sex': 'Male ', 'route_admin': 'ORAL'}, ' ibuprofen', 'v1')
+    b = make_key({'age': 30.0, 'weight': 68, 'sex': 'male', 'route_admin': 'oral', 'allergies': ['x']},
+                 'IBUPROFEN', 'v1')
+    assert a == b
+    assert make_key({'age': 30}, 'IBUPROFEN', 'v2') != make_key({'age': 30}, 'IBUPROFEN', 'v1')
+
+
+def test_prediction_cache_evicts_least_recently_used():
+    cache = PredictionCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.evictions == 1
+
+
+def test_prediction_cache_expires_entries():
+    now = [0.0]
+    cache = PredictionCache(ttl=10, clock=lambda: now[0])
+    cache.set('a', 1)
+    now[0] = 9.9
+    assert cache.get('a') == 1
+    now[0] = 10.1
+    assert cache.get('a') is None
+
+
+def test_predict_new_is_cached_until_the_model_changes(use_registry, shipped_models, patient):
+    registry = use_registry(shipped_models)
+    cache = get_prediction_cache()
+    first = predict_new(patient, 'IBUPROFEN')
+    hits = cache.hits
+    assert predict_new(patient, 'ibuprofen') == first
+    assert cache.hits == hits + 1 and cache.stats()['size'] == 1
+
+    write_artifacts(shipped_models, list(registry.get().feature_names), seed=1)
+    model_path = os.path.join(shipped_models, 'absorpgen_multitask.pt')
+    stat = os.stat(model_path)
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert predict_new(patient, 'IBUPROFEN') != first
+    assert cache.stats()['size'] == 2
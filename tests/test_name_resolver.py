@@ -0,0 +1,91 @@
+import itertools
+import random
+
+import pytest
+
+from src.name_resolver import NameResolver, edit_distance, get_name_resolver, load_aliases, normalize_name
+from src.rxnorm_lookup import BRAND_NAMES
+from src.safety_checker import SafetyChecker
+
+
+def brute_force_distance(a, b):
+    """Optimal string alignment distance, filled in over the whole table."""
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i, j in itertools.product(range(1, len(a) + 1), range(1, len(b) + 1)):
+        cost = 0 if a[i - 1] == b[j - 1] else 1
+        d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+        if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+            d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+@pytest.fixture
+def resolver():
+    names = ['ACETAMINOPHEN', 'IBUPROFEN', 'DEXTROMETHORPHAN', 'NYQUIL', 'PRAZOSIN', 'DOXAZOSIN', 'TERAZOSIN']
+    brands = {'Tylenol': 'acetaminophen', 'Advil': 'IBUPROFEN', 'NyQuil': 'DEXTROMETHORPHAN',
+              'Minipress': 'PRAZOSIN'}
+    return NameResolver(names, brands, BRAND_NAMES)
+
+
+def test_edit_distance_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(2000):
+        a = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 8)))
+        b = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 8)))
+        limit = rng.randint(0, 4)
+        expected = brute_force_distance(a, b)
+        assert edit_distance(a, b, limit) == (expected if expected <= limit else limit + 1), (a, b, limit)
+
+
+def test_exact_names_resolve_to_themselves(resolver):
+    assert resolver.generic_name('IBUPROFEN') == 'IBUPROFEN'
+    assert resolver.generic_name('  ibuprofen ') == 'IBUPROFEN'
+    assert resolver.generic_name('ZOLPIDEM') is None
+
+
+def test_brands_resolve_to_the_database_spelling(resolver):
+    assert resolver.generic_name('tylenol') == 'ACETAMINOPHEN'
+    assert resolver.generic_name('ADVIL') == 'IBUPROFEN'
+    assert resolver.brand_name('ibuprofen') == 'Advil'
+
+
+def test_a_brand_that_is_also_a_formulary_entry_resolves_to_its_generic(resolver):
+    assert resolver.generic_name('NyQuil') == 'DEXTROMETHORPHAN'
+    assert resolver.generic_name('NYQUIL') == 'DEXTROMETHORPHAN'
+
+
+def test_typos_resolve_when_one_generic_is_closest(resolver):
+    assert resolver.generic_name('ibuprofin') == 'IBUPROFEN'
+    assert resolver.generic_name('tylenl') == 'ACETAMINOPHEN'
+    assert resolver.generic_name('acetaminophne') == 'ACETAMINOPHEN'
+    assert resolver.generic_name('ibuprofin', fuzzy=False) is None
+
+
+def test_ambiguous_typos_do_not_resolve(resolver):
+    # One edit away from both PRAZOSIN and TERAZOSIN
+    assert {generic for _, generic, _ in resolver.suggest('TRAZOSIN')} == {'PRAZOSIN', 'TERAZOSIN'}
+    assert resolver.generic_name('TRAZOSIN') is None
+
+
+def test_suggest_matches_a_linear_scan(resolver):
+    rng = random.Random(1)
+    for _ in range(200):
+        key = list(rng.choice(resolver.keys))
+        for _ in range(rng.randint(0, 3)):
+            key[rng.randrange(len(key))] = rng.choice('aeiouxz')
+        query = ''.join(key)
+        max_distance = rng.randint(1, 2)
+        expected = sorted((k, t, d) for k, t in zip(resolver.keys, resolver.targets)
+                          if (d := brute_force_distance(query, k)) <= max_distance)
+        assert sorted(resolver.suggest(query, k=len(resolver), max_distance=max_distance)) == expected, query
+
+
+def test_safety_checker_resolves_aliases_like_the_name_resolver():
+    checker = SafetyChecker()
+    resolver = get_name_resolver()
+    for alias in load_aliases():
+        assert checker.resolve(alias) == normalize_name(resolver.generic_name(alias)), alias
@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+from src.safety_checker import SafetyChecker
+from src.safety_store import SafetyStore
+
+ALIASES = {'Tylenol': 'ACETAMINOPHEN', 'Advil': 'IBUPROFEN'}
+
+INTERACTIONS = {
+    'Aspirin': ['Warfarin', 'Ibuprofen'],
+    'IBUPROFEN': ['warfarin', 'Lisinopril'],
+    'Acetaminophen': ['Alcohol'],
+}
+CONTRAINDICATIONS = {'Ibuprofen': ['Kidney Disease', 'ulcer'], 'Aspirin': ['Bleeding disorder']}
+ALLERGIES = {'Amoxicillin': ['Penicillin'], 'Cephalexin': ['penicillin']}
+
+
+def make_checker(**databases):
+    checker = SafetyChecker(aliases=ALIASES)
+    checker.set_databases(interactions=databases.get('interactions', INTERACTIONS),
+                          contraindications=databases.get('contraindications', CONTRAINDICATIONS),
+                          allergies=databases.get('allergies', ALLERGIES))
+    return checker
+
+
+def index_contents(index):
+    """What an index says, independent of drug id numbering: {(drug, term)} from both directions."""
+    by_drug = {(drug, term) for drug, terms in index.by_drug.items() for term in terms}
+    names = {i: drug for drug, i in index.drug_ids.items()}
+    by_term = {(names[int(i)], term) for term, ids in index.by_term.items() for i in ids}
+    assert by_drug == by_term
+    return by_drug
+
+
+def assert_matches_rebuild(checker):
+    rebuilt = SafetyChecker(aliases=ALIASES)
+    rebuilt.set_databases(interactions=checker.interactions_db, contraindications=checker.contraindications_db,
+                          allergies=checker.allergy_db)
+    for incremental, full in zip(checker._compiled[1:], rebuilt._compiled[1:]):
+        assert index_contents(incremental) == index_contents(full)
+
+
+def test_names_are_matched_regardless_of_case_spacing_and_brand():
+    checker = make_checker()
+    assert checker.check_interactions('  tylenol ', ['ALCOHOL']) == ["Warning:   tylenol  may interact with ALCOHOL"]
+    assert checker.check_contraindications('Advil', ['kidney  disease']) == [
+        "Warning: Advil is contraindicated in kidney  disease"]
+    assert checker.check_allergies('amoxicillin', ['PENICILLIN'])
+
+
+def test_check_safety_many_matches_check_safety():
+    checker = make_checker()
+    drugs = ['Aspirin', 'advil', 'Tylenol', 'Amoxicillin', 'cephalexin', 'Unknown']
+    patient = dict(current_medications=['warfarin', 'Lisinopril', 'alcohol'],
+                   allergies=['Penicillin'], conditions=['Kidney disease', 'Ulcer', 'bleeding disorder'])
+    assert checker.check_safety_many(drugs, **patient) == [checker.check_safety(drug, **patient) for drug in drugs]
+
+
+def test_deleting_another_spelling_removes_the_entry():
+    checker = make_checker()
+    checker.apply_changes([('interactions', ' aspirin', 'WARFARIN', 'remove'),
+                           ('contraindications', 'IBUPROFEN ', 'kidney  disease', 'remove')])
+    assert checker.check_interactions('Aspirin', ['Warfarin']) == []
+    assert checker.check_contraindications('Advil', ['Kidney Disease']) == []
+    assert checker.interactions_db['Aspirin'] == ['Ibuprofen']
+    assert_matches_rebuild(checker)
+    assert checker.check_regimen(['Aspirin', 'Warfarin']) == []
+
+
+def test_an_alias_keeps_the_term_listed_until_every_spelling_is_gone():
+    checker = make_checker()
+    checker.apply_changes([('interactions', 'Tylenol', 'Alcohol', 'add'),
+                           ('interactions', 'acetaminophen', 'alcohol', 'remove')])
+    assert checker.check_interactions('Acetaminophen', ['Alcohol'])
+    assert_matches_rebuild(checker)
+    checker.apply_changes([('interactions', 'tylenol', 'ALCOHOL', 'remove')])
+    assert checker.check_interactions('Acetaminophen', ['Alcohol']) == []
+    assert_matches_rebuild(checker)
+
+
+def test_random_changes_match_a_full_rebuild():
+    rng = random.Random(0)
+    drugs = ['Aspirin', ' aspirin', 'ASPIRIN', 'Ibuprofen', 'advil', 'Tylenol', 'Acetaminophen', 'Naproxen']
+    terms = ['Warfarin', 'warfarin ', 'Lisinopril', 'Alcohol', 'ALCOHOL', 'Ibuprofen', 'Advil']
+    checker = make_checker()
+    for _ in range(50):
+        changes = [(rng.choice(['interactions', 'contraindications', 'allergies']), rng.choice(drugs),
+                    rng.choice(terms), rng.choice(['add', 'remove'])) for _ in range(rng.randint(1, 6))]
+        checker.apply_changes(changes)
+        assert_matches_rebuild(checker)
+
+
+def test_unknown_datasets_are_rejected():
+    with pytest.raises(ValueError, match='Unknown safety dataset'):
+        make_checker().apply_changes([('dosages', 'Aspirin', 'x', 'add')])
+
+
+def test_store_sync_matches_a_fresh_load(tmp_path):
+    store = SafetyStore(str(tmp_path / 'safety.sqlite'))
+    store.seed({'interactions': INTERACTIONS, 'contraindications': CONTRAINDICATIONS, 'allergies': ALLERGIES})
+    worker = SafetyChecker(aliases=ALIASES, store=store)
+    assert worker.check_interactions('Aspirin', ['Warfarin'])
+
+    store.apply('interactions', [(' ASPIRIN', 'warfarin', 'remove'), ('Naproxen', 'Warfarin', 'add')])
+    store.apply('allergies', [('amoxicillin ', 'PENICILLIN', 'remove')])
+    assert worker.refresh()
+    assert worker.check_interactions('Aspirin', ['Warfarin']) == []
+    assert worker.check_interactions('naproxen', ['WARFARIN'])
+    assert worker.check_allergies('Amoxicillin', ['Penicillin']) == []
+
+    fresh = SafetyChecker(aliases=ALIASES, store=store)
+    for incremental, full in zip(worker._compiled[1:], fresh._compiled[1:]):
+        assert index_contents(incremental) == index_contents(full)
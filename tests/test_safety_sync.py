@@ -0,0 +1,106 @@
+import importlib.util
+import os
+import sys
+import threading
+
+import pytest
+
+from src import safety_store
+from src.safety_checker import SafetyChecker
+from src.safety_store import SafetyStore
+from src.safety_sync import sync
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'scripts', 'safety_stub_server.py')
+
+BUNDLED = {
+    'interactions': {'Aspirin': ['Warfarin'], 'Ibuprofen': ['Lisinopril']},
+    'contraindications': {'Ibuprofen': ['Kidney Disease']},
+    'allergies': {'Amoxicillin': ['Penicillin']},
+}
+
+
+def load_stub():
+    spec = importlib.util.spec_from_file_location('safety_stub_server', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def record(drug, term, last_updated, action='add'):
+    return {'drug': drug, 'term': term, 'action': action, 'last_updated': last_updated}
+
+
+@pytest.fixture
+def feed():
+    """A stub delta endpoint; yields (feed, base_url)."""
+    stub = load_stub()
+    feed = stub.DeltaFeed()
+    server = stub.make_server(feed)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield feed, f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def bundled(monkeypatch):
+    monkeypatch.setattr(safety_store, 'bundled_databases', lambda: BUNDLED)
+
+
+def checker_for(store):
+    checker = SafetyChecker(aliases={}, store=None)
+    checker.set_databases(**BUNDLED)
+    checker.store = store
+    checker.refresh()
+    return checker
+
+
+def test_sync_seeds_an_empty_store_first(tmp_path, feed, bundled):
+    feed, url = feed
+    feed.extend({'interactions': [record('Naproxen', 'Warfarin', '000000000001')]})
+    store = SafetyStore(str(tmp_path / 'safety.sqlite'))
+    summary = sync(url, store, workers=2)
+    assert summary['interactions'] == {'received': 1, 'applied': 1}
+    assert store.is_seeded()
+
+    checker = SafetyChecker(aliases={}, store=store)
+    assert checker.check_interactions('Aspirin', ['Warfarin'])
+    assert checker.check_interactions('Ibuprofen', ['Lisinopril'])
+    assert checker.check_interactions('Naproxen', ['Warfarin'])
+    assert checker.check_allergies('Amoxicillin', ['Penicillin'])
+
+
+def test_checkers_ignore_an_unseeded_store(tmp_path):
+    store = SafetyStore(str(tmp_path / 'safety.sqlite'))
+    store.apply('interactions', [('Naproxen', 'Warfarin', 'add')])
+    checker = checker_for(store)
+    assert not checker.refresh()
+    # Still the full bundled set, without the stray delta
+    assert checker.check_interactions('Aspirin', ['Warfarin'])
+    assert checker.check_interactions('Naproxen', ['Warfarin']) == []
+
+    store.seed(BUNDLED)
+    assert checker.refresh()
+    assert checker.check_interactions('Aspirin', ['Warfarin'])
+    assert checker.check_interactions('Naproxen', ['Warfarin'])
+
+
+def test_records_at_the_cursor_are_pulled(tmp_path, feed, bundled):
+    feed, url = feed
+    feed.extend({'interactions': [record('Naproxen', 'Warfarin', '000000000005')]})
+    store = SafetyStore(str(tmp_path / 'safety.sqlite'))
+    sync(url, store, workers=2)
+    assert store.cursor('interactions') == '000000000005'
+
+    # Published after the last sync, with the cursor's own timestamp
+    feed.extend({'interactions': [record('Aspirin', 'Warfarin', '000000000005', 'remove')]})
+    summary = sync(url, store, workers=2)
+    # The earlier record comes again and changes nothing
+    assert summary['interactions'] == {'received': 2, 'applied': 1}
+    databases, _ = store.load()
+    assert databases['interactions'] == {'ibuprofen': ['lisinopril'], 'naproxen': ['warfarin']}
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+from conftest import SHIPPED_FEATURES
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from torch.utils.data import DataLoader
+
+from src.train import StreamingDrugDataset
+
+N_ROWS = 1037
+
+
+@pytest.fixture
+def drug_csv(tmp_path):
+    """A drug table in which each row is identified by its molecular_weight."""
+    path = tmp_path / 'drugs.csv'
+    pd.DataFrame({'drug_name': [f'DRUG{i}' for i in range(N_ROWS)],
+                  'molecular_weight': [100.0 + i for i in range(N_ROWS)],
+                  'logP': 1.0, 'pKa': 7.0, 'bioavailability': 0.8,
+                  'strength_mg_per_unit': 200.0, 'formulation_concentration': 40.0}).to_csv(path, index=False)
+    return path
+
+
+def make_dataset(source, **kwargs):
+    # An identity scaler, so the molecular_weight column comes through unchanged
+    sample = pd.DataFrame([[1.0] * len(SHIPPED_FEATURES)], columns=SHIPPED_FEATURES)
+    preprocessor = Pipeline([('scaler', StandardScaler(with_mean=False, with_std=False))]).fit(sample)
+    encoder = LabelEncoder().fit(['capsule', 'liquid', 'tablet'])
+    return StreamingDrugDataset(preprocessor, encoder, source=source, **kwargs)
+
+
+def streamed_rows(batches):
+    column = SHIPPED_FEATURES.index('molecular_weight')
+    return [value for X, _, _ in batches for value in X[:, column].tolist()]
+
+
+@pytest.mark.parametrize('chunksize, batch_size, shuffle_buffer', [
+    (50_000, 64, 100_000),  # one chunk, drained once
+    (100, 64, 256),         # many chunks, the buffer drained with rows held back
+    (7, 10, 10),            # a buffer no larger than a batch
+])
+def test_every_row_is_streamed_exactly_once(drug_csv, chunksize, batch_size, shuffle_buffer):
+    dataset = make_dataset(drug_csv, chunksize=chunksize, batch_size=batch_size, shuffle_buffer=shuffle_buffer)
+    batches = list(dataset)
+    assert sorted(streamed_rows(batches)) == [100.0 + i for i in range(N_ROWS)]
+    assert all(len(X) == batch_size for X, _, _ in batches[:-1])
+    assert all(len(X) == len(y_reg) == len(y_class) for X, y_reg, y_class in batches)
+
+
+def test_epochs_are_shuffled_differently(drug_csv):
+    dataset = make_dataset(drug_csv, chunksize=100, batch_size=64, shuffle_buffer=256)
+    first = streamed_rows(dataset)
+    assert streamed_rows(dataset) == first
+    dataset.set_epoch(1)
+    second = streamed_rows(dataset)
+    assert second != first
+    assert sorted(second) == sorted(first)
+
+
+@pytest.mark.filterwarnings('ignore:This DataLoader will create')
+def test_workers_and_ranks_stream_every_row_once(drug_csv):
+    rows = []
+    for rank in range(2):
+        dataset = make_dataset(drug_csv, chunksize=100, batch_size=64, shuffle_buffer=256, shard=(rank, 2))
+        loader = DataLoader(dataset, batch_size=None, num_workers=2)
+        rows.extend(streamed_rows(loader))
+    assert sorted(rows) == [100.0 + i for i in range(N_ROWS)]
@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+from conftest import SHIPPED_FEATURES, write_artifacts
+
+from src import symptom_search
+from src.indication_index import IndicationIndex
+from src.predict import predict_formulary
+from src.symptom_search import REFERENCE_PATIENT, SymptomSearchIndex, search_drugs_by_symptoms
+
+PAIRS = [
+    ('ALPHA', 'Headache'),
+    ('ALPHA', 'Fever'),
+    ('BETA', 'tension headache'),
+    ('BETA', 'Fever'),
+    ('GAMMA', 'Fever'),
+    ('DELTA', 'Fever'),
+    ('EPSILON', 'chronic lower back pain'),
+]
+
+
+@pytest.fixture
+def index():
+    return SymptomSearchIndex(IndicationIndex.from_frame(pd.DataFrame(PAIRS, columns=['drug_name', 'condition'])))
+
+
+def names(results):
+    return [result['drug_name'] for result in results]
+
+
+def test_exact_matches_outrank_partial_ones(index):
+    results = index.search(['headache'])
+    assert names(results) == ['ALPHA', 'BETA']
+    assert [result['score'] for result in results] == [1.0, 0.5]
+
+
+def test_scores_add_up_over_symptoms(index):
+    results = index.search(['headache', 'fever'])
+    assert names(results)[:2] == ['ALPHA', 'BETA']
+    assert results[0]['matched_symptoms'] == ['headache', 'fever']
+    assert results[0]['score'] == 2.0
+
+
+def test_ties_are_broken_by_bioavailability_with_unknown_last(index):
+    index.set_bioavailability({'GAMMA': 0.9, 'delta': 0.95, 'ALPHA': 0.1})
+    results = index.search(['fever'])
+    assert names(results) == ['DELTA', 'GAMMA', 'ALPHA', 'BETA']
+    assert results[0]['bioavailability'] == 0.95
+    assert results[-1]['bioavailability'] is None
+
+    # New values replace the old ones entirely
+    index.set_bioavailability({'BETA': 0.5})
+    results = index.search(['fever'])
+    assert names(results)[0] == 'BETA'
+    assert [result['bioavailability'] for result in results[1:]] == [None, None, None]
+
+
+def test_restrict_to_limits_the_candidates(index):
+    assert names(index.search(['fever'], restrict_to=['gamma', 'Beta', 'UNKNOWN'])) == ['BETA', 'GAMMA']
+    assert index.search(['back pain'], restrict_to=['ALPHA']) == []
+
+
+def test_k_and_empty_queries(index):
+    assert len(index.search(['fever'], k=2)) == 2
+    assert index.search([]) == []
+    assert index.search(['  ', '']) == []
+    assert index.search(['toothache']) == []
+
+
+def test_process_wide_search_uses_predicted_bioavailability(use_registry, shipped_models, tmp_path, monkeypatch):
+    monkeypatch.setattr(symptom_search, '_search', None)
+    monkeypatch.setattr(symptom_search, '_search_bioavailability', None)
+    use_registry(shipped_models)
+    drugs = ['IBUPROFEN', 'ACETAMINOPHEN']
+
+    def predicted():
+        predictions = predict_formulary(REFERENCE_PATIENT, drug_names=drugs)
+        return dict(zip(predictions['drug_name'], predictions['bioavailability'].tolist()))
+
+    expected = predicted()
+    results = search_drugs_by_symptoms(['fever', 'pain'], restrict_to=drugs)
+    assert {result['drug_name']: result['bioavailability'] for result in results} == pytest.approx(expected)
+    assert names(results) == sorted(expected, key=lambda name: -expected[name])
+
+    # A new model's predictions are picked up without rebuilding the symptom index
+    search = symptom_search.get_symptom_search()
+    use_registry(write_artifacts(tmp_path / 'other', SHIPPED_FEATURES, seed=7))
+    results = search_drugs_by_symptoms(['fever', 'pain'], restrict_to=drugs)
+    assert symptom_search.get_symptom_search() is search
+    assert {result['drug_name']: result['bioavailability'] for result in results} == pytest.approx(predicted())